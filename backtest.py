@@ -1,22 +1,22 @@
 import requests
-from bs4 import BeautifulSoup
 import re
-import pandas as pd
-import FinanceDataReader as fdr
-from datetime import datetime, timedelta
 import argparse
 
+import krx_calendar
+from http_client import naver_url, fetch_soup
+from market_data import latest_session, get_session_change
+from profiling import stage, profiler, add_profile_arguments, configure_from_args
+from snapshot_bundle import add_snapshot_arguments, use_snapshot_from_args
+from run_budget import budget, add_budget_arguments, configure_budget_from_args
+
 def get_top_buy_stocks(day_index=0, market='kospi'):
     """
     Naver Finance에서 특정 날짜의 '외국인 순매수' 상위 종목 리스트를 가져옵니다.
     """
     market_code = {'kospi': '01', 'kosdaq': '02'}.get(market, '01')
-    list_url = f"https://finance.naver.com/sise/sise_deal_rank_iframe.naver?sosok={market_code}&investor_gubun=9000&type=buy"
+    list_url = naver_url(f"/sise/sise_deal_rank_iframe.naver?sosok={market_code}&investor_gubun=9000&type=buy")
     try:
-        response = requests.get(list_url)
-        response.raise_for_status()
-        response.encoding = 'euc-kr'
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = fetch_soup(list_url)
     except requests.exceptions.RequestException as e:
         print(f"종목 리스트를 가져오는 중 오류 발생: {e}")
         return []
@@ -49,34 +49,29 @@ def analyze_next_day_performance(market='kospi'):
     어제 외국인 순매수 상위 종목들의 오늘 등락률을 분석합니다.
     """
     print(f"어제 '{market.upper()}' 시장의 '외국인 순매수' 상위 종목 리스트를 가져옵니다...")
-    yesterday_stocks = get_top_buy_stocks(day_index=0, market=market)
+    with stage('section.deal_rank'):
+        yesterday_stocks = get_top_buy_stocks(day_index=0, market=market)
 
     if not yesterday_stocks:
         print("어제 순매수 종목 리스트를 가져오지 못했습니다.")
         return
 
-    today = datetime.now()
-    start_day = today - timedelta(days=5) 
-    
+    today_session = latest_session()
+    yesterday_trade_date = krx_calendar.previous_trading_day(today_session).strftime('%Y-%m-%d')
+    today_trade_date = today_session.strftime('%Y-%m-%d')
+
     results = []
-    yesterday_trade_date = None
-    today_trade_date = None
 
     print(f"\n총 {len(yesterday_stocks)}개 종목의 오늘 등락률을 확인합니다.")
-    
-    for i, stock in enumerate(yesterday_stocks):
+    print(f"(기준 거래일: 어제({yesterday_trade_date}) -> 오늘({today_trade_date}))")
+    print("-" * 50)
+
+    for stock in yesterday_stocks:
         try:
-            df = fdr.DataReader(stock['code'], start=start_day, end=today)
-            if len(df) < 2:
+            latest_change = get_session_change(stock['code'], today_session)
+            if latest_change is None:
                 continue
-            
-            if i == 0:
-                today_trade_date = df.index[-1].strftime('%Y-%m-%d')
-                yesterday_trade_date = df.index[-2].strftime('%Y-%m-%d')
-                print(f"(기준 거래일: 어제({yesterday_trade_date}) -> 오늘({today_trade_date}))")
-                print("-" * 50)
 
-            latest_change = df['Change'].iloc[-1]
             results.append({
                 'name': stock['name'],
                 'change': latest_change
@@ -104,9 +99,18 @@ def analyze_next_day_performance(market='kospi'):
 def main():
     parser = argparse.ArgumentParser(description="어제 외국인 순매수 상위 종목의 다음날 등락률을 분석합니다.")
     parser.add_argument('--market', type=str, default='kospi', choices=['kospi', 'kosdaq'], help="분석할 시장 (kospi 또는 kosdaq)")
+    add_profile_arguments(parser)
+    add_budget_arguments(parser)
+    add_snapshot_arguments(parser)
     args = parser.parse_args()
+    configure_from_args(args)
+    configure_budget_from_args(args)
+    use_snapshot_from_args(args)
     
-    analyze_next_day_performance(market=args.market)
+    with stage('section.next_day_performance'):
+        analyze_next_day_performance(market=args.market)
+    budget.print_summary()
+    profiler.finish()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+성능 벤치마크 모음
+네트워크 없이 실행 가능한 측정 항목을 서브커맨드로 제공합니다.
+
+사용 예:
+    python benchmark.py memory --tickers 2500 --days 250
+    python benchmark.py load --scales 1 10 100
+    python benchmark.py e2e --latency-ms 50 --error-rate 0.02
+    python benchmark.py importtime
+    python benchmark.py panel --tickers 2500 --years 10 --workers 1 2 4 8
+    python benchmark.py scan --tickers 600 --latency-ms 20 --workers 1 2 4
+    python benchmark.py archive --tickers 2500 --years 10
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from stock_records import StockRef, StockResult
+
+
+def _measure(build):
+    """build()가 만든 객체가 점유하는 메모리(바이트)와 생성 시간을 측정합니다."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size, elapsed
+
+
+def _sample_values(count, seed=42):
+    """결과 레코드 생성을 위한 임의 값 목록을 만듭니다."""
+    rng = random.Random(seed)
+    names = [f"종목{i:04d}" for i in range(2500)]
+    values = []
+    for i in range(count):
+        price = rng.randint(1000, 500000)
+        values.append((
+            names[i % len(names)], f"{i % 2500:06d}", rng.randint(0, 3),
+            price, rng.uniform(-10, 10), int(price * rng.uniform(1.0, 1.8)),
+            rng.uniform(1, 40), rng.uniform(0.2, 3), rng.uniform(-5, 30), rng.uniform(0, 60),
+            "PBR: 0.80, PER: 9.10",
+        ))
+    return values
+
+
+def bench_memory(args):
+    """기존 한글 키 딕셔너리와 StockResult 레코드의 메모리/접근 비용을 비교합니다."""
+    count = args.tickers * args.days
+    values = _sample_values(count)
+    print(f"레코드 수: {count:,} ({args.tickers:,} 종목 × {args.days:,} 일)")
+
+    def build_dicts():
+        return [{
+            "종목명": v[0], "코드": v[1], "종합 점수": v[2], "현재가": v[3], "등락률": v[4],
+            "52주 신고가": v[5], "PER": v[6], "PBR": v[7], "ROE": v[8], "외국인보유율": v[9], "필터": v[10],
+        } for v in values]
+
+    def build_records():
+        return [StockResult(*v) for v in values]
+
+    def build_pair_dicts():
+        return [{'name': v[0], 'code': v[1]} for v in values]
+
+    def build_pair_refs():
+        return [StockRef(v[0], v[1]) for v in values]
+
+    rows = []
+    for label, build, key_access in [
+        ("결과 dict", build_dicts, lambda r: r['현재가'] / r['52주 신고가']),
+        ("StockResult", build_records, lambda r: r.price / r.high_52w),
+        ("종목 dict(name/code)", build_pair_dicts, lambda r: r['code']),
+        ("StockRef", build_pair_refs, lambda r: r.code),
+    ]:
+        objs, size, build_time = _measure(build)
+        started = time.perf_counter()
+        for obj in objs:
+            key_access(obj)
+        access_time = time.perf_counter() - started
+        rows.append((label, size, build_time, access_time))
+        del objs
+
+    print(f"{'표현':<22}{'메모리(MB)':>12}{'바이트/행':>12}{'생성(s)':>10}{'접근(s)':>10}")
+    print("-" * 66)
+    for label, size, build_time, access_time in rows:
+        print(f"{label:<22}{size / 1e6:>12.1f}{size / count:>12.1f}{build_time:>10.3f}{access_time:>10.3f}")
+    print("-" * 66)
+    print(f"StockResult / dict 메모리 비율: {rows[1][1] / rows[0][1]:.1%}")
+    print(f"StockRef / dict 메모리 비율: {rows[3][1] / rows[2][1]:.1%}")
+
+
+def _offline(engine_class, market):
+    """페이지 요청을 합성 시장 HTML로 대체한 엔진 서브클래스를 만듭니다."""
+    from bs4 import BeautifulSoup
+    from profiling import stage
+
+    class OfflineEngine(engine_class):
+        def _fetch_url(self, url):
+            html = market.page(url)
+            if html is None:
+                return None
+            with stage('bs4.parse'):
+                return BeautifulSoup(html, 'html.parser')
+
+    return OfflineEngine
+
+
+def bench_load(args):
+    """합성 시장으로 스크리너/대시보드 경로를 운영 규모의 1×, 10×, 100×로 부하 테스트합니다."""
+    import market_data
+    from find_stocks import StockAnalyzer
+    from profiling import profiler
+    from synthetic_market import SyntheticMarket
+    from unified_dashboard_html import UnifiedStockDashboardHTML
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rows = []
+    for scale in args.scales:
+        market = SyntheticMarket(n_tickers=args.tickers * scale, years=args.years, seed=args.seed,
+                                 deal_rank_size=args.deal_rank_size * scale)
+        market_data.use_reader(market.data_reader, host='synthetic')
+        market_data.use_synthetic_clock(market)
+        profiler.configure(enabled=True)
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if args.engine in ('screen', 'all'):
+                for market_name in ('kospi', 'kosdaq'):
+                    _offline(StockAnalyzer, market)(consecutive_days=args.days, market=market_name).analyze()
+            if args.engine in ('dashboard', 'all'):
+                dashboard = _offline(UnifiedStockDashboardHTML, market)(consecutive_days=args.days)
+                dashboard.get_sector_overview()
+                dashboard.get_theme_stocks()
+                for market_name in ('kospi', 'kosdaq'):
+                    dashboard.get_today_top_stocks(market=market_name)
+                    dashboard.analyze_yesterday_performance(market=market_name)
+                    dashboard.analyze_consecutive_stocks(market=market_name)
+                dashboard.render_html()
+        elapsed = time.perf_counter() - started
+
+        price_calls = sum(1 for e in profiler.events if e['name'] == 'market_data.ohlcv')
+        parses = sum(1 for e in profiler.events if e['name'] == 'bs4.parse')
+        rows.append((scale, market.n_tickers, market.deal_rank_size, price_calls, parses, elapsed))
+        if args.verbose:
+            print(f"\n[{scale}×]")
+            profiler.print_summary()
+
+    print(f"{'배율':>4}{'종목 수':>10}{'순매수 행':>10}{'시세 조회':>10}{'HTML 파싱':>10}{'소요(s)':>10}{'조회/s':>10}")
+    print("-" * 64)
+    for scale, tickers, rank_size, price_calls, parses, elapsed in rows:
+        print(f"{scale:>4}{tickers:>10,}{rank_size:>10,}{price_calls:>10,}{parses:>10,}{elapsed:>10.2f}{price_calls / elapsed:>10.1f}")
+
+
+def bench_e2e(args):
+    """로컬 모의 서버를 띄우고 스크립트를 실제 HTTP 경로로 종단 간 실행해 처리량을 측정합니다."""
+    from mock_server import start_server
+
+    server, base_url = start_server(
+        tickers=args.tickers, years=args.years, market_seed=args.seed,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        rate_limit=args.rate_limit, seed=args.seed,
+    )
+    env = dict(os.environ,
+               KRX_NAVER_BASE_URL=base_url,
+               KRX_WISEREPORT_BASE_URL=base_url,
+               KRX_NAVER_POLLING_BASE_URL=base_url,
+               KRX_SYNTHETIC_MARKET=f"tickers={args.tickers},years={args.years},seed={args.seed}")
+    command = [sys.executable, args.script, *args.script_args]
+    print(f"모의 서버: {base_url} (지연 {args.latency_ms}±{args.jitter_ms}ms, 오류율 {args.error_rate:.0%}, "
+          f"제한 {args.rate_limit or '없음'}/s)")
+    print(f"실행: {' '.join(command)}")
+
+    started = time.perf_counter()
+    try:
+        completed = subprocess.run(command, env=env, capture_output=not args.verbose, text=True)
+    finally:
+        elapsed = time.perf_counter() - started
+        stats = server.RequestHandlerClass.state.stats()
+        server.shutdown()
+
+    statuses = {k.split('.', 1)[1]: v for k, v in stats['counts'].items() if k.startswith('status.')}
+    print("-" * 50)
+    print(f"종료 코드: {completed.returncode}")
+    print(f"소요 시간: {elapsed:.2f}s")
+    print(f"요청 수: {stats['requests']:,} ({stats['requests'] / elapsed:.1f} req/s)")
+    print(f"상태 코드: {json.dumps(statuses)}")
+    print(f"최대 동시 요청: {stats['max_in_flight']}")
+
+
+def _importtime(code, repeat=1):
+    """python -X importtime 으로 code를 실행해 (전체 μs, 최상위 패키지별 self μs 합계)를 반환합니다.
+    repeat > 1이면 전체 시간이 가장 짧은 실행의 결과를 사용합니다."""
+    return min((_importtime_once(code) for _ in range(repeat)), key=lambda result: result[0])
+
+
+def _importtime_once(code):
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    total = 0
+    packages = {}
+    for line in completed.stderr.splitlines():
+        parts = line.split('|')
+        if not line.startswith('import time:') or len(parts) != 3 or 'cumulative' in parts[1]:
+            continue
+        self_us = int(parts[0].split(':')[1])
+        name = parts[2].rstrip()
+        package = name.strip().split('.')[0]
+        total += self_us
+        packages[package] = packages.get(package, 0) + self_us
+    return total, packages
+
+
+def bench_importtime(args):
+    """krx.py 서브커맨드별 모듈 로드 시간을 -X importtime 으로 측정하고 패키지별로 분해합니다."""
+    import krx
+
+    baseline, baseline_packages = _importtime('pass', args.repeat)
+    cli, _ = _importtime('import krx', args.repeat)
+    print(f"인터프리터 기본 로드: {baseline / 1000:.1f}ms, krx.py: {(cli - baseline) / 1000:.1f}ms")
+    print()
+
+    commands = args.commands or list(krx.COMMANDS)
+    for command in commands:
+        console = command == 'dashboard-console'
+        name = 'dashboard' if console else command
+        try:
+            total, packages = _importtime(f"import krx; krx.load({name!r}, console={console})", args.repeat)
+        except RuntimeError as e:
+            print(f"[{command}] 로드 실패: {e}\n")
+            continue
+        print(f"[{command}] {(total - baseline) / 1000:.1f}ms")
+        packages = {p: us - baseline_packages.get(p, 0) for p, us in packages.items()}
+        ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+        for package, self_us in ranked[:args.top]:
+            print(f"    {package:<28}{self_us / 1000:>8.1f}ms")
+        print()
+
+
+def _proc_memory():
+    """현재 프로세스의 (RSS, PSS) 바이트. PSS는 공유 페이지를 공유한 프로세스 수로 나눈 값입니다."""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                values[parts[0][:-1]] = int(parts[1]) * 1024
+    return values.get('Rss', 0), values.get('Pss', 0)
+
+
+_panel_state = {}
+
+
+def _panel_worker_init(mode, source, barrier):
+    """작업자 시작: mmap이면 패널 파일에 붙고, copy면 전달받은 피클에서 배열 복사본을 만듭니다."""
+    import pickle
+    from price_panel import PricePanel
+
+    _, pss_before = _proc_memory()
+    started = time.perf_counter()
+    if mode == 'mmap':
+        panel = PricePanel.attach(source)
+        arrays = [panel.arrays['Close'], panel.arrays['Volume']]
+    else:
+        arrays = pickle.loads(source)
+    _panel_state.update(arrays=arrays, barrier=barrier, pss_before=pss_before,
+                        init_ms=(time.perf_counter() - started) * 1000)
+
+
+def _panel_worker_task(_):
+    """패널 전체를 한 번 읽고, 모든 작업자가 읽은 뒤의 메모리 사용량을 반환합니다."""
+    import numpy as np
+
+    # 행 단위로 읽어 임시 배열이 전체 패널 크기만큼 커지지 않게 합니다.
+    checksum = sum(float(np.nansum(row)) for a in _panel_state['arrays'] for row in a)
+    _panel_state['barrier'].wait()
+    rss, pss = _proc_memory()
+    _panel_state['barrier'].wait()
+    return os.getpid(), _panel_state['init_ms'], rss, pss - _panel_state['pss_before'], checksum
+
+
+def bench_panel(args):
+    """프로세스 풀 작업자가 시세 패널을 memmap으로 공유할 때와 각자 복사본을 받을 때의 메모리/시작 시간을 비교합니다."""
+    import multiprocessing
+    import pickle
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    import numpy as np
+
+    from price_panel import PricePanel, write_panel
+    from synthetic_market import SyntheticMarket
+
+    logging.getLogger().setLevel(logging.WARNING)
+    market = SyntheticMarket(n_tickers=args.tickers, years=args.years, seed=args.seed)
+    with tempfile.TemporaryDirectory() as path:
+        started = time.perf_counter()
+        write_panel(path, {code: market.ohlcv(code) for code in market.codes})
+        panel = PricePanel.attach(path)
+        arrays = [panel.arrays['Close'], panel.arrays['Volume']]
+        size = sum(a.nbytes for a in arrays)
+        print(f"패널: {panel.shape[0]:,}종목 × {panel.shape[1]:,}일, Close+Volume {size / 1024 ** 2:.1f} MiB "
+              f"(생성 {time.perf_counter() - started:.1f}s)")
+        pickled = pickle.dumps([np.array(a) for a in arrays], protocol=pickle.HIGHEST_PROTOCOL)
+        del panel, arrays
+
+        # 시작(ms): 패널에 붙거나 복사본을 언피클하는 시간, 패널 PSS: 작업자 시작 이후 늘어난 PSS
+        print(f"{'방식':<6}{'작업자':>6}{'시작(ms)':>10}{'작업자 RSS':>12}{'패널 PSS':>12}{'PSS 합계':>12}")
+        print("-" * 58)
+        context = multiprocessing.get_context('spawn')
+        for mode in args.modes:
+            for workers in args.workers:
+                barrier = context.Barrier(workers)
+                source = path if mode == 'mmap' else pickled
+                with ProcessPoolExecutor(workers, mp_context=context, initializer=_panel_worker_init,
+                                         initargs=(mode, source, barrier)) as pool:
+                    results = list(pool.map(_panel_worker_task, range(workers)))
+                init_ms = sum(r[1] for r in results) / len(results)
+                rss = max(r[2] for r in results)
+                pss = max(r[3] for r in results)
+                total_pss = sum(r[3] for r in results)
+                mib = 1024 ** 2
+                print(f"{mode:<6}{workers:>6}{init_ms:>10.1f}{rss / mib:>10.1f}MB{pss / mib:>10.1f}MB{total_pss / mib:>10.1f}MB")
+
+
+def bench_scan(args):
+    """로컬 모의 서버 대상으로 분할 스캔(scan_queue.py)을 작업자 수별로 실행해 처리량과 병합 결과 일치를 확인합니다."""
+    import hashlib
+    import tempfile
+
+    from mock_server import start_server
+    from scan_queue import ScanQueue, default_params, merge_results, spawn_workers
+    from stock_records import results_to_frame
+    from synthetic_market import SyntheticMarket
+
+    logging.getLogger().setLevel(logging.WARNING)
+    market = SyntheticMarket(n_tickers=args.tickers, years=args.years, seed=args.seed)
+    server, base_url = start_server(market=market, latency_ms=args.latency_ms, seed=args.seed)
+    os.environ.update(KRX_NAVER_BASE_URL=base_url, KRX_WISEREPORT_BASE_URL=base_url,
+                      KRX_NAVER_POLLING_BASE_URL=base_url,
+                      KRX_SYNTHETIC_MARKET=f"tickers={args.tickers},years={args.years},seed={args.seed}")
+    stocks = [(s.name, s.code) for s in market.tickers]
+    params = default_params()
+    print(f"모의 서버: {base_url} (지연 {args.latency_ms}ms), {len(stocks):,}종목, 묶음 {args.shard_size}종목, "
+          f"작업자별 스레드 {args.threads}")
+    print(f"{'작업자':>6}{'소요(s)':>10}{'종목/s':>10}{'배속':>8}{'결과':>8}  병합 해시")
+    print("-" * 62)
+
+    baseline = None
+    try:
+        for workers in args.workers:
+            with tempfile.TemporaryDirectory() as tmp:
+                queue_path = os.path.join(tmp, 'queue.db')
+                with ScanQueue(queue_path) as queue:
+                    run_id = queue.submit(stocks, params, args.shard_size)
+                started = time.perf_counter()
+                spawn_workers(queue_path, run_id, workers, args.threads)
+                elapsed = time.perf_counter() - started
+                results = merge_results(queue_path, run_id)
+            digest = hashlib.sha256(results_to_frame(results).to_csv(index=False).encode()).hexdigest()[:12]
+            baseline = baseline or elapsed
+            print(f"{workers:>6}{elapsed:>10.2f}{len(stocks) / elapsed:>10.1f}{baseline / elapsed:>7.2f}x"
+                  f"{len(results):>8,}  {digest}")
+    finally:
+        server.shutdown()
+
+
+def _best_of(func, repeat):
+    """func()를 repeat번 실행해 (마지막 결과, 가장 짧은 소요 시간)을 반환합니다."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+def bench_archive(args):
+    """합성 시장 전 종목 일봉을 float64 패널/CSV/Parquet/압축 보관소로 저장해 크기, 쓰기 시간, 풀기 처리량을 비교합니다."""
+    import tempfile
+
+    import numpy as np
+    import pandas as pd
+
+    from price_archive import PriceArchive, write_archive
+    from price_panel import FIELDS
+    from synthetic_market import SyntheticMarket
+
+    logging.getLogger().setLevel(logging.WARNING)
+    market = SyntheticMarket(n_tickers=args.tickers, years=args.years, seed=args.seed)
+    bars = [market._arrays(code) for code in market.codes]
+    arrays = {field: np.array([b[i] for b in bars], dtype=np.float64) for i, field in enumerate(FIELDS)}
+    del bars
+    codes, dates = market.codes, market.dates.values.astype('datetime64[D]')
+    n_values = len(codes) * len(dates) * len(FIELDS)
+    sample = sorted(random.Random(args.seed).sample(codes, min(args.sample, len(codes))))
+    rows_idx = [market.codes.index(code) for code in sample]
+    start = dates[-1] - np.timedelta64(365, 'D')
+    lo = int(np.searchsorted(dates, start))
+    print(f"합성 시장: {len(codes):,}종목 × {len(dates):,}일 × {len(FIELDS)}필드 ({n_values / 1e6:.1f}M 값), "
+          f"기간·종목 조회: {len(sample)}종목 × 최근 1년")
+
+    long = pd.DataFrame({'Date': np.tile(market.dates, len(codes)), 'Code': np.repeat(codes, len(dates)),
+                         **{field: arrays[field].ravel().astype(np.int64) for field in FIELDS}})
+    try:
+        import pyarrow  # noqa: F401
+        has_parquet = True
+    except ImportError:
+        has_parquet = False
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # float64 패널 (price_panel.py 형식, 필드별 .npy)
+        panel_dir = os.path.join(tmp, 'panel')
+        os.makedirs(panel_dir)
+
+        def write_npy():
+            for field in FIELDS:
+                np.save(os.path.join(panel_dir, f'{field}.npy'), arrays[field])
+
+        _, write_s = _best_of(write_npy, 1)
+        size = sum(os.path.getsize(os.path.join(panel_dir, f'{field}.npy')) for field in FIELDS)
+        _, full_s = _best_of(lambda: {f: np.load(os.path.join(panel_dir, f'{f}.npy')) for f in FIELDS}, args.repeat)
+        _, range_s = _best_of(lambda: {f: np.array(np.load(os.path.join(panel_dir, f'{f}.npy'), mmap_mode='r')[rows_idx, lo:])
+                                       for f in FIELDS}, args.repeat)
+        results.append(('float64 .npy', size, write_s, full_s, range_s))
+
+        csv_path = os.path.join(tmp, 'prices.csv')
+        _, write_s = _best_of(lambda: long.to_csv(csv_path, index=False), 1)
+        _, full_s = _best_of(lambda: pd.read_csv(csv_path, dtype={'Code': str}, parse_dates=['Date']), args.repeat)
+
+        def read_csv_range():
+            df = pd.read_csv(csv_path, dtype={'Code': str}, parse_dates=['Date'])
+            return df[df['Code'].isin(sample) & (df['Date'] >= pd.Timestamp(start))]
+
+        _, range_s = _best_of(read_csv_range, args.repeat)
+        results.append(('CSV', os.path.getsize(csv_path), write_s, full_s, range_s))
+
+        if has_parquet:
+            parquet_path = os.path.join(tmp, 'prices.parquet')
+            _, write_s = _best_of(lambda: long.to_parquet(parquet_path, index=False), 1)
+            _, full_s = _best_of(lambda: pd.read_parquet(parquet_path), args.repeat)
+            filters = [('Code', 'in', sample), ('Date', '>=', pd.Timestamp(start))]
+            _, range_s = _best_of(lambda: pd.read_parquet(parquet_path, filters=filters), args.repeat)
+            results.append(('Parquet', os.path.getsize(parquet_path), write_s, full_s, range_s))
+
+        for codec in args.codecs:
+            path = os.path.join(tmp, f'archive-{codec}')
+            _, write_s = _best_of(lambda: write_archive(path, codes, dates, arrays, codec=codec), 1)
+            archive = PriceArchive.open(path)
+            (_, _, decoded), full_s = _best_of(lambda: archive.read(), args.repeat)
+            (_, _, subset), range_s = _best_of(lambda: archive.read(codes=sample, start=start), args.repeat)
+            if not all(np.array_equal(decoded[f], arrays[f], equal_nan=True) and
+                       np.array_equal(subset[f], arrays[f][rows_idx, lo:], equal_nan=True) for f in FIELDS):
+                raise AssertionError(f"압축 보관소({codec})를 푼 값이 원본과 다릅니다.")
+            results.append((f'보관소 {codec}', archive.nbytes(), write_s, full_s, range_s))
+
+    base = results[0][1]
+    print(f"{'형식':<14}{'크기(MiB)':>11}{'압축률':>8}{'쓰기(s)':>9}{'전체 풀기(s)':>13}{'M값/s':>9}{'기간·종목(ms)':>14}")
+    print("-" * 78)
+    for name, size, write_s, full_s, range_s in results:
+        print(f"{name:<14}{size / 1024 ** 2:>11.1f}{base / size:>7.1f}x{write_s:>9.2f}{full_s:>13.3f}"
+              f"{n_values / full_s / 1e6:>9.1f}{range_s * 1000:>14.1f}")
+    if not has_parquet:
+        print("(pyarrow가 설치되어 있지 않아 Parquet은 건너뜀)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="성능 벤치마크")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    memory = subparsers.add_parser('memory', help="결과 레코드 표현별 메모리 사용량 비교")
+    memory.add_argument('--tickers', type=int, default=2500, help="종목 수 (기본값: 2500)")
+    memory.add_argument('--days', type=int, default=250, help="이력 일수 (기본값: 250)")
+    memory.set_defaults(func=bench_memory)
+
+    load = subparsers.add_parser('load', help="합성 시장 기반 스크리너/대시보드 부하 테스트")
+    load.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100], help="운영 규모 대비 배율 (기본값: 1 10 100)")
+    load.add_argument('--engine', type=str, default='all', choices=['screen', 'dashboard', 'all'], help="측정할 엔진")
+    load.add_argument('--tickers', type=int, default=2500, help="1× 기준 종목 수 (기본값: 2500)")
+    load.add_argument('--deal-rank-size', type=int, default=30, help="1× 기준 순매수 상위 종목 수 (기본값: 30)")
+    load.add_argument('--years', type=float, default=10, help="시세 기간(년) (기본값: 10)")
+    load.add_argument('--days', type=int, default=2, help="연속 순매수 일수 (기본값: 2)")
+    load.add_argument('--seed', type=int, default=42, help="난수 시드 (기본값: 42)")
+    load.add_argument('--verbose', action='store_true', help="배율별 단계 요약표 출력")
+    load.set_defaults(func=bench_load)
+
+    e2e = subparsers.add_parser('e2e', help="로컬 모의 서버 대상 종단 간 처리량 측정")
+    e2e.add_argument('--script', type=str, default='unified_dashboard_html.py', help="실행할 스크립트 (기본값: unified_dashboard_html.py)")
+    e2e.add_argument('--tickers', type=int, default=2500, help="합성 시장 종목 수 (기본값: 2500)")
+    e2e.add_argument('--years', type=float, default=2, help="시세 기간(년) (기본값: 2)")
+    e2e.add_argument('--seed', type=int, default=42, help="난수 시드 (기본값: 42)")
+    e2e.add_argument('--latency-ms', type=float, default=0, help="평균 응답 지연(ms)")
+    e2e.add_argument('--jitter-ms', type=float, default=0, help="응답 지연 편차(ms)")
+    e2e.add_argument('--error-rate', type=float, default=0.0, help="503 오류 비율 (0~1)")
+    e2e.add_argument('--rate-limit', type=float, default=None, help="초당 허용 요청 수 (초과 시 429)")
+    e2e.add_argument('--verbose', action='store_true', help="스크립트 출력 표시")
+    e2e.add_argument('script_args', nargs=argparse.REMAINDER, help="스크립트에 전달할 인자 (-- 뒤에 지정)")
+    e2e.set_defaults(func=bench_e2e)
+
+    importtime = subparsers.add_parser('importtime', help="krx.py 서브커맨드별 import 시간 분석 (-X importtime)")
+    importtime.add_argument('commands', nargs='*',
+                            help="측정할 서브커맨드 (기본값: 전체, 콘솔 대시보드는 dashboard-console)")
+    importtime.add_argument('--top', type=int, default=8, help="표시할 상위 패키지 수 (기본값: 8)")
+    importtime.add_argument('--repeat', type=int, default=3, help="반복 측정 횟수, 최솟값 사용 (기본값: 3)")
+    importtime.set_defaults(func=bench_importtime)
+
+    panel = subparsers.add_parser('panel', help="공유 시세 패널(memmap)과 작업자별 복사본의 메모리/시작 시간 비교")
+    panel.add_argument('--tickers', type=int, default=2500, help="종목 수 (기본값: 2500)")
+    panel.add_argument('--years', type=float, default=10, help="시세 기간(년) (기본값: 10)")
+    panel.add_argument('--seed', type=int, default=42, help="난수 시드 (기본값: 42)")
+    panel.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help="작업자 수 (기본값: 1 2 4 8)")
+    panel.add_argument('--modes', type=str, nargs='+', default=['mmap', 'copy'], choices=['mmap', 'copy'],
+                       help="측정 방식 (기본값: mmap copy)")
+    panel.set_defaults(func=bench_panel)
+
+    scan = subparsers.add_parser('scan', help="분할 스캔(scan_queue.py) 작업자 수별 처리량과 병합 결과 일치 확인")
+    scan.add_argument('--tickers', type=int, default=600, help="합성 시장 종목 수 (기본값: 600)")
+    scan.add_argument('--years', type=float, default=1, help="시세 기간(년) (기본값: 1)")
+    scan.add_argument('--seed', type=int, default=42, help="난수 시드 (기본값: 42)")
+    scan.add_argument('--latency-ms', type=float, default=20, help="평균 응답 지연(ms) (기본값: 20)")
+    scan.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help="작업자 프로세스 수 (기본값: 1 2 4)")
+    scan.add_argument('--threads', type=int, default=4, help="작업자별 동시 분석 종목 수 (기본값: 4)")
+    scan.add_argument('--shard-size', type=int, default=25, help="묶음당 종목 수 (기본값: 25)")
+    scan.set_defaults(func=bench_scan)
+
+    archive = subparsers.add_parser('archive', help="압축 시세 보관소와 float64/CSV/Parquet의 크기, 풀기 처리량 비교")
+    archive.add_argument('--tickers', type=int, default=2500, help="종목 수 (기본값: 2500)")
+    archive.add_argument('--years', type=float, default=10, help="시세 기간(년) (기본값: 10)")
+    archive.add_argument('--seed', type=int, default=42, help="난수 시드 (기본값: 42)")
+    archive.add_argument('--sample', type=int, default=100, help="기간·종목 조회 종목 수 (기본값: 100)")
+    archive.add_argument('--codecs', type=str, nargs='+', default=['zlib', 'lzma'], choices=['zlib', 'lzma'],
+                         help="보관소 압축 방식 (기본값: zlib lzma)")
+    archive.add_argument('--repeat', type=int, default=3, help="읽기 반복 측정 횟수, 최솟값 사용 (기본값: 3)")
+    archive.set_defaults(func=bench_archive)
+
+    args = parser.parse_args()
+    if getattr(args, 'script_args', None) and args.script_args[0] == '--':
+        args.script_args = args.script_args[1:]
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+장중 돌파 감시 (AUTOMATION_ROADMAP.md Phase 2)
+정규장(거래일 달력 기준, 휴장일과 개장 시간 변경일 반영) 동안 1분마다 관심 종목 시세를 동시에 조회하고, 미리 계산한 저항선(50일 고점)과
+20일 평균 거래량/거래대금을 기준으로 돌파 신호와 거짓 신호를 종목별로 점진 평가해 알림을 보냅니다.
+
+- 시세: Naver 실시간 시세 API (여러 종목을 한 요청으로 조회, --batch-size 단위로 나눠 --concurrency 만큼 동시 요청)
+- 돌파 신뢰도: 거래량 배율 > 1.3 (+40), 거래대금 배율 > 1.5 (+40), 저항 대비 +2% 초과 (+20), 70점 이상이면 알림
+- 거짓 신호: 1분봉 고가가 저항을 넘었다가 종가가 저항의 99% 미만, 거래량/거래대금 부족, KOSPI -2% 초과 하락
+- 알림 채널: stdout, file:<경로> (JSON Lines), webhook:<URL> (JSON POST)
+
+사용 예:
+    python breakout_watcher.py --watchlist analysis_result.csv --sink stdout --sink file:alerts.jsonl
+    python breakout_watcher.py --codes 005930 000660 --once --ignore-hours
+"""
+
+import argparse
+import asyncio
+import csv
+import dataclasses
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import krx_calendar
+from http_client import fetch, get_session, polling_url
+from market_data import get_ohlcv
+from profiling import stage, profiler, add_profile_arguments, configure_from_args
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+KST = ZoneInfo('Asia/Seoul')
+
+# 감시 기준 (AUTOMATION_ROADMAP.md 2.2 / 2.4)
+RESISTANCE_DAYS = 50
+AVERAGE_DAYS = 20
+MIN_CONFIDENCE = 70
+SPIKE_CLOSE_RATIO = 0.99
+WEAK_VOLUME_RATIO = 1.1
+WEAK_VALUE_RATIO = 1.2
+MARKET_DROP_PCT = -2.0
+
+
+@dataclass(slots=True)
+class Levels:
+    """장 시작 전에 계산하는 종목별 기준값"""
+    code: str
+    resistance: float
+    avg_volume: float
+    avg_value: float
+
+
+@dataclass(slots=True)
+class Quote:
+    """실시간 시세 한 건 (누적 거래량/거래대금 포함)"""
+    code: str
+    name: str
+    price: float
+    high: float
+    low: float
+    acc_volume: int
+    acc_value: int
+
+
+@dataclass(slots=True)
+class WatchState:
+    """종목별 감시 상태. 직전 조회 값으로 조회 간격 동안의 1분봉을 만듭니다."""
+    last_price: float = None
+    last_high: float = None
+    alerted: bool = False
+
+
+@dataclass(slots=True)
+class Alert:
+    code: str
+    name: str
+    price: float
+    resistance: float
+    breakout_pct: float
+    volume_ratio: float
+    value_ratio: float
+    confidence: int
+    time: str
+
+    def message(self):
+        return (
+            f"🚀 {self.name} ({self.code})\n\n"
+            f"현재가: {self.price:,.0f}원\n"
+            f"저항선: {self.resistance:,.0f}원\n"
+            f"돌파폭: +{self.breakout_pct:.2f}%\n\n"
+            f"거래대금: {self.value_ratio:.1f}배\n"
+            f"거래량: {self.volume_ratio:.1f}배\n\n"
+            f"신뢰도: {self.confidence}점"
+        )
+
+
+# ---------- 알림 채널 ----------
+class StdoutSink:
+    def emit(self, alert):
+        print(f"[{alert.time}]\n{alert.message()}\n", flush=True)
+
+
+class FileSink:
+    """알림을 JSON Lines 형식으로 파일에 추가합니다."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def emit(self, alert):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(dataclasses.asdict(alert), ensure_ascii=False) + '\n')
+
+
+class WebhookSink:
+    """알림을 JSON으로 POST 합니다. (텔레그램/카카오톡 등은 중계 서버에서 변환하는 것을 가정한 기본 구현)"""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def emit(self, alert):
+        payload = dict(dataclasses.asdict(alert), text=alert.message())
+        try:
+            get_session().post(self.url, json=payload, timeout=self.timeout).raise_for_status()
+        except Exception as e:
+            logging.error(f"웹훅 전송 오류: {self.url} - {e}")
+
+
+def make_sink(spec):
+    """'stdout', 'file:<경로>', 'webhook:<URL>' 형식의 설정으로 알림 채널을 만듭니다."""
+    kind, _, target = spec.partition(':')
+    if kind == 'stdout':
+        return StdoutSink()
+    if kind == 'file' and target:
+        return FileSink(target)
+    if kind == 'webhook' and target:
+        return WebhookSink(target)
+    raise ValueError(f"알 수 없는 알림 채널: {spec}")
+
+
+# ---------- 기준값 ----------
+def compute_levels(code, today=None):
+    """일봉으로 저항선(50일 고점)과 20일 평균 거래량/거래대금을 계산합니다. 오늘 봉은 제외합니다."""
+    today = today or datetime.now(KST).date()
+    start = krx_calendar.trading_days_back(today, RESISTANCE_DAYS).strftime('%Y-%m-%d')
+    df = get_ohlcv(code, start=start)
+    df = df[df.index.date < today]
+    if len(df) < AVERAGE_DAYS:
+        return None
+    recent = df.tail(AVERAGE_DAYS)
+    return Levels(
+        code=code,
+        resistance=float(df['High'].tail(RESISTANCE_DAYS).max()),
+        avg_volume=float(recent['Volume'].mean()),
+        avg_value=float((recent['Close'] * recent['Volume']).mean()),
+    )
+
+
+# ---------- 시세 ----------
+def fetch_quotes(codes, index='KOSPI'):
+    """여러 종목의 실시간 시세를 한 번에 조회합니다. ({코드: Quote}, 지수 등락률 %)"""
+    query = f"SERVICE_ITEM:{','.join(codes)}"
+    if index:
+        query += f"|SERVICE_INDEX:{index}"
+    data = fetch(polling_url(f"/api/realtime?query={query}")).json()
+    quotes, index_change = {}, None
+    for area in data.get('result', {}).get('areas', []):
+        for item in area.get('datas', []):
+            if area.get('name') == 'SERVICE_INDEX':
+                index_change = float(item.get('cr', 0))
+            elif item.get('nv'):
+                quotes[item['cd']] = Quote(
+                    code=item['cd'],
+                    name=item.get('nm', item['cd']),
+                    price=float(item['nv']),
+                    high=float(item.get('hv', item['nv'])),
+                    low=float(item.get('lv', item['nv'])),
+                    acc_volume=int(item.get('aq', 0)),
+                    acc_value=int(item.get('aa', 0)),
+                )
+    return quotes, index_change
+
+
+def session_fraction(now):
+    """장 시작 이후 경과 비율 (거래량 배율 보정용, 장외 시간이면 1). 개장/폐장 시간이 다른 날도 반영합니다."""
+    bounds = krx_calendar.session_bounds(now.date())
+    if bounds is None:
+        return 1.0
+    opened, closed = bounds
+    minutes = (closed - opened).total_seconds() / 60
+    elapsed = (now - opened).total_seconds() / 60
+    if elapsed <= 0 or elapsed >= minutes:
+        return 1.0
+    return max(elapsed, 1) / minutes
+
+
+def is_market_open(now):
+    return krx_calendar.is_session_open(now)
+
+
+# ---------- 신호 평가 ----------
+def evaluate(levels, quote, state, fraction, index_change=None):
+    """직전 조회 이후의 1분봉을 만들고 돌파/거짓 신호를 판정합니다. 알림 대상이면 Alert를 반환합니다."""
+    # 조회 사이에 장중 고가가 갱신되었다면 그 고가가 이번 1분봉의 고가입니다.
+    if state.last_high is not None and quote.high > state.last_high:
+        bar_high = quote.high
+    else:
+        bar_high = max(state.last_price or quote.price, quote.price)
+    bar_close = quote.price
+    state.last_price, state.last_high = quote.price, quote.high
+
+    resistance = levels.resistance
+    if state.alerted and bar_close < resistance * SPIKE_CLOSE_RATIO:
+        state.alerted = False  # 돌파 실패 후 저항 아래로 내려오면 다시 감시합니다.
+    if state.alerted or bar_high <= resistance:
+        return None
+
+    volume_ratio = quote.acc_volume / (levels.avg_volume * fraction) if levels.avg_volume else 0.0
+    value_ratio = quote.acc_value / (levels.avg_value * fraction) if levels.avg_value else 0.0
+
+    # 거짓 신호 필터
+    if bar_close < resistance * SPIKE_CLOSE_RATIO:
+        return None
+    if volume_ratio < WEAK_VOLUME_RATIO and value_ratio < WEAK_VALUE_RATIO:
+        return None
+    if index_change is not None and index_change < MARKET_DROP_PCT:
+        return None
+    if bar_close <= resistance:
+        return None
+
+    confidence = 0
+    if volume_ratio > 1.3:
+        confidence += 40
+    if value_ratio > 1.5:
+        confidence += 40
+    if bar_close > resistance * 1.02:
+        confidence += 20
+    if confidence < MIN_CONFIDENCE:
+        return None
+
+    state.alerted = True
+    return Alert(
+        code=quote.code,
+        name=quote.name,
+        price=bar_close,
+        resistance=resistance,
+        breakout_pct=(bar_close / resistance - 1) * 100,
+        volume_ratio=volume_ratio,
+        value_ratio=value_ratio,
+        confidence=confidence,
+        time=datetime.now(KST).strftime('%Y-%m-%d %H:%M:%S'),
+    )
+
+
+# ---------- 감시 루프 ----------
+class BreakoutWatcher:
+    def __init__(self, codes, sinks, batch_size=50, concurrency=8, interval=60, ignore_hours=False):
+        self.codes = list(dict.fromkeys(codes))
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.interval = interval
+        self.ignore_hours = ignore_hours
+        self.levels = {}
+        self.states = {code: WatchState() for code in self.codes}
+
+    async def prepare(self):
+        """모든 종목의 기준값을 동시에 계산합니다."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def load(code):
+            async with semaphore:
+                try:
+                    return code, await asyncio.to_thread(compute_levels, code)
+                except Exception as e:
+                    logging.error(f"{code} 기준값 계산 오류: {e}")
+                    return code, None
+
+        with stage('watcher.prepare'):
+            for code, levels in await asyncio.gather(*(load(code) for code in self.codes)):
+                if levels is not None:
+                    self.levels[code] = levels
+        logging.info(f"기준값 계산 완료: {len(self.levels)}/{len(self.codes)} 종목")
+
+    async def poll(self):
+        """관심 종목 시세를 배치 단위로 동시에 조회합니다."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        codes = [code for code in self.codes if code in self.levels]
+        batches = [codes[i:i + self.batch_size] for i in range(0, len(codes), self.batch_size)]
+
+        async def load(batch, with_index):
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(fetch_quotes, batch, 'KOSPI' if with_index else None)
+                except Exception as e:
+                    logging.error(f"시세 조회 오류 ({batch[0]} 외 {len(batch) - 1}종목): {e}")
+                    return {}, None
+
+        quotes, index_change = {}, None
+        for batch_quotes, change in await asyncio.gather(*(load(b, i == 0) for i, b in enumerate(batches))):
+            quotes.update(batch_quotes)
+            if change is not None:
+                index_change = change
+        return quotes, index_change
+
+    async def cycle(self):
+        """한 번 조회하고 모든 종목을 평가해 알림을 보냅니다. (알림 목록, 소요 시간)"""
+        started = time.perf_counter()
+        with stage('watcher.cycle'):
+            quotes, index_change = await self.poll()
+            fraction = 1.0 if self.ignore_hours else session_fraction(datetime.now(KST))
+            alerts = []
+            for code, quote in quotes.items():
+                alert = evaluate(self.levels[code], quote, self.states[code], fraction, index_change)
+                if alert:
+                    alerts.append(alert)
+            for alert in alerts:
+                for sink in self.sinks:
+                    await asyncio.to_thread(sink.emit, alert)
+        elapsed = time.perf_counter() - started
+        logging.info(f"조회 {len(quotes)}/{len(self.levels)} 종목, KOSPI {index_change}%, 알림 {len(alerts)}건 ({elapsed:.2f}s)")
+        if elapsed > self.interval * 0.5:
+            logging.warning(f"조회 주기 {self.interval}s 대비 처리 시간이 깁니다: {elapsed:.2f}s")
+        return alerts, elapsed
+
+    async def run(self, once=False, max_cycles=None):
+        await self.prepare()
+        cycles = 0
+        while True:
+            now = datetime.now(KST)
+            if not self.ignore_hours and not is_market_open(now):
+                bounds = krx_calendar.session_bounds(now.date())
+                if once or bounds is None or now >= bounds[1]:
+                    logging.info("장 운영 시간이 아닙니다. 감시를 종료합니다.")
+                    return
+                opening = bounds[0]
+                logging.info(f"장 시작까지 대기: {opening:%H:%M}")
+                await asyncio.sleep((opening - now).total_seconds())
+                continue
+
+            next_at = time.monotonic() + self.interval
+            await self.cycle()
+            cycles += 1
+            if once or (max_cycles and cycles >= max_cycles):
+                return
+            await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+
+
+def read_watchlist(path):
+    """한 줄에 종목 코드 하나인 텍스트 파일 또는 '코드' 컬럼이 있는 CSV(analysis_result.csv)를 읽습니다."""
+    with open(path, encoding='utf-8-sig') as f:
+        if path.endswith('.csv'):
+            return [row['코드'].zfill(6) for row in csv.DictReader(f) if row.get('코드')]
+        return [line.strip().zfill(6) for line in f if line.strip() and not line.startswith('#')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="장중 관심 종목 돌파 감시")
+    parser.add_argument('--codes', type=str, nargs='*', default=[], help="감시할 종목 코드")
+    parser.add_argument('--watchlist', type=str, help="관심 종목 파일 (코드 목록 .txt 또는 analysis_result.csv 형식)")
+    parser.add_argument('--sink', type=str, action='append',
+                        help="알림 채널: stdout, file:<경로>, webhook:<URL> (여러 번 지정 가능, 기본값: stdout)")
+    parser.add_argument('--interval', type=int, default=60, help="조회 주기(초) (기본값: 60)")
+    parser.add_argument('--batch-size', type=int, default=50, help="요청당 종목 수 (기본값: 50)")
+    parser.add_argument('--concurrency', type=int, default=8, help="동시 요청 수 (기본값: 8)")
+    parser.add_argument('--once', action='store_true', help="한 번만 조회하고 종료")
+    parser.add_argument('--cycles', type=int, help="지정한 횟수만큼 조회하고 종료")
+    parser.add_argument('--ignore-hours', action='store_true', help="장 운영 시간과 관계없이 감시 (테스트용)")
+    add_profile_arguments(parser)
+
+    args = parser.parse_args()
+    configure_from_args(args)
+
+    codes = list(args.codes)
+    if args.watchlist:
+        codes += read_watchlist(args.watchlist)
+    if not codes:
+        parser.error("--codes 또는 --watchlist로 감시할 종목을 지정하세요.")
+
+    watcher = BreakoutWatcher(
+        codes,
+        sinks=[make_sink(spec) for spec in (args.sink or ['stdout'])],
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        interval=args.interval,
+        ignore_hours=args.ignore_hours,
+    )
+    try:
+        asyncio.run(watcher.run(once=args.once, max_cycles=args.cycles))
+    except KeyboardInterrupt:
+        pass
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
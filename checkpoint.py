@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+전 종목 수집 체크포인트와 진행률
+전 종목 시세/상세 페이지 수집은 오래 걸리므로, 끝날 즈음 네트워크 오류가 나도 처음부터 다시 하지 않도록
+종목(작업 단위)이 끝날 때마다 결과를 단계별 기록 파일에 덧붙이고, --resume으로 다시 실행하면 끝난 종목을 건너뜁니다.
+
+    <체크포인트 디렉터리>/run.json        실행 설정 (설정이 다르면 이어 하지 않고 새로 시작)
+    <체크포인트 디렉터리>/<단계>.log      (키, 결과) pickle 레코드를 차례로 덧붙인 파일
+
+마지막 레코드가 쓰다 만 상태(강제 종료)여도 그 앞까지는 읽습니다. 실패한 종목은 기록하지 않으므로 이어 하면 다시 시도합니다.
+실행이 끝나면 호출한 쪽에서 finish()로 디렉터리를 지웁니다.
+
+진행률은 표준 오류에 '완료/전체, 처리량(건/초), 남은 시간'으로 표시하며, 처리량은 이번 실행에서 실제로 처리한 종목으로 잽니다.
+"""
+
+import json
+import logging
+import os
+import pickle
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+RUN_FILE = 'run.json'
+
+
+class Progress:
+    """완료 건수와 측정한 처리량으로 남은 시간을 표시합니다. (스레드 안전)"""
+
+    def __init__(self, total, label, done=0, interval=0.5, stream=None):
+        self.total = total
+        self.label = label
+        self.done = done
+        self.skipped = done
+        self.failed = 0
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.started = time.perf_counter()
+        self._last_print = 0.0
+        self._lock = threading.Lock()
+
+    def rate(self):
+        """이번 실행에서 처리한 건수 / 경과 시간 (건/초)"""
+        elapsed = time.perf_counter() - self.started
+        processed = self.done - self.skipped + self.failed
+        return processed / elapsed if elapsed > 0 and processed else 0.0
+
+    def eta(self):
+        """남은 시간(초). 처리량을 아직 모르면 None"""
+        rate = self.rate()
+        return (self.total - self.done - self.failed) / rate if rate else None
+
+    def update(self, ok=True):
+        with self._lock:
+            if ok:
+                self.done += 1
+            else:
+                self.failed += 1
+            now = time.perf_counter()
+            if now - self._last_print >= self.interval:
+                self._last_print = now
+                self._print('\r')
+
+    def _print(self, prefix):
+        eta = self.eta()
+        eta_str = '--:--' if eta is None else time.strftime('%H:%M:%S' if eta >= 3600 else '%M:%S', time.gmtime(eta))
+        failed = f", 실패 {self.failed}" if self.failed else ''
+        self.stream.write(f"{prefix}{self.label}: {self.done}/{self.total} "
+                          f"({self.done / self.total:.0%}{failed}) {self.rate():.1f}건/s, 남은 시간 {eta_str}  ")
+        self.stream.flush()
+
+    def finish(self):
+        if self.total:
+            self._print('\r')
+            self.stream.write('\n')
+            self.stream.flush()
+        elapsed = time.perf_counter() - self.started
+        logging.info(f"{self.label}: {self.done - self.skipped}건 처리, {self.skipped}건 건너뜀(이어 하기), "
+                     f"{self.failed}건 실패 ({elapsed:.1f}s)")
+
+
+class StageLog:
+    """단계 하나의 완료 기록 (키 -> 결과)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._load()
+        self._file = open(path, 'ab')
+
+    def _load(self):
+        size = os.path.getsize(self.path)
+        offset = 0
+        with open(self.path, 'rb') as f:
+            while offset < size:
+                try:
+                    key, value = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError, ValueError, TypeError, AttributeError, IndexError):
+                    break
+                self.done[key] = value
+                offset = f.tell()
+        if offset < size:
+            # 강제 종료로 마지막 레코드가 잘렸으면 그 앞까지만 사용하고 뒷부분을 잘라냅니다.
+            logging.warning(f"체크포인트 마지막 레코드가 손상되어 버립니다: {self.path}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(offset)
+
+    def record(self, key, value):
+        data = pickle.dumps((key, value), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.done[key] = value
+
+    def close(self):
+        self._file.close()
+
+
+class Checkpoint:
+    """실행 하나의 체크포인트 디렉터리. resume=False면 기존 기록을 지우고 새로 시작합니다."""
+
+    def __init__(self, path, config=None, resume=False):
+        self.path = path
+        self.config = config or {}
+        self._stages = {}
+        run_path = os.path.join(path, RUN_FILE)
+        if resume and os.path.exists(run_path):
+            with open(run_path, encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved != self.config:
+                logging.warning(f"체크포인트 설정이 달라 이어 하지 않고 새로 시작합니다: {path} ({saved} -> {self.config})")
+                resume = False
+        elif resume:
+            logging.info(f"이어 할 체크포인트가 없어 새로 시작합니다: {path}")
+        if not resume and os.path.isdir(path):
+            shutil.rmtree(path)
+        os.makedirs(path, exist_ok=True)
+        with open(run_path, 'w', encoding='utf-8') as f:
+            json.dump(self.config, f)
+
+    def stage(self, name):
+        if name not in self._stages:
+            self._stages[name] = StageLog(os.path.join(self.path, f'{name}.log'))
+        return self._stages[name]
+
+    def close(self):
+        for log in self._stages.values():
+            log.close()
+
+    def finish(self):
+        """모든 단계가 끝났으면 체크포인트 디렉터리를 지웁니다."""
+        self.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def run_stage(checkpoint, name, keys, func, max_workers=8, label=None):
+    """keys마다 func(key)를 동시에 실행하고 {키: 결과}를 반환합니다.
+
+    checkpoint가 있으면 기록된 키는 건너뛰고 기록된 결과를 쓰며, 끝난 키는 바로 기록합니다.
+    func가 None을 반환하거나 예외를 내면 실패로 세고 기록하지 않습니다. (결과에서도 빠짐)
+    """
+    keys = list(dict.fromkeys(keys))
+    log = checkpoint.stage(name) if checkpoint else None
+    results = {key: log.done[key] for key in keys if log and key in log.done}
+    pending = [key for key in keys if key not in results]
+    progress = Progress(len(keys), label or name, done=len(results))
+
+    def call(key):
+        try:
+            return func(key)
+        except Exception as e:
+            logging.error(f"{key} 처리 오류: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(call, key): key for key in pending}
+        for future in as_completed(futures):
+            key, value = futures[future], future.result()
+            if value is None:
+                progress.update(ok=False)
+                continue
+            if log:
+                log.record(key, value)
+            results[key] = value
+            progress.update()
+    progress.finish()
+    return {key: results[key] for key in keys if key in results}
+
+
+def add_checkpoint_arguments(parser):
+    """전 종목 수집 스크립트에 --resume, --checkpoint 옵션을 추가합니다."""
+    parser.add_argument('--resume', action='store_true',
+                        help="중단된 실행의 체크포인트에서 이어 하기 (끝난 종목 건너뜀)")
+    parser.add_argument('--checkpoint', type=str, metavar='DIR',
+                        help="체크포인트 디렉터리 (기본값: 출력 경로 + '.checkpoint')")
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+일별 횡단면 백분위 지표
+PER < 15 같은 절대 기준은 업종과 시장 국면에 따라 의미가 크게 달라지므로, 하루 한 번 전 종목의
+밸류에이션/모멘텀/수급 지표를 모아 시장 전체와 업종(sector_index의 업종 표) 안에서의 백분위를 계산해 저장합니다.
+스크리너/대시보드는 저장된 값을 읽어 "업종 내 PBR 하위 10%" 같은 규칙을 다시 계산 없이 씁니다.
+
+    밸류에이션  per, pbr, roe             종목 상세 페이지 (동시 조회, 0 이하 PER/PBR은 순위에서 제외)
+    모멘텀      ret_20, ret_60, ret_120   N거래일 수익률 (%), high_ratio: 종가 / 52주 최고가(고가 기준)
+    수급        money_5, money_20         외국인+기관 N일 순매수 금액 / 시가총액 (%) (investor_flow 패널이 있을 때)
+
+백분위는 오름차순 (0, 1] 값이고 같은 값은 평균 순위입니다. 지표 x마다 x_pct(시장 전체), x_sector_pct(업종 안)를 저장하며,
+업종은 종목이 속한 첫 번째 업종입니다. 순위는 pandas rank / groupby.rank로 전 종목을 한 번에 계산합니다.
+
+사용 예:
+    python cross_section.py build --panel panel --flows panel/flows --workers 16   # 오늘 지표 계산/저장
+    python cross_section.py show --codes 005930 000660
+    python cross_section.py show --sort pbr_sector_pct --top 20
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+
+import numpy as np
+
+from checkpoint import Checkpoint, run_stage, add_checkpoint_arguments
+from profiling import stage, profiler, add_profile_arguments, configure_from_args
+from results_store import DEFAULT_DB_PATH, _print_rows
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+VALUATION = ('per', 'pbr', 'roe')
+MOMENTUM_WINDOWS = (20, 60, 120)
+FLOW_WINDOWS = (5, 20)
+HIGH_WINDOW = 252
+
+# (feature_date, code, metric) 기본 키: 날짜별 전 종목 조회가 기본 키 범위 검색이 됩니다.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cross_section (
+    feature_date TEXT NOT NULL,
+    code         TEXT NOT NULL,
+    metric       TEXT NOT NULL,
+    sector       TEXT,
+    value        REAL,
+    pct          REAL,
+    sector_pct   REAL,
+    PRIMARY KEY (feature_date, code, metric)
+) WITHOUT ROWID;
+"""
+
+
+def rank_features(features, sectors):
+    """(종목 x 지표) DataFrame에 시장 전체/업종 안 백분위 열(<지표>_pct, <지표>_sector_pct)을 붙여 반환합니다."""
+    import pandas as pd
+
+    sector = pd.Series(sectors, dtype=object).reindex(features.index)
+    pct = features.rank(pct=True)
+    sector_pct = features.groupby(sector, dropna=True).rank(pct=True).reindex(features.index)
+    table = pd.concat([features, pct.add_suffix('_pct'), sector_pct.add_suffix('_sector_pct')], axis=1)
+    table.insert(0, 'sector', sector)
+    return table
+
+
+def _fetch_fundamentals(code):
+    from bs4 import BeautifulSoup
+    from find_stocks import parse_fundamentals
+    from http_client import naver_url, fetch
+
+    # 전 종목을 한 번씩만 읽으므로 페이지 캐시(fetch_soup)를 거치지 않습니다.
+    text = fetch(naver_url(f'/item/main.naver?code={code}')).text
+    with stage('bs4.parse'):
+        per, pbr, roe, _ = parse_fundamentals(BeautifulSoup(text, 'html.parser'))
+    return tuple(np.nan if v is None else v for v in (per, pbr, roe))
+
+
+def _price_matrices(codes, panel=None, max_workers=8, checkpoint=None):
+    """(종목 x 날짜) 종가, 고가 행렬. 패널에 없는 종목은 get_ohlcv로 동시에 받습니다."""
+    import pandas as pd
+
+    rows = {}
+    if panel is not None:
+        for code in codes:
+            if code in panel:
+                rows[code] = pd.DataFrame({field: np.asarray(panel.row(code, field)) for field in ('Close', 'High')},
+                                          index=panel.date_index)
+    missing = [code for code in codes if code not in rows]
+    if missing:
+        from market_data import get_ohlcv, latest_session
+        import krx_calendar
+
+        start = krx_calendar.trading_days_back(latest_session(), HIGH_WINDOW + 10)
+
+        rows.update(run_stage(checkpoint, 'price_rows', missing,
+                              lambda code: get_ohlcv(code, start=start)[['Close', 'High']],
+                              max_workers=max_workers, label='시세 조회'))
+    matrices = []
+    for field in ('Close', 'High'):
+        frame = pd.DataFrame({code: df[field] for code, df in rows.items()}).reindex(columns=codes).sort_index()
+        # 거래가 없던 날의 종가는 직전 종가로 채우고, 고가는 비워 둡니다. (nanmax에서 빠짐)
+        matrices.append((frame.ffill() if field == 'Close' else frame).to_numpy().T)
+    return tuple(matrices)
+
+
+def momentum_features(close, high=None, windows=MOMENTUM_WINDOWS, high_window=HIGH_WINDOW):
+    """(종목 x 날짜) 종가 행렬의 마지막 날 기준 N거래일 수익률(%)과 52주 최고가 대비 비율
+
+    high(고가 행렬)가 있으면 52주 최고가는 최근 high_window거래일 고가의 최댓값이고, 없으면 종가의 최댓값입니다.
+    """
+    last = close[:, -1]
+    high = close if high is None else high
+    features = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for window in windows:
+            base = close[:, -1 - window] if close.shape[1] > window else np.full(len(close), np.nan)
+            features[f'ret_{window}'] = (last / base - 1) * 100
+        high = np.nanmax(high[:, -high_window:], axis=1) if high.shape[1] else np.full(len(high), np.nan)
+        features['high_ratio'] = last / high
+    return features
+
+
+def build_features(codes, sectors, panel=None, flows=None, max_workers=8, checkpoint=None):
+    """전 종목 지표를 모아 백분위까지 계산한 표를 반환합니다.
+
+    checkpoint가 있으면 종목별 상세 페이지/시세 단계 결과를 기록하고, 이어 하면 기록된 종목은 다시 받지 않습니다.
+    """
+    import pandas as pd
+
+    codes = list(dict.fromkeys(codes))
+    with stage('cross_section.valuation'):
+        valuation = run_stage(checkpoint, 'valuation', codes, _fetch_fundamentals, max_workers, label='펀더멘탈 조회')
+    features = pd.DataFrame.from_dict(valuation, orient='index', columns=list(VALUATION)).reindex(codes)
+    features.index.name = 'code'
+    # 적자(0 이하) PER/PBR은 싸다는 뜻이 아니므로 순위에서 뺍니다.
+    features[['per', 'pbr']] = features[['per', 'pbr']].where(features[['per', 'pbr']] > 0)
+
+    with stage('cross_section.momentum'):
+        close, high = _price_matrices(codes, panel, max_workers, checkpoint)
+        for name, values in momentum_features(close, high).items():
+            features[name] = values
+
+    if flows is not None:
+        from investor_flow import flow_features
+        with stage('cross_section.flows'):
+            metrics = flow_features(flows, FLOW_WINDOWS)
+            for window in FLOW_WINDOWS:
+                features[f'money_{window}'] = metrics[f'money_{window}'].iloc[-1].reindex(codes).to_numpy()
+
+    with stage('cross_section.rank'):
+        return rank_features(features, sectors)
+
+
+class CrossSectionStore:
+    """날짜별 횡단면 지표/백분위를 SQLite 파일에 저장하고 조회하는 클래스"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def save(self, feature_date, table):
+        """rank_features 결과를 하나의 트랜잭션으로 저장합니다. 같은 날짜의 기존 값은 덮어씁니다."""
+        metrics = [c for c in table.columns if c != 'sector' and not c.endswith('_pct')]
+
+        def cell(value):
+            return None if value != value else float(value)
+
+        rows = [(feature_date, code, metric, sector, cell(value), cell(pct), cell(sector_pct))
+                for metric in metrics
+                for code, sector, value, pct, sector_pct in zip(
+                    table.index, table['sector'].where(table['sector'].notna(), None),
+                    table[metric], table[f'{metric}_pct'], table[f'{metric}_sector_pct'])]
+        with self.conn:
+            self.conn.execute("DELETE FROM cross_section WHERE feature_date = ?", (feature_date,))
+            self.conn.executemany(
+                "INSERT INTO cross_section (feature_date, code, metric, sector, value, pct, sector_pct) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        logging.info(f"횡단면 지표 {len(table)}종목 × {len(metrics)}개를 '{self.path}'에 저장했습니다. ({feature_date})")
+        return len(rows)
+
+    def latest_date(self, on_or_before=None):
+        sql = "SELECT MAX(feature_date) FROM cross_section"
+        params = ()
+        if on_or_before:
+            sql += " WHERE feature_date <= ?"
+            params = (on_or_before,)
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def load(self, feature_date=None, codes=None):
+        """feature_date(기본값: 마지막 날짜)의 표를 rank_features와 같은 (종목 x 열) DataFrame으로 읽습니다."""
+        import pandas as pd
+
+        feature_date = feature_date or self.latest_date()
+        if feature_date is None:
+            return pd.DataFrame()
+        sql = "SELECT code, metric, sector, value, pct, sector_pct FROM cross_section WHERE feature_date = ?"
+        params = [feature_date]
+        if codes:
+            codes = list(codes)
+            sql += f" AND code IN ({','.join('?' * len(codes))})"
+            params += codes
+        long = pd.DataFrame(self.conn.execute(sql, params).fetchall(),
+                            columns=['code', 'metric', 'sector', 'value', 'pct', 'sector_pct'])
+        if long.empty:
+            return pd.DataFrame()
+        wide = long.pivot(index='code', columns='metric', values=['value', 'pct', 'sector_pct'])
+        table = pd.concat([wide['value'], wide['pct'].add_suffix('_pct'), wide['sector_pct'].add_suffix('_sector_pct')], axis=1)
+        table.insert(0, 'sector', long.groupby('code')['sector'].first())
+        table.attrs['feature_date'] = feature_date
+        return table
+
+
+def load_rule_features(db_path, codes):
+    """점수 규칙에 넘길 저장된 지표/백분위 (종목 x 열) DataFrame. 저장된 값이 없거나 읽을 수 없으면 None
+
+    high_low_index.py가 저장한 52주 최저가 지표(low_52w, low_ratio)도 함께 붙입니다.
+    """
+    import pandas as pd
+    from high_low_index import rule_features
+
+    if not db_path:
+        return None
+    try:
+        with CrossSectionStore(db_path) as store:
+            table = store.load(codes=codes)
+    except sqlite3.Error as e:
+        logging.error(f"횡단면 지표 조회 오류: {e}")
+        table = pd.DataFrame()
+    tables = [t for t in (None if table.empty else table.drop(columns='sector'), rule_features(db_path, codes))
+              if t is not None]
+    return pd.concat(tables, axis=1) if tables else None
+
+
+def _fmt(value):
+    return 'N/A' if value is None or value != value else f'{value:.2f}'
+
+
+def _universe(args):
+    """--codes/--codes-file/--listing 또는 업종 표의 전 종목 (코드 목록, {코드: 업종})"""
+    from sector_index import load_or_collect, DEFAULT_CACHE_PATH
+
+    index = load_or_collect(args.sector_cache or DEFAULT_CACHE_PATH, max_workers=args.workers)
+    # 여러 업종에 속한 종목은 첫 번째 업종으로 묶습니다. (뒤에서부터 채워 앞의 업종이 남도록)
+    sectors = {member.code: group.name for group in reversed(index.groups) if group.kind == 'upjong'
+               for member in group.members}
+    codes = list(args.codes)
+    if args.codes_file:
+        from breakout_watcher import read_watchlist
+        codes += read_watchlist(args.codes_file)
+    if args.listing:
+        from price_panel import listing_codes
+        codes += listing_codes(args.listing)
+    return codes or sorted(sectors), sectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="일별 횡단면 백분위 지표 (시장 전체 / 업종 안)")
+    parser.add_argument('--db', type=str, default=DEFAULT_DB_PATH, help=f"저장할 DB 파일 경로 (기본값: {DEFAULT_DB_PATH})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="오늘 전 종목 지표와 백분위 계산/저장")
+    build.add_argument('--codes', type=str, nargs='*', default=[], help="종목 코드 (기본값: 업종 표의 전 종목)")
+    build.add_argument('--codes-file', type=str, help="종목 코드 파일 (.txt 또는 '코드' 컬럼 CSV)")
+    build.add_argument('--listing', type=str, choices=['KRX', 'KOSPI', 'KOSDAQ'], help="FinanceDataReader 상장 종목 전체")
+    build.add_argument('--panel', type=str, help="시세 패널 디렉터리 (없는 종목은 시세를 조회)")
+    build.add_argument('--flows', type=str, help="순매매 패널 디렉터리 (investor_flow.py, 지정하면 수급 지표 포함)")
+    build.add_argument('--sector-cache', type=str, help="업종/테마 색인 캐시 파일 (기본값: sector_index.json)")
+    build.add_argument('--workers', type=int, default=8, help="동시 조회 수 (기본값: 8)")
+    add_checkpoint_arguments(build)
+    add_profile_arguments(build)
+
+    show = subparsers.add_parser('show', help="저장된 지표/백분위 조회")
+    show.add_argument('--date', type=str, help="지표 날짜 (기본값: 마지막 저장일)")
+    show.add_argument('--codes', type=str, nargs='*', default=[], help="종목 코드")
+    show.add_argument('--sort', type=str, default='pbr_sector_pct', help="정렬 열 (오름차순, 기본값: pbr_sector_pct)")
+    show.add_argument('--top', type=int, default=20, help="출력할 개수 (기본값: 20)")
+
+    args = parser.parse_args()
+    if args.command == 'show':
+        with CrossSectionStore(args.db) as store:
+            table = store.load(args.date, args.codes)
+        if table.empty:
+            print("저장된 횡단면 지표가 없습니다. 'python cross_section.py build'로 계산하세요.")
+            return
+        if args.sort not in table:
+            parser.error(f"정렬 열이 없습니다: {args.sort} (가능: {', '.join(c for c in table.columns if c != 'sector')})")
+        table = table.sort_values(args.sort).head(args.top)
+        print(f"횡단면 지표 ({table.attrs['feature_date']}, {args.sort} 오름차순)\n")
+        columns = ['code', 'sector', 'per', 'pbr', 'pbr_sector_pct', 'roe', 'ret_20', 'ret_20_pct']
+        columns += [c for c in ('money_5', 'money_5_pct') if c in table]
+        if args.sort not in columns:
+            columns.append(args.sort)
+        rows = [{'code': code, 'sector': row['sector'] or '-',
+                 **{c: _fmt(row[c]) for c in columns[2:]}}
+                for code, row in table.to_dict('index').items()]
+        _print_rows(rows, columns)
+        return
+
+    configure_from_args(args)
+    from market_data import latest_session
+    from price_panel import PricePanel
+
+    codes, sectors = _universe(args)
+    panel = PricePanel.attach(args.panel) if args.panel else None
+    flows = PricePanel.attach(args.flows) if args.flows and os.path.isdir(args.flows) else None
+    feature_date = latest_session().isoformat()
+    checkpoint = Checkpoint(args.checkpoint or f"{args.db}.cross_section.checkpoint",
+                            {'feature_date': feature_date, 'codes': codes, 'panel': args.panel}, resume=args.resume)
+    table = build_features(codes, sectors, panel, flows, args.workers, checkpoint)
+    with CrossSectionStore(args.db) as store:
+        store.save(feature_date, table)
+    checkpoint.finish()
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
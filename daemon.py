@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+상주 분석 서버
+한 프로세스가 HTTP 연결 풀, 페이지(순매수 상위/종목 상세 등)와 시세를 메모리에 유지하고
+주기적으로 갱신하면서, 대시보드(HTML/JSON)와 krx.py 명령을 로컬 HTTP 포트로 제공합니다.
+
+    GET  /                         대시보드 HTML (?market=kospi&investor=foreign&days=2)
+    GET  /dashboard.json           대시보드 분석 결과 JSON (같은 쿼리)
+    GET  /run/<command>?arg=...    krx.py 명령 실행 결과 (text/plain)
+    GET  /status                   캐시/갱신/실행 예산 상태 JSON
+    POST /refresh                  캐시를 비우고 대시보드를 다시 생성
+
+사용 예:
+    python daemon.py --port 8766 --refresh 600
+    python daemon.py --build-deadline 120          # 대시보드 한 번 생성에 최대 120초
+    curl 'http://127.0.0.1:8766/run/screen?arg=--days&arg=3'
+    KRX_DAEMON_URL=http://127.0.0.1:8766 python krx.py screen --days 3
+"""
+
+import argparse
+import contextlib
+import dataclasses
+import io
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import http_client
+import krx
+import market_data
+from profiling import profiler
+from run_budget import budget
+from snapshot_bundle import release_snapshot
+from ttl_cache import TTLCache
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# 대시보드 쿼리의 연속 순매수 일수 범위 (생성한 대시보드는 refresh()마다 다시 만들므로 키 수를 제한합니다)
+MAX_DAYS = 20
+
+
+def dashboard_key(market, investor, days):
+    """(시장, 투자자, 일수) 대시보드 키를 검사해 반환합니다. 지원하지 않는 값이면 ValueError"""
+    from unified_dashboard_html import MARKETS, INVESTORS
+
+    if market not in MARKETS:
+        raise ValueError(f"market은 {', '.join(MARKETS)} 중 하나여야 합니다: {market}")
+    if investor not in INVESTORS:
+        raise ValueError(f"investor는 {', '.join(INVESTORS)} 중 하나여야 합니다: {investor}")
+    days = int(days)
+    if not 1 <= days <= MAX_DAYS:
+        raise ValueError(f"days는 1~{MAX_DAYS} 사이여야 합니다: {days}")
+    return market, investor, days
+
+
+class AnalysisDaemon:
+    """캐시와 생성된 대시보드를 보관하고 명령 실행을 직렬화합니다."""
+
+    def __init__(self, page_ttl=300, price_ttl=3600, refresh_interval=600, warm=(('kospi', 'foreign', 2),),
+                 build_deadline=None, source_budget=None):
+        self.page_cache = TTLCache(page_ttl, name='pages')
+        self.price_cache = TTLCache(price_ttl, name='prices')
+        self.refresh_interval = refresh_interval
+        self.build_deadline = build_deadline
+        self.source_budget = source_budget
+        self.warm = list(warm)
+        self.dashboards = {}
+        self.run_lock = threading.Lock()
+        self.started = time.time()
+        self.last_refresh = None
+        self._stop = threading.Event()
+
+        http_client.use_page_cache(self.page_cache)
+        market_data.use_cache(self.price_cache)
+
+    def dashboard(self, market='kospi', investor='foreign', days=2):
+        """생성된 대시보드를 반환합니다. 없으면 지금 생성합니다."""
+        key = (market, investor, days)
+        entry = self.dashboards.get(key)
+        if entry is None:
+            entry = self.build_dashboard(*key)
+        return entry
+
+    def build_dashboard(self, market, investor, days):
+        """대시보드 데이터를 수집하고 HTML/JSON을 만들어 보관합니다.
+
+        원본 장애로 가져오지 못한 섹션은 직전에 생성한 같은 대시보드의 섹션을 '지난 데이터'로 표시합니다.
+        """
+        from unified_dashboard_html import UnifiedStockDashboardHTML
+
+        previous = self.dashboards.get((market, investor, days))
+        with self.run_lock:
+            if self.build_deadline or self.source_budget:
+                budget.configure(run_seconds=self.build_deadline, source_seconds=self.source_budget,
+                                 breaker_failures=budget.breaker_failures, breaker_cooldown=budget.breaker_cooldown)
+            started = time.perf_counter()
+            dashboard = UnifiedStockDashboardHTML(market=market, investor_type=investor, consecutive_days=days,
+                                                  previous_sections=previous['sections'] if previous else None)
+            with contextlib.redirect_stdout(io.StringIO()):
+                dashboard.collect()
+            entry = {
+                'html': dashboard.render_html(),
+                'data': {
+                    'market': market,
+                    'investor': investor,
+                    'days': days,
+                    'generated_at': datetime.now().isoformat(timespec='seconds'),
+                    'results': {m: [dataclasses.asdict(r) for r in results]
+                                for m, results in dashboard.results.items()},
+                },
+                'sections': dashboard.sections,
+                'elapsed_s': round(time.perf_counter() - started, 3),
+            }
+            entry['data']['sections'] = {name: {'status': section['status'], 'generated_at': section['generated_at'],
+                                                'reason': section['reason']}
+                                         for name, section in dashboard.sections.items()}
+        self.dashboards[(market, investor, days)] = entry
+        logging.info(f"대시보드 생성: {market}/{investor}/{days}일 ({entry['elapsed_s']}s)")
+        return entry
+
+    def run_command(self, command, args):
+        """krx.py 명령을 이 프로세스에서 실행하고 출력을 문자열로 반환합니다."""
+        if command not in krx.COMMANDS or command == 'daemon':
+            raise KeyError(command)
+        output = io.StringIO()
+        with self.run_lock, contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            # 명령의 --deadline/--source-budget/--profile이 이후 대시보드 생성에 남지 않도록 되돌립니다.
+            budget_state, profiler_state = budget.save_state(), profiler.save_state()
+            try:
+                code = krx.run_local(command, list(args))
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 1
+            except Exception as e:
+                logging.exception(f"명령 실행 오류: {command}")
+                print(f"오류: {e}")
+                code = 1
+            finally:
+                # --snapshot 명령이 바꾼 기준 시각/시세 소스/캐시/오프라인 설정을 되돌립니다.
+                release_snapshot()
+                budget.restore_state(budget_state)
+                profiler.restore_state(profiler_state)
+        return code, output.getvalue()
+
+    def refresh(self):
+        """캐시를 비우고 예열 대상 대시보드를 다시 생성합니다."""
+        self.page_cache.clear()
+        self.price_cache.clear()
+        keys = set(self.warm) | set(self.dashboards)
+        for key in sorted(keys):
+            try:
+                self.build_dashboard(*key)
+            except Exception as e:
+                logging.error(f"대시보드 갱신 오류: {key} - {e}")
+        self.last_refresh = datetime.now().isoformat(timespec='seconds')
+
+    def run_scheduler(self):
+        """시작 시 한 번, 이후 refresh_interval 초마다 갱신합니다."""
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.refresh_interval)
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        return {
+            'uptime_s': round(time.time() - self.started, 1),
+            'last_refresh': self.last_refresh,
+            'refresh_interval_s': self.refresh_interval,
+            'caches': [self.page_cache.stats(), self.price_cache.stats()],
+            'dashboards': [
+                {'market': k[0], 'investor': k[1], 'days': k[2],
+                 'generated_at': v['data']['generated_at'], 'elapsed_s': v['elapsed_s'],
+                 'degraded': {name: s['status'] for name, s in v['sections'].items() if s['status'] != 'ok'}}
+                for k, v in sorted(self.dashboards.items())
+            ],
+            'budget': budget.status(),
+        }
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """상주 서버 요청 처리기"""
+
+    daemon = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+    def _send(self, status, body, content_type='text/plain', headers=None):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_json(self, data, status=200):
+        self._send(status, json.dumps(data, ensure_ascii=False, default=str), content_type='application/json')
+
+    def _dashboard_key(self, query):
+        return dashboard_key(query.get('market', ['kospi'])[0],
+                             query.get('investor', ['foreign'])[0],
+                             query.get('days', ['2'])[0])
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        path = parsed.path.rstrip('/') or '/'
+        try:
+            if path in ('/', '/dashboard', '/index.html'):
+                self._send(200, self.daemon.dashboard(*self._dashboard_key(query))['html'], content_type='text/html')
+            elif path == '/dashboard.json':
+                self._send_json(self.daemon.dashboard(*self._dashboard_key(query))['data'])
+            elif path == '/status':
+                self._send_json(self.daemon.status())
+            elif path.startswith('/run/'):
+                command = path[len('/run/'):]
+                try:
+                    code, output = self.daemon.run_command(command, query.get('arg', []))
+                except KeyError:
+                    self._send(404, f"알 수 없는 명령: {command}\n")
+                    return
+                self._send(200, output, headers={'X-Exit-Code': str(code or 0)})
+            else:
+                self._send(404, "Not Found\n")
+        except ValueError as e:
+            self._send(400, f"잘못된 요청: {e}\n")
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip('/') == '/refresh':
+            self.daemon.refresh()
+            self._send_json(self.daemon.status())
+        else:
+            self._send(404, "Not Found\n")
+
+
+def serve(daemon, host='127.0.0.1', port=8766):
+    """상주 서버 HTTP 인스턴스를 만듭니다. (serve_forever는 호출하지 않습니다)"""
+    handler = type('BoundDaemonHandler', (DaemonHandler,), {'daemon': daemon})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상주 분석 서버 (대시보드/명령을 로컬 HTTP로 제공)")
+    parser.add_argument('--host', type=str, default='127.0.0.1', help="바인드 주소 (기본값: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8766, help="포트 (기본값: 8766)")
+    parser.add_argument('--refresh', type=int, default=600, help="캐시 갱신 주기(초) (기본값: 600)")
+    parser.add_argument('--page-ttl', type=int, default=300, help="페이지 캐시 만료(초) (기본값: 300)")
+    parser.add_argument('--price-ttl', type=int, default=3600, help="시세 캐시 만료(초) (기본값: 3600)")
+    parser.add_argument('--warm', type=str, nargs='*', default=['kospi:foreign:2'],
+                        help="미리 생성할 대시보드 (market:investor:days, 기본값: kospi:foreign:2)")
+    parser.add_argument('--build-deadline', type=float, metavar='SECONDS',
+                        help="대시보드 한 번 생성에 쓸 최대 시간(초). 넘으면 가진 섹션과 지난 섹션으로 생성합니다.")
+    parser.add_argument('--source-budget', type=float, metavar='SECONDS',
+                        help="대시보드 한 번 생성 중 원본(호스트)별 누적 호출 시간 한도(초)")
+    args = parser.parse_args()
+
+    warm = []
+    for spec in args.warm:
+        try:
+            warm.append(dashboard_key(*spec.split(':')))
+        except (TypeError, ValueError) as e:
+            parser.error(f"--warm {spec}: {e}")
+
+    daemon = AnalysisDaemon(page_ttl=args.page_ttl, price_ttl=args.price_ttl,
+                            refresh_interval=args.refresh, warm=warm,
+                            build_deadline=args.build_deadline, source_budget=args.source_budget)
+    server = serve(daemon, args.host, args.port)
+    threading.Thread(target=daemon.run_scheduler, name='refresh', daemon=True).start()
+    logging.info(f"상주 서버 실행 중: http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
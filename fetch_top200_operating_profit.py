@@ -2,20 +2,23 @@
 KOSPI 영업이익 순위 Top 200 데이터를 wisereport에서 가져와 Excel로 저장
 """
 
+import io
 import pandas as pd
 import sys
 from datetime import datetime
 
+from http_client import wisereport_url, fetch
+
 
 def fetch_top200():
     # sec_cd=IKS001: KOSPI만 (IKQ001=KOSDAQ)
-    url = (
-        "https://comp.wisereport.co.kr/ranking/mktExcel.aspx"
+    url = wisereport_url(
+        "/ranking/mktExcel.aspx"
         "?sec_cd=IKS001&sch=1&fin_typ=0&cn=&menuType=MAIN"
         "&ordertyp=desc&ordercol=4&sec_nm=KOSPI"
     )
 
-    dfs = pd.read_html(url, encoding="utf-8")
+    dfs = pd.read_html(io.StringIO(fetch(url, encoding="utf-8").text))
     df = dfs[2]
     df.columns = df.iloc[0]
     df = df.iloc[2:].reset_index(drop=True)
@@ -1,25 +1,67 @@
 import requests
-from bs4 import BeautifulSoup
 import re
 import pandas as pd
-import FinanceDataReader as fdr
 from datetime import datetime, timedelta
 import argparse
 import logging
 
+from http_client import NAVER_BASE_URL, fetch_soup
+from profiling import stage, profiler, add_profile_arguments, configure_from_args
+from snapshot_bundle import add_snapshot_arguments, use_snapshot_from_args
+from run_budget import budget, add_budget_arguments, configure_budget_from_args
+from results_store import ResultsStore
+from rank_history import DealRankStore, parse_deal_rank_boxes
+from stock_records import StockRef, StockResult, sort_by_score, results_to_frame
+from scoring_rules import RuleSet, add_rules_arguments
+from cross_section import load_rule_features
+from high_low_index import load_levels, quote_52w
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+def parse_fundamentals(soup):
+    """종목 상세 페이지(item/main.naver)에서 (PER, PBR, ROE, 외국인소진율)을 추출합니다. 없는 값은 None"""
+    try:
+        per_tag = soup.select_one('#_per')
+        pbr_tag = soup.select_one('#_pbr')
+        per = float(per_tag.text) if per_tag and per_tag.text not in ['N/A', ''] else None
+        pbr = float(pbr_tag.text) if pbr_tag and pbr_tag.text not in ['N/A', ''] else None
+
+        foreign_ratio = None
+        # '외국인소진율' 텍스트를 포함하는 th를 더 정확하게 찾습니다.
+        foreign_ratio_th = soup.find('th', string=lambda text: text and '외국인소진율' in text)
+        if foreign_ratio_th:
+            foreign_ratio_td = foreign_ratio_th.find_next_sibling('td')
+            if foreign_ratio_td and '%' in foreign_ratio_td.text:
+                foreign_ratio = float(foreign_ratio_td.text.strip().replace('%', ''))
+
+        roe = None
+        # 기업실적분석 표가 없는 종목(ETF 등)도 PER/PBR/외국인소진율은 반환합니다.
+        finance_summary = soup.find('div', class_='cop_analysis')
+        finance_summary_table = finance_summary.find('table') if finance_summary else None
+        if finance_summary_table:
+            for row in finance_summary_table.find_all('tr'):
+                th_text = row.find('th').get_text(strip=True) if row.find('th') else ''
+                if 'ROE(지배주주)' in th_text and row.find_all('td'):
+                    roe_text = row.find_all('td')[-1].text.strip()
+                    if roe_text: roe = float(roe_text)
+        
+        return per, pbr, roe, foreign_ratio
+    except (ValueError, AttributeError):
+        return None, None, None, None
+
 class StockAnalyzer:
     """
     Naver Finance에서 수급 정보를 가져와 여러 지표를 기반으로 주식을 분석하는 클래스.
     """
-    BASE_URL = "https://finance.naver.com"
+    BASE_URL = NAVER_BASE_URL
 
-    def __init__(self, investor_type='foreign', consecutive_days=2, market='kospi'):
+    def __init__(self, investor_type='foreign', consecutive_days=2, market='kospi', rules=None):
         self.investor_type = investor_type
         self.consecutive_days = consecutive_days
         self.market = market
+        self.rules = rules or RuleSet.load()
+        self.levels = {}
         self.investor_code = self._get_investor_code()
         self.market_code = self._get_market_code()
 
@@ -34,10 +76,7 @@ class StockAnalyzer:
     def _fetch_url(self, url):
         """주어진 URL의 HTML을 가져옵니다."""
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            response.encoding = 'euc-kr'
-            return BeautifulSoup(response.text, 'html.parser')
+            return fetch_soup(url)
         except requests.exceptions.RequestException as e:
             logging.error(f"URL을 가져오는 중 오류 발생: {url} - {e}")
             return None
@@ -68,58 +107,75 @@ class StockAnalyzer:
             stock_code = match.group(1)
 
             if stock_name and stock_code:
-                stocks.append((stock_name, stock_code))
+                stocks.append(StockRef(stock_name, stock_code))
         return stocks
 
+    def get_streak_stocks(self, db_path):
+        """순매수 상위 페이지의 날짜별 목록을 이력 DB에 저장하고, 이력이 충분하면 N일 이상 연속 순매수 종목을 반환합니다.
+        이력이 N 거래일을 덮지 못하면 None을 반환합니다.
+        """
+        list_url = f"{self.BASE_URL}/sise/sise_deal_rank_iframe.naver?sosok={self.market_code}&investor_gubun={self.investor_code}&type=buy"
+        boxes = parse_deal_rank_boxes(self._fetch_url(list_url))
+        if not boxes: return None
+        with DealRankStore(db_path) as store:
+            store.save_boxes(self.market, self.investor_type, boxes)
+            codes = store.streak_codes(self.market, self.investor_type, self.consecutive_days, latest=boxes[0][0])
+        if codes is None: return None
+        latest_stocks_map = {stock.code: stock for stock in boxes[0][1]}
+        return [latest_stocks_map[code] for code in codes if code in latest_stocks_map]
+
     def get_stock_fundamentals(self, stock_code, soup):
         """종목의 펀더멘탈 및 추가 지표를 추출합니다."""
-        try:
-            per_tag = soup.select_one('#_per')
-            pbr_tag = soup.select_one('#_pbr')
-            per = float(per_tag.text) if per_tag and per_tag.text not in ['N/A', ''] else None
-            pbr = float(pbr_tag.text) if pbr_tag and pbr_tag.text not in ['N/A', ''] else None
-
-            foreign_ratio = None
-            # '외국인소진율' 텍스트를 포함하는 th를 더 정확하게 찾습니다.
-            foreign_ratio_th = soup.find('th', string=lambda text: text and '외국인소진율' in text)
-            if foreign_ratio_th:
-                foreign_ratio_td = foreign_ratio_th.find_next_sibling('td')
-                if foreign_ratio_td and '%' in foreign_ratio_td.text:
-                    foreign_ratio = float(foreign_ratio_td.text.strip().replace('%', ''))
-
-            roe = None
-            finance_summary_table = soup.find('div', class_='cop_analysis').find('table')
-            if finance_summary_table:
-                for row in finance_summary_table.find_all('tr'):
-                    th_text = row.find('th').get_text(strip=True) if row.find('th') else ''
-                    if 'ROE(지배주주)' in th_text and row.find_all('td'):
-                        roe_text = row.find_all('td')[-1].text.strip()
-                        if roe_text: roe = float(roe_text)
-            
-            return per, pbr, roe, foreign_ratio
-        except (ValueError, AttributeError):
-            return None, None, None, None
+        return parse_fundamentals(soup)
+
+    def analyze_stock(self, stock, start_date, end_date):
+        """단일 종목의 시세와 펀더멘탈을 조회합니다. (점수는 analyze에서 규칙으로 한 번에 채점) 분석할 수 없으면 None을 반환합니다."""
+        stock_code, stock_name = stock.code, stock.name
+        detail_url = f"{self.BASE_URL}/item/main.naver?code={stock_code}"
+        soup = self._fetch_url(detail_url)
+        if not soup: return None
 
-    def analyze(self, output_file=None):
-        """분석을 수행하고 결과를 출력하거나 파일로 저장합니다."""
+        # 52주 최고/최저가 색인(--db)이 오늘까지 갱신되어 있으면 1년치 시세를 받지 않습니다.
+        quote = quote_52w(stock_code, start_date, end_date, self.levels)
+        if quote is None: return None
+        current_price, change_rate, high_52_week = quote
+
+        per, pbr, roe, foreign_ratio = self.get_stock_fundamentals(stock_code, soup)
+
+        if pd.isna(current_price) or pd.isna(high_52_week) or high_52_week == 0: return None
+
+        return StockResult(
+            name=stock_name, code=stock_code, score=0,
+            price=int(current_price), change_rate=change_rate, high_52w=int(high_52_week),
+            per=per, pbr=pbr, roe=roe, foreign_ratio=foreign_ratio,
+        )
+
+    def analyze(self, output_file=None, db_path=None):
+        """분석을 수행하고 결과를 출력하거나 파일로 저장합니다. db_path가 주어지면 결과 이력 DB에도 누적합니다."""
         logging.info(f"{self.consecutive_days}일 연속 '{self.investor_type}'({self.market.upper()}) 순매수 상위 종목 분석 시작...")
         
-        consecutive_codes = set()
-        all_day_stocks = []
-        for i in range(self.consecutive_days):
-            stocks = self.get_top_buy_stocks(day_index=i)
-            all_day_stocks.append(stocks)
-            codes = {code for name, code in stocks}
-            if not codes:
-                logging.warning(f"{self.consecutive_days - i}일 전 데이터가 부족하여 분석을 중단합니다.")
-                return
-            if i == 0:
-                consecutive_codes = codes
-            else:
-                consecutive_codes.intersection_update(codes)
-        
-        latest_stocks_map = {code: name for name, code in all_day_stocks[0]}
-        consecutive_stocks = [(latest_stocks_map[code], code) for code in consecutive_codes if code in latest_stocks_map]
+        # 이력 DB가 있으면 누적된 목록으로 연속 일수를 계산합니다. (페이지의 날짜 수보다 긴 --days도 가능)
+        with stage('section.deal_rank'):
+            consecutive_stocks = self.get_streak_stocks(db_path) if db_path else None
+
+        if consecutive_stocks is None:
+            consecutive_codes = set()
+            all_day_stocks = []
+            for i in range(self.consecutive_days):
+                with stage('section.deal_rank'):
+                    stocks = self.get_top_buy_stocks(day_index=i)
+                all_day_stocks.append(stocks)
+                codes = {stock.code for stock in stocks}
+                if not codes:
+                    logging.warning(f"{self.consecutive_days - i}일 전 데이터가 부족하여 분석을 중단합니다.")
+                    return
+                if i == 0:
+                    consecutive_codes = codes
+                else:
+                    consecutive_codes.intersection_update(codes)
+
+            latest_stocks_map = {stock.code: stock for stock in all_day_stocks[0]}
+            consecutive_stocks = [latest_stocks_map[code] for code in consecutive_codes if code in latest_stocks_map]
 
         if not consecutive_stocks:
             logging.info("분석할 종목이 없습니다.")
@@ -128,43 +184,28 @@ class StockAnalyzer:
         analyzed_results = []
         end_date = datetime.now()
         start_date = end_date - timedelta(days=365)
+        self.levels = load_levels(db_path, [stock.code for stock in consecutive_stocks])
 
-        for i, (stock_name, stock_code) in enumerate(consecutive_stocks, 1):
+        for i, stock in enumerate(consecutive_stocks, 1):
+            stock_name, stock_code = stock.name, stock.code
             logging.info(f"({i}/{len(consecutive_stocks)}) {stock_name} ({stock_code}) 분석 중...")
             try:
-                detail_url = f"{self.BASE_URL}/item/main.naver?code={stock_code}"
-                soup = self._fetch_url(detail_url)
-                if not soup: continue
-
-                df = fdr.DataReader(stock_code, start=start_date, end=end_date)
-                if df.empty: continue
-
-                current_price = df['Close'].iloc[-1]
-                change_rate = df['Change'].iloc[-1] * 100
-                high_52_week = df['High'].max()
-                
-                per, pbr, roe, foreign_ratio = self.get_stock_fundamentals(stock_code, soup)
-
-                if pd.isna(current_price) or pd.isna(high_52_week) or high_52_week == 0: continue
-
-                score = 0
-                passed_filters = []
-                if pbr is not None and 0 < pbr < 1.0: score += 1; passed_filters.append(f"PBR: {pbr:.2f}")
-                if per is not None and 0 < per < 15: score += 1; passed_filters.append(f"PER: {per:.2f}")
-                if roe is not None and roe > 15: score += 1; passed_filters.append(f"ROE: {roe:.2f}%")
-
-                analyzed_results.append({
-                    "종목명": stock_name, "코드": stock_code, "종합 점수": score,
-                    "현재가": int(current_price), "등락률": change_rate, "52주 신고가": int(high_52_week),
-                    "PER": per, "PBR": pbr, "ROE": roe, "외국인보유율": foreign_ratio,
-                    "필터": ', '.join(passed_filters)
-                })
+                with stage('section.stock_analysis'):
+                    result = self.analyze_stock(stock, start_date, end_date)
+                if result:
+                    analyzed_results.append(result)
             except Exception as e:
                 logging.error(f"{stock_name} ({stock_code}) 분석 중 오류 발생: {e}")
                 continue
         
-        sorted_results = sorted(analyzed_results, key=lambda x: x['종합 점수'], reverse=True)
-        
+        # 규칙 파일(scoring_rules.txt)로 분석한 종목 전체를 한 번에 채점합니다. (--db면 저장된 횡단면 백분위도 지표로 사용)
+        extra = load_rule_features(db_path, [r.code for r in analyzed_results])
+        sorted_results = sort_by_score(self.rules.apply(analyzed_results, extra))
+
+        if db_path:
+            with ResultsStore(db_path) as store:
+                store.save_results(sorted_results, self.market, self.investor_type, days=self.consecutive_days)
+
         if output_file:
             self.save_to_csv(sorted_results, output_file)
         else:
@@ -175,7 +216,7 @@ class StockAnalyzer:
         if not results:
             logging.info("저장할 결과가 없습니다.")
             return
-        df = pd.DataFrame(results)
+        df = results_to_frame(results)
         try:
             df.to_csv(filename, index=False, encoding='utf-8-sig')
             logging.info(f"분석 결과를 '{filename}' 파일로 저장했습니다.")
@@ -191,15 +232,14 @@ class StockAnalyzer:
         print("="*80)
 
         for i, result in enumerate(results, 1):
-            price_ratio = result['현재가'] / result['52주 신고가']
-            change_rate_str = f"{result['등락률']:.2f}%"
+            change_rate_str = f"{result.change_rate:.2f}%"
             
-            print(f"[{i:02d}] {result['종목명']} ({result['코드']}) - 종합 점수: {result['종합 점수']}/3")
-            print(f"  - 현재가: {result['현재가']:,}원 (등락률: {change_rate_str}) | 52주 신고가: {result['52주 신고가']:,}원 (비율: {price_ratio:.2%})")
-            print(f"  - PER: {result['PER'] or 'N/A'} | PBR: {result['PBR'] or 'N/A'} | ROE: {str(result['ROE'])+'%' if result['ROE'] is not None else 'N/A'}")
-            print(f"  - 외국인보유율: {str(result['외국인보유율'])+'%' if result['외국인보유율'] is not None else 'N/A'}")
-            if result['필터']:
-                print(f"  >>> 필터 만족: [ {result['필터']} ]")
+            print(f"[{i:02d}] {result.name} ({result.code}) - 종합 점수: {result.score}/{self.rules.max_score}")
+            print(f"  - 현재가: {result.price:,}원 (등락률: {change_rate_str}) | 52주 신고가: {result.high_52w:,}원 (비율: {result.price_ratio:.2%})")
+            print(f"  - PER: {result.per or 'N/A'} | PBR: {result.pbr or 'N/A'} | ROE: {str(result.roe)+'%' if result.roe is not None else 'N/A'}")
+            print(f"  - 외국인보유율: {str(result.foreign_ratio)+'%' if result.foreign_ratio is not None else 'N/A'}")
+            if result.filters:
+                print(f"  >>> 필터 만족: [ {result.filters} ]")
             print("-" * 80)
 
 def main():
@@ -208,11 +248,22 @@ def main():
     parser.add_argument('--days', type=int, default=2, help="연속 순매수 일수")
     parser.add_argument('--market', type=str, default='kospi', choices=['kospi', 'kosdaq'], help="분석할 시장 (kospi 또는 kosdaq)")
     parser.add_argument('--output', type=str, help="분석 결과를 저장할 CSV 파일명")
+    parser.add_argument('--db', type=str, help="분석 결과 이력을 누적할 SQLite DB 파일 (예: results.db)")
+    add_profile_arguments(parser)
+    add_budget_arguments(parser)
+    add_snapshot_arguments(parser)
+    add_rules_arguments(parser)
     
     args = parser.parse_args()
+    configure_from_args(args)
+    configure_budget_from_args(args)
+    use_snapshot_from_args(args)
 
-    analyzer = StockAnalyzer(investor_type=args.investor, consecutive_days=args.days, market=args.market)
-    analyzer.analyze(output_file=args.output)
+    analyzer = StockAnalyzer(investor_type=args.investor, consecutive_days=args.days, market=args.market,
+                             rules=RuleSet.load(args.rules))
+    analyzer.analyze(output_file=args.output, db_path=args.db)
+    budget.print_summary()
+    profiler.finish()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
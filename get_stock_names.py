@@ -1,26 +1,22 @@
 import requests
-from bs4 import BeautifulSoup
-import re
+
+from http_client import naver_url, fetch_soup
 
 def get_foreign_buy_stock_list():
     """
     Naver Finance에서 '외국인 순매수' 상위 종목명의 리스트를 가져와 출력합니다.
     """
     # '외국인 순매수' 데이터가 실제로 담겨있는 iframe의 URL
-    list_url = "https://finance.naver.com/sise/sise_deal_rank_iframe.naver?sosok=01&investor_gubun=9000&type=buy"
+    list_url = naver_url("/sise/sise_deal_rank_iframe.naver?sosok=01&investor_gubun=9000&type=buy")
     
     print(f"Fetching stock list from: {list_url}")
 
     try:
-        response = requests.get(list_url)
-        response.raise_for_status()
         # Naver Finance는 EUC-KR 인코딩을 사용합니다.
-        response.encoding = 'euc-kr'
+        soup = fetch_soup(list_url, encoding='euc-kr')
     except requests.exceptions.RequestException as e:
         print(f"Error fetching stock list: {e}")
         return
-
-    soup = BeautifulSoup(response.text, 'html.parser')
     
     # '외국인 순매수' 테이블은 두 번째 'box_type_ms' div 안에 있습니다.
     boxes = soup.find_all('div', class_='box_type_ms')
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+업종/테마 일별 시세 이력 저장소와 순환매(로테이션) 지표
+대시보드가 파싱한 업종/테마 시세(등락률, 상승/하락 종목 수)를 날짜별로 SQLite에 누적하고,
+누적된 이력 전체를 (날짜 x 업종/테마) 행렬로 불러와 N일 모멘텀 순위, 상승 비율(breadth),
+연속 상승일 수를 한 번에 계산합니다.
+
+사용 예:
+    python group_history.py snapshot                       # 오늘 업종/테마 시세 저장
+    python group_history.py rotation --kind theme --window 5 --top 15
+    python group_history.py rotation --kind upjong --start 2026-07-01
+"""
+
+import argparse
+import logging
+import sqlite3
+
+import krx_calendar
+from results_store import DEFAULT_DB_PATH, _print_rows
+
+KINDS = {'upjong': '업종', 'theme': '테마'}
+DEFAULT_WINDOWS = (5, 20)
+
+# (kind, name, snap_date) 기본 키: 업종/테마별 시계열 조회가 기본 키 범위 검색이 됩니다.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS group_snapshots (
+    kind        TEXT    NOT NULL,
+    name        TEXT    NOT NULL,
+    snap_date   TEXT    NOT NULL,
+    change      REAL    NOT NULL,
+    up_count    INTEGER,
+    down_count  INTEGER,
+    PRIMARY KEY (kind, name, snap_date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_group_snapshots_date ON group_snapshots (kind, snap_date);
+"""
+
+
+def _to_int(text):
+    try:
+        return int(text.strip().replace(',', ''))
+    except (ValueError, AttributeError):
+        return None
+
+
+def parse_group_rows(soup):
+    """업종(sise_group.naver)/테마(theme.naver) 시세 표를 파싱합니다.
+
+    두 표 모두 이름, 전일대비 다음 네 번째/여섯 번째 칸이 상승/하락 종목 수입니다.
+    (업종: 전체/상승/보합/하락, 테마: 최근3일/상승/보합/하락)
+    """
+    rows = []
+    table = soup.find('table', class_='type_1') if soup else None
+    if not table:
+        return rows
+    for row in table.find_all('tr'):
+        cols = row.find_all('td')
+        if len(cols) < 4:
+            continue
+        link = cols[0].find('a')
+        if not link:
+            continue
+        try:
+            change = float(cols[1].text.strip().replace('%', '').replace('+', '').replace(',', ''))
+        except ValueError:
+            continue
+        rows.append({
+            'name': link.text.strip(),
+            'change': change,
+            'up_count': _to_int(cols[3].text) if len(cols) > 5 else None,
+            'down_count': _to_int(cols[5].text) if len(cols) > 5 else None,
+        })
+    return rows
+
+
+class GroupHistoryStore:
+    """업종/테마 일별 시세를 SQLite 파일에 누적 저장하고 행렬로 불러오는 클래스"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def save_snapshot(self, kind, rows, snap_date=None):
+        """parse_group_rows 결과를 하나의 트랜잭션으로 저장합니다. 같은 거래일에 다시 저장하면 덮어씁니다.
+
+        snap_date 기본값은 가장 최근 개장 거래일입니다. (주말/휴장일/개장 전에 저장해도 직전 거래일 시세로 기록)
+        """
+        if not rows:
+            return 0
+        snap_date = snap_date or krx_calendar.latest_session().isoformat()
+        sql = ("INSERT OR REPLACE INTO group_snapshots (kind, name, snap_date, change, up_count, down_count) "
+               "VALUES (?, ?, ?, ?, ?, ?)")
+        with self.conn:
+            self.conn.executemany(sql, [
+                (kind, r['name'], snap_date, r['change'], r.get('up_count'), r.get('down_count')) for r in rows
+            ])
+        logging.info(f"{KINDS.get(kind, kind)} {len(rows)}개 시세를 '{self.path}'에 저장했습니다. ({snap_date})")
+        return len(rows)
+
+    def load_panel(self, kind, start=None, end=None):
+        """(날짜 x 이름) 등락률/상승 수/하락 수 DataFrame 세 개를 반환합니다. 없는 값은 NaN입니다."""
+        import pandas as pd
+
+        sql = "SELECT snap_date, name, change, up_count, down_count FROM group_snapshots WHERE kind = ?"
+        params = [kind]
+        if start:
+            sql += " AND snap_date >= ?"
+            params.append(start)
+        if end:
+            sql += " AND snap_date <= ?"
+            params.append(end)
+        frame = pd.DataFrame(self.conn.execute(sql, params).fetchall(),
+                             columns=['snap_date', 'name', 'change', 'up_count', 'down_count'])
+        panels = {}
+        for column in ('change', 'up_count', 'down_count'):
+            panels[column] = frame.pivot(index='snap_date', columns='name', values=column).sort_index().astype(float)
+        return panels['change'], panels['up_count'], panels['down_count']
+
+
+def rotation_metrics(change, up=None, down=None, windows=DEFAULT_WINDOWS):
+    """이력 전체에 대해 순환매 지표를 계산합니다.
+
+    change/up/down은 (날짜 x 이름) DataFrame이며, 결과도 같은 모양의 DataFrame 사전입니다.
+      - mom_N:  N일 누적 등락률(%) (복리)
+      - rank_N: 날짜별 mom_N 순위 (1 = 가장 강함)
+      - streak: 연속 상승일 수 (당일 등락률 > 0)
+      - breadth: 상승 종목 비율 (상승 / (상승 + 하락))
+    """
+    import numpy as np
+    import pandas as pd
+
+    metrics = {}
+    log_returns = np.log1p(change / 100)
+    for window in windows:
+        momentum = np.expm1(log_returns.rolling(window, min_periods=window).sum()) * 100
+        metrics[f'mom_{window}'] = momentum
+        metrics[f'rank_{window}'] = momentum.rank(axis=1, ascending=False, method='min')
+
+    # 연속 상승일: 상승일 누적 개수에서 마지막 비상승일까지의 누적 개수를 빼면 됩니다.
+    rising = (change > 0).to_numpy()
+    counts = rising.cumsum(axis=0)
+    last_reset = np.maximum.accumulate(np.where(rising, 0, counts), axis=0)
+    metrics['streak'] = pd.DataFrame(counts - last_reset, index=change.index, columns=change.columns)
+
+    if up is not None and down is not None:
+        total = up + down
+        metrics['breadth'] = up / total.where(total > 0)
+    return metrics
+
+
+def latest_rotation(change, up=None, down=None, windows=DEFAULT_WINDOWS):
+    """마지막 날짜 기준 이름별 지표 표를 반환합니다. (첫 번째 기간 모멘텀 순 정렬)"""
+    import pandas as pd
+
+    metrics = rotation_metrics(change, up, down, windows)
+    table = pd.DataFrame({key: frame.iloc[-1] for key, frame in metrics.items()})
+    table['change'] = change.iloc[-1]
+    first = windows[0]
+    if len(change) > first:
+        # 직전 기간 대비 순위 변화 (양수 = 순위 상승)
+        table[f'rank_chg_{first}'] = metrics[f'rank_{first}'].iloc[-1 - first] - table[f'rank_{first}']
+    return table.dropna(subset=['change']).sort_values([f'mom_{first}', 'change'], ascending=False)
+
+
+GROUP_LIST_PATHS = {'upjong': '/sise/sise_group.naver?type=upjong', 'theme': '/sise/theme.naver'}
+
+
+def fetch_group_rows(kind, first_page=None, max_workers=8):
+    """업종/테마 시세 표 전체 페이지를 동시에 내려받아 파싱합니다.
+
+    테마는 여러 페이지로 나뉘어 있어 첫 페이지만 저장하면 날마다 저장되는 테마가 달라지므로
+    이력에는 항상 전체 페이지를 저장합니다. first_page에 이미 받은 첫 페이지를 넘기면 재사용합니다.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from http_client import naver_url, fetch_soup
+    from sector_index import parse_last_page
+
+    path = GROUP_LIST_PATHS[kind]
+    first_page = first_page or fetch_soup(naver_url(path))
+    rows = parse_group_rows(first_page)
+    last_page = parse_last_page(first_page)
+    if last_page > 1:
+        # 업종 경로에는 이미 쿼리(?type=upjong)가 있으므로 page는 &로 붙입니다.
+        separator = '&' if '?' in path else '?'
+        urls = [naver_url(f'{path}{separator}page={page}') for page in range(2, last_page + 1)]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for soup in pool.map(fetch_soup, urls):
+                rows += parse_group_rows(soup)
+    return rows
+
+
+def snapshot(db_path=DEFAULT_DB_PATH):
+    """지금의 업종/테마 시세를 내려받아 저장합니다."""
+    with GroupHistoryStore(db_path) as store:
+        for kind in GROUP_LIST_PATHS:
+            store.save_snapshot(kind, fetch_group_rows(kind))
+
+
+def _fmt(value, spec):
+    return 'N/A' if value is None or value != value else format(value, spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업종/테마 일별 시세 이력 및 순환매 지표")
+    parser.add_argument('--db', type=str, default=DEFAULT_DB_PATH, help=f"이력 DB 파일 경로 (기본값: {DEFAULT_DB_PATH})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('snapshot', help="오늘 업종/테마 시세 저장")
+    rotation = subparsers.add_parser('rotation', help="N일 모멘텀 순위 / 상승 비율 / 연속 상승일")
+    rotation.add_argument('--kind', type=str, default='upjong', choices=list(KINDS), help="업종 또는 테마 (기본값: upjong)")
+    rotation.add_argument('--window', type=int, nargs='+', default=list(DEFAULT_WINDOWS), help="모멘텀 기간(일) (기본값: 5 20)")
+    rotation.add_argument('--start', type=str, help="시작일 (YYYY-MM-DD)")
+    rotation.add_argument('--end', type=str, help="종료일 (YYYY-MM-DD)")
+    rotation.add_argument('--top', type=int, default=20, help="출력할 개수 (기본값: 20)")
+
+    args = parser.parse_args()
+    if args.command == 'snapshot':
+        snapshot(args.db)
+        return
+
+    with GroupHistoryStore(args.db) as store:
+        change, up, down = store.load_panel(args.kind, args.start, args.end)
+    if change.empty:
+        print("저장된 이력이 없습니다. 'python group_history.py snapshot' 또는 대시보드 --db 옵션으로 누적하세요.")
+        return
+
+    windows = tuple(args.window)
+    table = latest_rotation(change, up, down, windows)
+    print(f"{KINDS[args.kind]} 순환매 지표 ({change.index[0]} ~ {change.index[-1]}, {len(change)}일)\n")
+    rows = []
+    for name, row in table.head(args.top).iterrows():
+        item = {'name': name, 'change': _fmt(row['change'], '+.2f'), 'streak': _fmt(row['streak'], '.0f'),
+                'breadth': _fmt(row.get('breadth'), '.0%')}
+        for window in windows:
+            item[f'mom_{window}'] = _fmt(row[f'mom_{window}'], '+.2f')
+            item[f'rank_{window}'] = _fmt(row[f'rank_{window}'], '.0f')
+        rows.append(item)
+    _print_rows(rows, ['name', 'change'] + [f'{p}_{w}' for w in windows for p in ('mom', 'rank')]
+                + ['streak', 'breadth'])
+
+
+if __name__ == "__main__":
+    main()
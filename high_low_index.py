@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+52주 최고/최저가 색인과 신고가/신저가 이벤트
+스크리너/대시보드는 52주 신고가 하나를 구하려고 종목마다 1년치 시세를 받았습니다. 이 모듈은 종목별 최근 52주(252거래일)
+고가/저가를 단조 덱(monotonic deque)으로 유지해 결과 DB에 저장하고, 매일 마지막 저장일 이후의 며칠치 시세만 덧붙여 갱신합니다.
+
+    최고가 덱  (날짜, 고가)  고가 내림차순: 새 고가보다 낮거나 같은 뒤쪽 값은 다시 최고가가 될 수 없으므로 버림
+    최저가 덱  (날짜, 저가)  저가 오름차순
+    창 밖으로 나간 앞쪽 값은 버리므로 덱 맨 앞이 곧 52주 최고/최저가입니다. (막대 하나당 분할 상환 O(1))
+
+새 막대의 고가가 직전 52주 최고가보다 높으면 신고가, 저가가 직전 52주 최저가보다 낮으면 신저가 이벤트로 기록합니다.
+52주 전체를 덮는 이력이 있는 날만 이벤트로 셉니다. (처음 만들 때 1년 전 막대들이 신고가로 잡히지 않도록)
+
+스크리너/대시보드(--db)는 시세 소스의 마지막 거래일까지 갱신된 종목이면 현재가/등락률/52주 최고가를 색인에서 바로 읽고,
+그렇지 않은 종목만 예전처럼 1년치 시세를 받습니다. 점수 규칙에서는 low_52w, low_ratio(현재가 / 52주 최저가)를 쓸 수 있습니다.
+
+사용 예:
+    python high_low_index.py update --listing KOSPI --workers 16     # 처음: 종목별 최근 252거래일
+    python high_low_index.py update                                  # 저장된 종목 전체를 증분 갱신 (cron 등)
+    python high_low_index.py show --codes 005930 000660
+    python high_low_index.py events --kind high --days 5
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+from collections import deque
+from functools import lru_cache
+
+import krx_calendar
+from checkpoint import Checkpoint, run_stage, add_checkpoint_arguments
+from profiling import stage, profiler, add_profile_arguments, configure_from_args
+from results_store import DEFAULT_DB_PATH, _print_rows
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+WINDOW = 252
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS high_low (
+    code       TEXT PRIMARY KEY,
+    since      TEXT NOT NULL,
+    last_date  TEXT NOT NULL,
+    close      REAL,
+    prev_close REAL,
+    high_52w   REAL,
+    high_date  TEXT,
+    low_52w    REAL,
+    low_date   TEXT,
+    highs      TEXT NOT NULL,
+    lows       TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS high_low_events (
+    event_date TEXT NOT NULL,
+    code       TEXT NOT NULL,
+    kind       TEXT NOT NULL,
+    price      REAL NOT NULL,
+    prior      REAL NOT NULL,
+    PRIMARY KEY (event_date, code, kind)
+) WITHOUT ROWID;
+"""
+
+LEVEL_COLUMNS = ['last_date', 'close', 'prev_close', 'high_52w', 'high_date', 'low_52w', 'low_date']
+
+
+@lru_cache(maxsize=4096)
+def window_start(day):
+    """day(YYYY-MM-DD)를 마지막 날로 하는 52주 창의 첫 거래일 (YYYY-MM-DD)"""
+    return krx_calendar.trading_days_back(day, WINDOW - 1).isoformat()
+
+
+class RollingExtremes:
+    """종목 하나의 52주 최고/최저가 단조 덱"""
+
+    __slots__ = ('highs', 'lows', 'since', 'last_date', 'close', 'prev_close')
+
+    def __init__(self, highs=(), lows=(), since=None, last_date=None, close=None, prev_close=None):
+        self.highs = deque(tuple(item) for item in highs)
+        self.lows = deque(tuple(item) for item in lows)
+        self.since = since
+        self.last_date = last_date
+        self.close = close
+        self.prev_close = prev_close
+
+    @property
+    def high(self):
+        return self.highs[0] if self.highs else (None, None)
+
+    @property
+    def low(self):
+        return self.lows[0] if self.lows else (None, None)
+
+    def push(self, day, high, low, close):
+        """막대 하나(날짜 순서대로)를 덧붙이고 [(종류, 가격, 직전 52주 값)] 신고가/신저가 이벤트를 반환합니다."""
+        cutoff = window_start(day)
+        while self.highs and self.highs[0][0] < cutoff:
+            self.highs.popleft()
+        while self.lows and self.lows[0][0] < cutoff:
+            self.lows.popleft()
+
+        events = []
+        full = self.since is not None and self.since <= cutoff
+        if full and self.highs and high > self.highs[0][1]:
+            events.append(('high', high, self.highs[0][1]))
+        if full and self.lows and low < self.lows[0][1]:
+            events.append(('low', low, self.lows[0][1]))
+
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((day, high))
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((day, low))
+
+        self.since = self.since or day
+        self.last_date = day
+        self.prev_close, self.close = self.close, close
+        return events
+
+    def extend(self, df, until=None):
+        """OHLCV DataFrame에서 last_date 이후 (until(YYYY-MM-DD)까지의) 막대를 덧붙이고 [(날짜, 종류, 가격, 직전 값)]을 반환합니다."""
+        events = []
+        for day, high, low, close in zip(df.index, df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy()):
+            day = day.strftime('%Y-%m-%d')
+            if (self.last_date and day <= self.last_date) or (until and day > until):
+                continue
+            if high != high or low != low or close != close:
+                continue
+            events += [(day, *event) for event in self.push(day, float(high), float(low), float(close))]
+        return events
+
+
+class HighLowStore:
+    """종목별 52주 최고/최저가 덱과 이벤트를 SQLite 파일에 저장하고 조회하는 클래스"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def codes(self):
+        return [code for (code,) in self.conn.execute("SELECT code FROM high_low ORDER BY code")]
+
+    def load_states(self, codes=None):
+        """{코드: RollingExtremes} (codes가 없으면 저장된 전 종목)"""
+        sql = "SELECT code, highs, lows, since, last_date, close, prev_close FROM high_low"
+        params = []
+        if codes:
+            codes = list(codes)
+            sql += f" WHERE code IN ({','.join('?' * len(codes))})"
+            params = codes
+        return {code: RollingExtremes(json.loads(highs), json.loads(lows), since, last_date, close, prev_close)
+                for code, highs, lows, since, last_date, close, prev_close in self.conn.execute(sql, params)}
+
+    def save(self, states, events):
+        """갱신한 덱과 이벤트를 하나의 트랜잭션으로 저장합니다."""
+        rows = [(code, s.since, s.last_date, s.close, s.prev_close, *s.high[::-1], *s.low[::-1],
+                 json.dumps(list(s.highs)), json.dumps(list(s.lows)))
+                for code, s in states.items() if s.last_date]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO high_low (code, since, last_date, close, prev_close, high_52w, high_date, "
+                "low_52w, low_date, highs, lows) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO high_low_events (event_date, code, kind, price, prior) VALUES (?, ?, ?, ?, ?)",
+                events)
+        logging.info(f"52주 최고/최저가 {len(rows)}종목, 이벤트 {len(events)}건을 '{self.path}'에 저장했습니다.")
+        return len(rows)
+
+    def levels(self, codes=None, as_of=None):
+        """종목 코드 색인 DataFrame (LEVEL_COLUMNS + change_rate, high_ratio, low_ratio). as_of면 그날까지 갱신된 종목만"""
+        import pandas as pd
+
+        sql = f"SELECT code, {', '.join(LEVEL_COLUMNS)} FROM high_low WHERE 1 = 1"
+        params = []
+        if as_of:
+            sql += " AND last_date = ?"
+            params.append(as_of)
+        if codes:
+            codes = list(codes)
+            sql += f" AND code IN ({','.join('?' * len(codes))})"
+            params += codes
+        table = pd.DataFrame(self.conn.execute(sql, params).fetchall(), columns=['code'] + LEVEL_COLUMNS).set_index('code')
+        table['change_rate'] = (table['close'] / table['prev_close'] - 1) * 100
+        table['high_ratio'] = table['close'] / table['high_52w']
+        table['low_ratio'] = table['close'] / table['low_52w']
+        return table
+
+    def events(self, start=None, end=None, kind=None):
+        """[(날짜, 코드, 종류, 가격, 직전 52주 값)] 날짜 역순"""
+        sql = "SELECT event_date, code, kind, price, prior FROM high_low_events WHERE 1 = 1"
+        params = []
+        for clause, value in (("event_date >= ?", start), ("event_date <= ?", end), ("kind = ?", kind)):
+            if value:
+                sql += f" AND {clause}"
+                params.append(value)
+        return self.conn.execute(sql + " ORDER BY event_date DESC, kind, code", params).fetchall()
+
+
+def closed_session():
+    """시세 소스 기준 장이 끝난 가장 최근 거래일. 장중에는 당일 막대가 아직 확정되지 않았으므로 직전 거래일입니다."""
+    from market_data import latest_session
+
+    latest = latest_session()
+    if krx_calendar.is_session_open(krx_calendar.now()):
+        return krx_calendar.previous_trading_day(latest)
+    return latest
+
+
+def update(db_path, codes, max_workers=8, checkpoint=None):
+    """종목마다 마지막 저장일 다음 거래일부터(처음이면 최근 252거래일) 장이 끝난 거래일까지 시세를 받아 덱을 갱신하고 저장합니다.
+
+    장중 실행이면 당일 막대는 덧붙이지 않습니다. (마지막 저장일 이전 막대는 다시 읽지 않으므로 미완성 막대가 굳어 버림)
+    """
+    from market_data import get_recent_ohlcv
+
+    latest = closed_session()
+    with HighLowStore(db_path) as store:
+        states = store.load_states()
+    first_start = krx_calendar.trading_days_back(latest, WINDOW - 1)
+
+    def start_of(code):
+        state = states.get(code)
+        if state is None:
+            return first_start
+        return krx_calendar.next_trading_day(state.last_date)
+
+    pending = [code for code in codes if start_of(code) <= latest]
+    logging.info(f"52주 최고/최저가 갱신: {len(codes)}종목 중 {len(pending)}종목 ({latest} 기준)")
+    with stage('high_low.fetch'):
+        bars = run_stage(checkpoint, 'bars', pending, lambda code: get_recent_ohlcv(code, start_of(code)),
+                         max_workers=max_workers, label='시세 조회')
+
+    events = []
+    updated = {}
+    with stage('high_low.update'):
+        for code, df in bars.items():
+            # 처음 만드는 종목은 요청한 52주 창 전체를 받았으므로 (상장 1년 미만이면 상장일부터) 그 창의 시작일부터 덮은 것으로 봅니다.
+            state = states.setdefault(code, RollingExtremes(since=first_start.isoformat()))
+            events += [(day, code, kind, price, prior)
+                       for day, kind, price, prior in state.extend(df, until=latest.isoformat())]
+            updated[code] = state
+    with HighLowStore(db_path) as store:
+        store.save(updated, events)
+    return updated, events
+
+
+def load_levels(db_path, codes):
+    """시세 소스의 마지막 거래일까지 갱신된 종목의 {코드: (현재가, 등락률, 52주 최고가)}. db_path가 없으면 빈 딕셔너리
+
+    장중에는 색인이 직전 거래일까지만 있으므로 빈 딕셔너리가 되어 종목마다 실시간 시세를 받습니다.
+    """
+    if not db_path or not codes:
+        return {}
+    from market_data import latest_session
+
+    try:
+        with HighLowStore(db_path) as store:
+            table = store.levels(codes, as_of=latest_session().isoformat())
+    except sqlite3.Error as e:
+        logging.error(f"52주 최고/최저가 조회 오류: {e}")
+        return {}
+    table = table.dropna(subset=['close', 'change_rate', 'high_52w'])
+    return {code: (row.close, row.change_rate, row.high_52w) for code, row in table.iterrows()}
+
+
+def quote_52w(code, start_date, end_date, levels=None):
+    """(현재가, 등락률(%), 52주 최고가). levels(load_levels 결과)에 있으면 시세를 받지 않습니다. 시세가 없으면 None"""
+    if levels and code in levels:
+        return levels[code]
+    from market_data import get_ohlcv
+
+    df = get_ohlcv(code, start=start_date, end=end_date)
+    if df.empty:
+        return None
+    return df['Close'].iloc[-1], df['Change'].iloc[-1] * 100, df['High'].max()
+
+
+def rule_features(db_path, codes):
+    """점수 규칙에 넘길 low_52w, low_ratio (종목 x 열) DataFrame. 저장된 값이 없으면 None"""
+    if not db_path:
+        return None
+    try:
+        with HighLowStore(db_path) as store:
+            table = store.levels(codes)
+    except sqlite3.Error as e:
+        logging.error(f"52주 최고/최저가 조회 오류: {e}")
+        return None
+    return None if table.empty else table[['low_52w', 'low_ratio']]
+
+
+def _universe(args, stored):
+    """--codes/--codes-file/--listing 또는 저장된 전 종목 (없으면 업종 표의 전 종목)"""
+    codes = list(args.codes)
+    if args.codes_file:
+        from breakout_watcher import read_watchlist
+        codes += read_watchlist(args.codes_file)
+    if args.listing:
+        from price_panel import listing_codes
+        codes += listing_codes(args.listing)
+    if codes or stored:
+        return list(dict.fromkeys(codes or stored))
+    from sector_index import load_or_collect, DEFAULT_CACHE_PATH
+    index = load_or_collect(DEFAULT_CACHE_PATH, max_workers=args.workers)
+    return sorted({m.code for g in index.groups if g.kind == 'upjong' for m in g.members})
+
+
+def _fmt(value, pattern='{:,.0f}'):
+    return 'N/A' if value is None or value != value else pattern.format(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="52주 최고/최저가 색인 및 신고가/신저가 이벤트")
+    parser.add_argument('--db', type=str, default=DEFAULT_DB_PATH, help=f"결과 DB 파일 경로 (기본값: {DEFAULT_DB_PATH})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    upd = subparsers.add_parser('update', help="마지막 저장일 이후 시세로 52주 최고/최저가 갱신")
+    upd.add_argument('--codes', type=str, nargs='*', default=[], help="종목 코드 (기본값: 저장된 전 종목, 없으면 업종 표의 전 종목)")
+    upd.add_argument('--codes-file', type=str, help="종목 코드 파일 (.txt 또는 '코드' 컬럼 CSV)")
+    upd.add_argument('--listing', type=str, choices=['KRX', 'KOSPI', 'KOSDAQ'], help="FinanceDataReader 상장 종목 전체")
+    upd.add_argument('--workers', type=int, default=8, help="동시 조회 수 (기본값: 8)")
+    add_checkpoint_arguments(upd)
+    add_profile_arguments(upd)
+
+    show = subparsers.add_parser('show', help="종목별 52주 최고/최저가")
+    show.add_argument('--codes', type=str, nargs='*', help="종목 코드 (기본값: 전체)")
+    show.add_argument('--sort', type=str, default='high_ratio', help="정렬 열 (기본값: high_ratio, 내림차순)")
+    show.add_argument('--top', type=int, default=30, help="출력할 개수 (기본값: 30)")
+
+    ev = subparsers.add_parser('events', help="신고가/신저가 이벤트")
+    ev.add_argument('--kind', type=str, choices=['high', 'low'], help="이벤트 종류 (기본값: 둘 다)")
+    ev.add_argument('--days', type=int, default=1, help="최근 N거래일 (기본값: 1)")
+    ev.add_argument('--top', type=int, default=50, help="출력할 개수 (기본값: 50)")
+
+    args = parser.parse_args()
+    if args.command == 'update':
+        configure_from_args(args)
+        with HighLowStore(args.db) as store:
+            codes = _universe(args, store.codes())
+        checkpoint = Checkpoint(args.checkpoint or f"{args.db}.high_low.checkpoint",
+                                {'codes': codes, 'db': args.db}, resume=args.resume)
+        _, events = update(args.db, codes, args.workers, checkpoint)
+        checkpoint.finish()
+        highs = sum(1 for e in events if e[2] == 'high')
+        print(f"신고가 {highs}건, 신저가 {len(events) - highs}건")
+        profiler.finish()
+        return
+
+    with HighLowStore(args.db) as store:
+        if args.command == 'show':
+            table = store.levels(args.codes)
+        else:
+            latest = store.conn.execute("SELECT MAX(event_date) FROM high_low_events").fetchone()[0]
+            start = krx_calendar.trading_days_back(latest, args.days - 1).isoformat() if latest else None
+            events = store.events(start=start, kind=args.kind)
+    if args.command == 'show':
+        if table.empty:
+            print("저장된 52주 최고/최저가가 없습니다. 'python high_low_index.py update'로 만드세요.")
+            return
+        table = table.sort_values(args.sort, ascending=False).head(args.top)
+        rows = [{'code': code, 'date': row['last_date'], 'close': _fmt(row['close']),
+                 'change': _fmt(row['change_rate'], '{:+.2f}%'),
+                 'high_52w': f"{_fmt(row['high_52w'])} ({row['high_date']})", 'high_ratio': _fmt(row['high_ratio'], '{:.1%}'),
+                 'low_52w': f"{_fmt(row['low_52w'])} ({row['low_date']})", 'low_ratio': _fmt(row['low_ratio'], '{:.2f}')}
+                for code, row in table.iterrows()]
+        _print_rows(rows, ['code', 'date', 'close', 'change', 'high_52w', 'high_ratio', 'low_52w', 'low_ratio'])
+        return
+    if not events:
+        print("기록된 신고가/신저가 이벤트가 없습니다.")
+        return
+    rows = [{'date': day, 'code': code, 'kind': '신고가' if kind == 'high' else '신저가',
+             'price': _fmt(price), 'prior': _fmt(prior), 'change': f"{(price / prior - 1) * 100:+.2f}%"}
+            for day, code, kind, price, prior in events[:args.top]]
+    _print_rows(rows, ['date', 'code', 'kind', 'price', 'prior', 'change'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+공용 HTTP 클라이언트
+Naver 금융 / wisereport 요청을 한 곳에서 처리합니다.
+
+- 기본 URL은 환경변수로 바꿀 수 있습니다. (로컬 모의 서버 등)
+    KRX_NAVER_BASE_URL       (기본값: https://finance.naver.com)
+    KRX_WISEREPORT_BASE_URL  (기본값: https://comp.wisereport.co.kr)
+    KRX_NAVER_POLLING_BASE_URL (기본값: https://polling.finance.naver.com, 장중 실시간 시세)
+- 연결 풀을 공유하는 Session을 사용하고, 429/5xx 응답과 연결 오류/타임아웃은 KRX_HTTP_RETRIES 횟수만큼 재시도합니다.
+  재시도는 fetch()가 직접 하며 시도마다 예산을 다시 확인합니다. (Retry-After 대기로 마감을 넘기지 않도록)
+- fetch_soup()는 같은 URL의 본문을 페이지 캐시(기본값: KRX_PAGE_TTL 초(300) TTL 캐시, 상주 프로세스에서는
+  use_page_cache()로 교체)에서 재사용하고, 같은 URL을 동시에 요청하면 진행 중인 한 번의 요청을 함께 기다립니다.
+- use_offline()을 켜면 네트워크 요청 없이 페이지 캐시(스냅샷 번들 등)에 있는 본문만 사용합니다.
+- 요청마다 run_budget의 전체 마감/호스트별 예산/회로 차단기를 확인하고, 타임아웃을 남은 시간 이하로 줄입니다.
+"""
+
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from profiling import stage
+from run_budget import budget, SourceUnavailable
+from ttl_cache import TTLCache, SingleFlight
+
+NAVER_BASE_URL = os.environ.get('KRX_NAVER_BASE_URL', 'https://finance.naver.com').rstrip('/')
+WISEREPORT_BASE_URL = os.environ.get('KRX_WISEREPORT_BASE_URL', 'https://comp.wisereport.co.kr').rstrip('/')
+POLLING_BASE_URL = os.environ.get('KRX_NAVER_POLLING_BASE_URL', 'https://polling.finance.naver.com').rstrip('/')
+
+DEFAULT_TIMEOUT = 10
+RETRIES = int(os.environ.get('KRX_HTTP_RETRIES', '2'))
+RETRY_BACKOFF = 0.3
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+_session = None
+_session_lock = threading.Lock()
+_page_cache = TTLCache(float(os.environ.get('KRX_PAGE_TTL', '300')), name='pages')
+_page_flights = SingleFlight(name='pages')
+_offline = False
+
+
+def _build_session():
+    """연결 풀이 설정된 Session을 만듭니다. (재시도는 fetch()에서 예산을 확인하며 직접 합니다)"""
+    pool_size = int(os.environ.get('KRX_HTTP_POOL_SIZE', '32'))
+    adapter = HTTPAdapter(max_retries=0, pool_connections=8, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    """프로세스 전역 Session을 반환합니다."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _is_host_failure(error):
+    """호스트 상태 문제(연결/타임아웃/5xx/429)인지. 404 같은 요청 오류는 회로 차단기에 세지 않습니다."""
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def _attempt(host, url, timeout, **kwargs):
+    """예산을 확인하고 한 번 요청합니다. 회로 차단기 시험 호출이 남지 않도록 결과는 항상 release()로 기록합니다."""
+    timeout = budget.acquire(host, timeout)
+    started = time.monotonic()
+    ok = False
+    try:
+        with stage('http.fetch', host=url):
+            response = get_session().get(url, timeout=timeout, **kwargs)
+            response.raise_for_status()
+        ok = True
+    except requests.exceptions.RequestException as e:
+        ok = not _is_host_failure(e)
+        raise
+    finally:
+        budget.release(host, started, ok)
+    return response
+
+
+def fetch(url, timeout=DEFAULT_TIMEOUT, encoding=None, **kwargs):
+    """URL을 GET 요청하고 응답을 반환합니다. HTTP 오류와 예산 초과/차단은 requests 예외로 전달됩니다.
+
+    호스트 장애(연결 오류/타임아웃/429/5xx)는 RETRIES번까지 짧게 기다렸다 다시 요청합니다. 시도마다 예산을 다시 확인하고,
+    남은 시간이 대기보다 짧으면 재시도하지 않습니다.
+    """
+    host = urlparse(url).netloc
+    if _offline:
+        raise SourceUnavailable(f"{host}: 오프라인 모드 (스냅샷에 없는 페이지)")
+    for attempt in range(RETRIES + 1):
+        try:
+            response = _attempt(host, url, timeout, **kwargs)
+            break
+        except requests.exceptions.RequestException as e:
+            delay = RETRY_BACKOFF * 2 ** attempt
+            remaining = budget.remaining(host)
+            if attempt == RETRIES or not _is_host_failure(e) or (remaining is not None and remaining <= delay):
+                raise
+            time.sleep(delay)
+    if encoding:
+        response.encoding = encoding
+    return response
+
+
+def use_page_cache(cache):
+    """fetch_soup()가 응답 본문을 재사용할 캐시(get/set 제공, 예: ttl_cache.TTLCache)를 설정합니다. None이면 해제합니다.
+
+    이전 캐시를 반환합니다. (잠시 바꿨다가 되돌릴 때)
+    """
+    global _page_cache
+    previous, _page_cache = _page_cache, cache
+    return previous
+
+
+def use_offline(enabled=True):
+    """네트워크 요청을 막습니다. 켜져 있으면 fetch()는 요청하지 않고 SourceUnavailable을 발생시킵니다. 이전 값을 반환합니다."""
+    global _offline
+    previous, _offline = _offline, enabled
+    return previous
+
+
+def _fetch_text(url, timeout, encoding, cache):
+    text = fetch(url, timeout=timeout, encoding=encoding).text
+    if cache is not None:
+        cache.set(url, text)
+    return text
+
+
+def fetch_soup(url, timeout=DEFAULT_TIMEOUT, encoding='euc-kr'):
+    """URL의 HTML을 가져와 BeautifulSoup 객체로 반환합니다."""
+    from bs4 import BeautifulSoup
+
+    cache = _page_cache
+    text = cache.get(url) if cache is not None else None
+    if text is None:
+        text = _page_flights.do((url, encoding), lambda: _fetch_text(url, timeout, encoding, cache))
+    with stage('bs4.parse'):
+        return BeautifulSoup(text, 'html.parser')
+
+
+def naver_url(path):
+    """Naver 금융 경로('/sise/...')를 전체 URL로 변환합니다."""
+    return f"{NAVER_BASE_URL}{path}"
+
+
+def wisereport_url(path):
+    """wisereport 경로('/ranking/...')를 전체 URL로 변환합니다."""
+    return f"{WISEREPORT_BASE_URL}{path}"
+
+
+def polling_url(path):
+    """Naver 실시간 시세 경로('/api/realtime?...')를 전체 URL로 변환합니다."""
+    return f"{POLLING_BASE_URL}{path}"
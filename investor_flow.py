@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+종목별 외국인/기관 순매매 이력
+순매수 상위 목록에 들었는지만으로는 수급의 크기를 알 수 없으므로, 종목별 외국인/기관 일별 순매매 페이지
+(item/frgn.naver)를 여러 종목 동시에 페이지를 넘기며 수집해 시세 패널 옆에 같은 형식(종목 × 날짜 .npy)으로 저장합니다.
+
+    panel/flows/meta.json         종목/날짜 색인 (price_panel과 같은 형식, PricePanel.attach로 열 수 있음)
+    panel/flows/<필드>.npy        Close, Volume, InstNet(기관 순매매량), ForeignNet(외국인 순매매량),
+                                  ForeignShares(외국인 보유주수), ForeignRatio(외국인 보유율 %)
+
+다시 실행하면 종목마다 저장된 마지막 날짜 이후 페이지만 받아 이어 붙입니다.
+페이지에는 순매매 금액이 없으므로 금액은 순매매량 × 종가로, 시가총액은 종가 × (보유주수 / 보유율)로 추정합니다.
+
+사용 예:
+    python investor_flow.py update --listing KOSPI --workers 16      # 처음: 최근 --max-pages 페이지(20일씩)
+    python investor_flow.py update                                   # 저장된 종목 전체를 마지막 날짜 이후로 갱신
+    python investor_flow.py score --window 5 20 --top 20             # N일 누적 순매수 금액 / 시가총액 순위
+"""
+
+import argparse
+import logging
+import os
+import re
+
+import numpy as np
+
+from checkpoint import Checkpoint, run_stage, add_checkpoint_arguments
+from http_client import naver_url, fetch
+from profiling import stage, profiler, add_profile_arguments, configure_from_args
+from price_panel import PricePanel, META_FILE, write_panel, listing_codes
+from results_store import _print_rows
+from sector_index import parse_last_page
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+FLOW_FIELDS = ('Close', 'Volume', 'InstNet', 'ForeignNet', 'ForeignShares', 'ForeignRatio')
+DEFAULT_PATH = os.path.join('panel', 'flows')
+DEFAULT_MAX_PAGES = 13  # 처음 수집하는 종목은 최근 약 1년(20일 × 13페이지)
+DEFAULT_WINDOWS = (5, 20)
+
+_DATE = re.compile(r'(\d{4})\.(\d{2})\.(\d{2})')
+
+
+def _to_number(text):
+    text = text.strip().replace(',', '').replace('%', '').replace('+', '')
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def parse_flow_rows(soup):
+    """순매매 표(table.type2)를 [(날짜, 종가, 거래량, 기관, 외국인, 보유주수, 보유율)] 최근 날짜 순으로 읽습니다.
+
+    칸 순서: 날짜, 종가, 전일비, 등락률, 거래량, 기관 순매매량, 외국인 순매매량, 보유주수, 보유율
+    """
+    rows = []
+    if not soup:
+        return rows
+    for table in soup.find_all('table', class_='type2'):
+        for row in table.find_all('tr'):
+            cols = row.find_all('td')
+            if len(cols) < 9:
+                continue
+            match = _DATE.search(cols[0].text)
+            if not match:
+                continue
+            values = [_to_number(cols[i].text) for i in (1, 4, 5, 6, 7, 8)]
+            rows.append(('-'.join(match.groups()), *values))
+    return rows
+
+
+def _fetch_flow_page(code, page):
+    from bs4 import BeautifulSoup
+
+    # 대량 수집 페이지는 한 번만 읽으므로 페이지 캐시(fetch_soup)를 거치지 않습니다.
+    text = fetch(naver_url(f'/item/frgn.naver?code={code}&page={page}'), encoding='euc-kr').text
+    with stage('bs4.parse'):
+        return BeautifulSoup(text, 'html.parser')
+
+
+def fetch_flow_history(code, since=None, max_pages=DEFAULT_MAX_PAGES):
+    """since(YYYY-MM-DD) 이후의 일별 순매매를 DataFrame(날짜 오름차순)으로 받습니다.
+
+    since가 있으면 그 날짜가 나오는 페이지까지만, 없으면 max_pages 페이지까지 넘깁니다.
+    """
+    import pandas as pd
+
+    rows, page, last_page = [], 1, max_pages
+    while page <= last_page:
+        soup = _fetch_flow_page(code, page)
+        parsed = parse_flow_rows(soup)
+        if not parsed:
+            break
+        rows += parsed
+        if page == 1:
+            last_page = min(parse_last_page(soup), max_pages)
+        if since is not None and parsed[-1][0] <= since:
+            break
+        page += 1
+
+    df = pd.DataFrame(rows, columns=('Date',) + FLOW_FIELDS)
+    df['Date'] = pd.to_datetime(df['Date'])
+    df = df.drop_duplicates('Date').set_index('Date').sort_index()
+    if since is not None:
+        df = df[df.index > pd.Timestamp(since)]
+    return df
+
+
+def _stored_frames(path):
+    """저장된 순매매 패널을 {종목 코드: DataFrame}으로 읽습니다. (메모리로 복사, 없으면 빈 dict)"""
+    import pandas as pd
+
+    if not os.path.exists(os.path.join(path, META_FILE)):
+        return {}
+    panel = PricePanel.attach(path)
+    frames = {}
+    for code in panel.tickers:
+        df = pd.DataFrame({field: np.array(panel.row(code, field)) for field in panel.arrays},
+                          index=panel.date_index)
+        frames[code] = df.dropna(subset=['Close'])
+    return frames
+
+
+def update_flows(path=DEFAULT_PATH, codes=None, max_workers=8, max_pages=DEFAULT_MAX_PAGES, checkpoint=None):
+    """종목별 순매수 이력을 저장된 마지막 날짜 이후로 동시에 갱신합니다. codes가 없으면 저장된 종목 전체.
+
+    checkpoint가 있으면 종목마다 받은 이력을 기록하고, 이어 하면 기록된 종목은 다시 받지 않습니다.
+    """
+    import pandas as pd
+
+    with stage('investor_flow.load'):
+        frames = _stored_frames(path)
+    codes = list(dict.fromkeys(codes or frames))
+    since = {code: frames[code].index[-1].strftime('%Y-%m-%d')
+             for code in codes if code in frames and not frames[code].empty}
+
+    added = 0
+    with stage('investor_flow.fetch'):
+        fetched = run_stage(checkpoint, 'flows', codes, lambda code: fetch_flow_history(code, since.get(code), max_pages),
+                            max_workers=max_workers, label='순매매 조회')
+    for code, df in fetched.items():
+        if df.empty:
+            continue
+        added += len(df)
+        frames[code] = pd.concat([frames[code], df]) if code in frames else df
+    logging.info(f"순매매 {len(codes)}종목 갱신, {added}행 추가")
+    with stage('investor_flow.write'):
+        return write_panel(path, frames, FLOW_FIELDS)
+
+
+def flow_features(panel, windows=DEFAULT_WINDOWS):
+    """종목 × 날짜 순매매 패널로 수급 지표를 한 번에 계산합니다.
+
+    결과는 (날짜 x 종목) DataFrame 사전입니다.
+      - foreign_N / inst_N: N일 누적 순매수 금액 / 시가총액 (%)
+      - money_N: 외국인 + 기관 합계 (%)
+      - mcap: 추정 시가총액 (원)
+    """
+    import pandas as pd
+
+    close = np.asarray(panel.field('Close'))
+    ratio = np.asarray(panel.field('ForeignRatio'))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = np.where(ratio > 0, np.asarray(panel.field('ForeignShares')) / (ratio / 100), np.nan)
+    # 보유율이 0인 날은 직전 상장주식수 추정치를 이어서 씁니다.
+    filled = pd.DataFrame(shares.T).ffill().to_numpy().T
+    mcap = close * filled
+
+    def as_frame(values):
+        return pd.DataFrame(values.T, index=panel.date_index, columns=panel.tickers)
+
+    metrics = {'mcap': as_frame(mcap)}
+    amounts = {'foreign': np.asarray(panel.field('ForeignNet')) * close,
+               'inst': np.asarray(panel.field('InstNet')) * close}
+    for window in windows:
+        totals = {}
+        for name, amount in amounts.items():
+            # 누적합 차이로 N일 합계를 계산하고, N일이 다 차지 않은 날은 NaN으로 둡니다.
+            cumulative = np.cumsum(np.nan_to_num(amount), axis=1)
+            total = cumulative.copy()
+            total[:, window:] -= cumulative[:, :-window]
+            total[:, :window - 1] = np.nan
+            totals[name] = total
+            with np.errstate(divide='ignore', invalid='ignore'):
+                metrics[f'{name}_{window}'] = as_frame(total / mcap * 100)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics[f'money_{window}'] = as_frame((totals['foreign'] + totals['inst']) / mcap * 100)
+    return metrics
+
+
+def latest_scores(panel, windows=DEFAULT_WINDOWS):
+    """마지막 날짜 기준 종목별 수급 지표 표 (첫 번째 기간 money 순 정렬)"""
+    import pandas as pd
+
+    metrics = flow_features(panel, windows)
+    table = pd.DataFrame({key: frame.iloc[-1] for key, frame in metrics.items()})
+    return table.dropna(subset=[f'money_{windows[0]}']).sort_values(f'money_{windows[0]}', ascending=False)
+
+
+def _fmt(value, spec):
+    return 'N/A' if value is None or value != value else format(value, spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="종목별 외국인/기관 순매매 이력 수집 및 수급 지표")
+    parser.add_argument('--path', type=str, default=DEFAULT_PATH, help=f"순매매 패널 디렉터리 (기본값: {DEFAULT_PATH})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    update = subparsers.add_parser('update', help="순매매 이력 수집/갱신 (저장된 마지막 날짜 이후만)")
+    update.add_argument('--codes', type=str, nargs='*', default=[], help="종목 코드")
+    update.add_argument('--codes-file', type=str, help="종목 코드 파일 (.txt 또는 '코드' 컬럼 CSV)")
+    update.add_argument('--listing', type=str, choices=['KRX', 'KOSPI', 'KOSDAQ'], help="FinanceDataReader 상장 종목 전체")
+    update.add_argument('--workers', type=int, default=8, help="동시 조회 종목 수 (기본값: 8)")
+    update.add_argument('--max-pages', type=int, default=DEFAULT_MAX_PAGES,
+                        help=f"처음 수집하는 종목의 최대 페이지 수 (20일씩, 기본값: {DEFAULT_MAX_PAGES})")
+    add_checkpoint_arguments(update)
+    add_profile_arguments(update)
+
+    score = subparsers.add_parser('score', help="N일 누적 순매수 금액 / 시가총액 순위")
+    score.add_argument('--window', type=int, nargs='+', default=list(DEFAULT_WINDOWS), help="누적 기간(일) (기본값: 5 20)")
+    score.add_argument('--top', type=int, default=20, help="출력할 개수 (기본값: 20)")
+
+    args = parser.parse_args()
+    if args.command == 'score':
+        panel = PricePanel.attach(args.path)
+        windows = tuple(args.window)
+        table = latest_scores(panel, windows)
+        print(f"수급 지표 ({panel.dates[0]} ~ {panel.dates[-1]}, {len(panel.tickers)}종목, 시가총액 대비 %)\n")
+        rows = []
+        for code, row in table.head(args.top).iterrows():
+            item = {'code': code, 'mcap(억)': _fmt(row['mcap'] / 1e8, ',.0f')}
+            for window in windows:
+                for name in ('money', 'foreign', 'inst'):
+                    item[f'{name}_{window}'] = _fmt(row[f'{name}_{window}'], '+.3f')
+            rows.append(item)
+        _print_rows(rows, ['code', 'mcap(억)'] + [f'{n}_{w}' for w in windows for n in ('money', 'foreign', 'inst')])
+        return
+
+    configure_from_args(args)
+    codes = list(args.codes)
+    if args.codes_file:
+        from breakout_watcher import read_watchlist
+        codes += read_watchlist(args.codes_file)
+    if args.listing:
+        codes += listing_codes(args.listing)
+    if not codes and not os.path.exists(os.path.join(args.path, META_FILE)):
+        parser.error("처음 수집할 때는 --codes, --codes-file, --listing 중 하나 이상을 지정하세요.")
+    checkpoint = Checkpoint(args.checkpoint or f"{args.path.rstrip(os.sep)}.checkpoint",
+                            {'codes': codes, 'max_pages': args.max_pages}, resume=args.resume)
+    update_flows(args.path, codes, args.workers, args.max_pages, checkpoint)
+    checkpoint.finish()
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import pandas as pd
 import requests
 
+from http_client import naver_url, fetch
+
 def get_kosdaq_top_stocks(sort_by='PER', ascending=True, top_n=30):
     """
     Naver Finance에서 KOSDAQ 데이터를 스크래핑하고 지정된 컬럼으로 정렬하여 반환합니다.
@@ -14,17 +16,11 @@ def get_kosdaq_top_stocks(sort_by='PER', ascending=True, top_n=30):
         pandas.DataFrame: 정렬된 KOSDAQ 종목 데이터.
     """
     # KOSDAQ 상승률 페이지 URL (sosok=1)
-    url = "https://finance.naver.com/sise/sise_rise.naver?sosok=1"
-
-    # 웹사이트가 스크립트 접근을 차단하는 것을 피하기 위해 헤더 설정
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+    url = naver_url("/sise/sise_rise.naver?sosok=1")
 
     try:
-        # requests를 사용하여 페이지 HTML 가져오기
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # HTTP 오류가 발생하면 예외 발생
+        # 공용 세션으로 페이지 HTML 가져오기 (브라우저 User-Agent 헤더 포함, HTTP 오류 시 예외 발생)
+        response = fetch(url)
 
         # Naver Finance는 'euc-kr' 인코딩을 사용합니다.
         html_content = response.content
@@ -82,7 +78,7 @@ def get_kosdaq_top_stocks(sort_by='PER', ascending=True, top_n=30):
         print(f"데이터 처리 중 오류 발생: {e}")
         return pd.DataFrame()
 
-if __name__ == "__main__":
+def main():
     # PER 기준으로 오름차순 정렬하여 상위 15개 종목 보기
     print("--- KOSDAQ 주식 (PER 낮은 순) ---")
     sorted_by_per = get_kosdaq_top_stocks(sort_by='PER', ascending=True, top_n=15)
@@ -95,3 +91,7 @@ if __name__ == "__main__":
     print("--- KOSDAQ 주식 (ROE 높은 순) ---")
     sorted_by_roe = get_kosdaq_top_stocks(sort_by='ROE', ascending=False, top_n=15)
     print(sorted_by_roe)
+
+
+if __name__ == "__main__":
+    main()
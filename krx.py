@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+통합 명령행 도구
+기존 스크립트들을 하나의 진입점에서 서브커맨드로 실행합니다.
+
+    python krx.py dashboard [--console] [옵션]   # unified_dashboard_html.py (--console: unified_dashboard.py)
+    python krx.py screen [옵션]                  # find_stocks.py
+    python krx.py backtest [옵션]                # backtest.py
+    python krx.py top200 [출력 파일]             # fetch_top200_operating_profit.py
+    python krx.py kosdaq                         # kosdaq_analyzer.py
+    python krx.py names                          # get_stock_names.py
+    python krx.py watch [옵션]                   # breakout_watcher.py (장중 돌파 감시)
+    python krx.py sectors [옵션]                 # sector_index.py (업종/테마 구성 종목 색인)
+    python krx.py panel build|info [옵션]        # price_panel.py (공유 시세 패널)
+    python krx.py snapshot collect|info [옵션]   # snapshot_bundle.py (거래일 스냅샷 번들)
+    python krx.py flows update|score [옵션]      # investor_flow.py (종목별 외국인/기관 순매매 이력)
+    python krx.py daemon [옵션]                  # daemon.py (상주 서버)
+
+이 파일은 표준 라이브러리만 불러오며, pandas/yfinance/FinanceDataReader/bs4 등
+무거운 패키지는 선택된 서브커맨드의 모듈을 불러올 때만 로드됩니다.
+서브커맨드 이후의 인자는 해당 스크립트의 옵션으로 그대로 전달됩니다.
+
+환경변수 KRX_DAEMON_URL(예: http://127.0.0.1:8766)이 설정되어 있으면 명령을 직접 실행하지 않고
+상주 서버(daemon.py)에 보내 캐시된 데이터로 실행한 결과를 출력합니다.
+"""
+
+import importlib
+import os
+import sys
+
+# 서브커맨드 -> (모듈, 진입 함수, 설명)
+COMMANDS = {
+    'dashboard': ('unified_dashboard_html', 'main', "통합 대시보드 HTML 생성 (--console: 콘솔 출력)"),
+    'screen': ('find_stocks', 'main', "N일 연속 순매수 종목 스크리닝"),
+    'backtest': ('backtest', 'main', "어제 순매수 상위 종목의 다음날 등락률 분석"),
+    'top200': ('fetch_top200_operating_profit', 'main', "KOSPI 영업이익 Top 200 엑셀 생성"),
+    'kosdaq': ('kosdaq_analyzer', 'main', "KOSDAQ 상승 종목 PER/ROE 정렬"),
+    'names': ('get_stock_names', 'get_foreign_buy_stock_list', "외국인 순매수 상위 종목명 출력"),
+    'sectors': ('sector_index', 'main', "업종/테마 구성 종목 색인 및 종목별 소속 조회"),
+    'panel': ('price_panel', 'main', "작업자 공유용 메모리 매핑 시세 패널 생성/조회"),
+    'archive': ('price_archive', 'main', "장기 시세 압축 보관소 생성/조회 (차분/지그재그 부호화, 연도별 묶음)"),
+    'flows': ('investor_flow', 'main', "종목별 외국인/기관 순매매 이력 수집 및 수급 지표"),
+    'streaks': ('rank_history', 'main', "순매수 상위 목록 이력 저장 및 종목별 연속 순매수 일수"),
+    'highlow': ('high_low_index', 'main', "종목별 52주 최고/최저가 색인 증분 갱신 및 신고가/신저가 이벤트"),
+    'rules': ('scoring_rules', 'main', "필터/점수 규칙 확인 및 저장된 분석 결과 다시 채점"),
+    'xsection': ('cross_section', 'main', "일별 횡단면 백분위 지표 계산/조회 (시장 전체 / 업종 안)"),
+    'scan': ('scan_queue', 'main', "전 종목 분할 스캔 (작업 큐 제출/작업자/병합)"),
+    'snapshot': ('snapshot_bundle', 'main', "거래일 스냅샷 번들 수집/조회 (--snapshot으로 재사용)"),
+    'watch': ('breakout_watcher', 'main', "장중 관심 종목 돌파 감시"),
+    'daemon': ('daemon', 'main', "캐시를 유지하는 상주 서버 실행"),
+}
+
+CONSOLE_DASHBOARD = ('unified_dashboard', 'main')
+
+
+def load(command, console=False):
+    """서브커맨드의 진입 함수를 불러옵니다. (해당 모듈의 의존성만 로드됩니다)"""
+    module_name, func_name, _ = COMMANDS[command]
+    if command == 'dashboard' and console:
+        module_name, func_name = CONSOLE_DASHBOARD
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def run_remote(base_url, command, args):
+    """상주 서버에 명령을 보내고 출력을 그대로 표시합니다."""
+    from urllib.parse import urlencode
+    from urllib.request import urlopen
+
+    url = f"{base_url.rstrip('/')}/run/{command}?{urlencode([('arg', a) for a in args])}"
+    with urlopen(url) as response:
+        sys.stdout.write(response.read().decode('utf-8'))
+        return int(response.headers.get('X-Exit-Code', '0'))
+
+
+def run_local(command, args):
+    """서브커맨드를 이 프로세스에서 실행하고 종료 코드를 반환합니다."""
+    console = command == 'dashboard' and '--console' in args
+    if console:
+        args = [arg for arg in args if arg != '--console']
+    entry = load(command, console=console)
+
+    # 각 스크립트의 argparse/sys.argv 처리가 그대로 동작하도록 인자를 넘겨줍니다.
+    sys.argv = [f"krx {command}", *args]
+    result = entry()
+    return result if isinstance(result, int) else 0
+
+
+def usage():
+    lines = ["사용법: python krx.py <command> [옵션...]", "", "명령:"]
+    lines += [f"  {name:<10} {help_text}" for name, (_, _, help_text) in COMMANDS.items()]
+    lines += ["", "각 명령의 옵션은 'python krx.py <command> --help'로 확인하세요."]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"알 수 없는 명령: {command}\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    daemon_url = os.environ.get('KRX_DAEMON_URL')
+    if daemon_url and command != 'daemon':
+        return run_remote(daemon_url, command, rest)
+
+    return run_local(command, rest)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+KRX 거래일 달력
+휴장일(공휴일, 대체공휴일, 선거일, 근로자의날, 연말 휴장)과 개장/폐장 시간이 바뀌는 날
+(새해 첫 거래일 10:00 개장, 수능일 10:00~16:30)을 미리 계산해 두고,
+직전 거래일, N 거래일 전, 장 운영 여부를 네트워크 조회 없이 계산합니다.
+
+표에 없는 해는 주말만 휴장일로 봅니다. 임시공휴일 등 추가 휴장일은
+환경변수 KRX_EXTRA_HOLIDAYS="2026-07-17,2026-12-24" 로 더할 수 있습니다.
+기준 시각은 환경변수 KRX_AS_OF="2026-10-16 15:30" 또는 use_as_of()로 고정할 수 있습니다. (합성 시장/재현용)
+"""
+
+import os
+from datetime import date, datetime, time, timedelta, timezone
+
+KST = timezone(timedelta(hours=9))
+
+REGULAR_OPEN = time(9, 0)
+REGULAR_CLOSE = time(15, 30)
+
+# 주말이 아닌 휴장일
+HOLIDAYS = frozenset(date.fromisoformat(d) for d in (
+    # 2023
+    '2023-01-23', '2023-01-24', '2023-03-01', '2023-05-01', '2023-05-05', '2023-05-29', '2023-06-06',
+    '2023-08-15', '2023-09-28', '2023-09-29', '2023-10-02', '2023-10-03', '2023-10-09', '2023-12-25',
+    '2023-12-29',
+    # 2024
+    '2024-01-01', '2024-02-09', '2024-02-12', '2024-03-01', '2024-04-10', '2024-05-01', '2024-05-06',
+    '2024-05-15', '2024-06-06', '2024-08-15', '2024-09-16', '2024-09-17', '2024-09-18', '2024-10-01',
+    '2024-10-03', '2024-10-09', '2024-12-25', '2024-12-31',
+    # 2025
+    '2025-01-01', '2025-01-27', '2025-01-28', '2025-01-29', '2025-01-30', '2025-03-03', '2025-05-01',
+    '2025-05-05', '2025-05-06', '2025-06-03', '2025-06-06', '2025-08-15', '2025-10-03', '2025-10-06',
+    '2025-10-07', '2025-10-08', '2025-10-09', '2025-12-25', '2025-12-31',
+    # 2026
+    '2026-01-01', '2026-02-16', '2026-02-17', '2026-02-18', '2026-03-02', '2026-05-01', '2026-05-05',
+    '2026-05-25', '2026-06-03', '2026-08-17', '2026-09-24', '2026-09-25', '2026-10-05', '2026-10-09',
+    '2026-12-25', '2026-12-31',
+    # 2027
+    '2027-01-01', '2027-02-08', '2027-02-09', '2027-03-01', '2027-05-05', '2027-05-13', '2027-08-16',
+    '2027-09-14', '2027-09-15', '2027-09-16', '2027-10-04', '2027-10-11', '2027-12-27', '2027-12-31',
+))
+COVERED_YEARS = range(2023, 2028)
+
+# 개장/폐장 시간이 다른 날: 새해 첫 거래일(10:00 개장), 대학수학능력시험일(10:00 개장, 16:30 폐장)
+SPECIAL_SESSIONS = {
+    date(2023, 1, 2): (time(10, 0), REGULAR_CLOSE),
+    date(2023, 11, 16): (time(10, 0), time(16, 30)),
+    date(2024, 1, 2): (time(10, 0), REGULAR_CLOSE),
+    date(2024, 11, 14): (time(10, 0), time(16, 30)),
+    date(2025, 1, 2): (time(10, 0), REGULAR_CLOSE),
+    date(2025, 11, 13): (time(10, 0), time(16, 30)),
+    date(2026, 1, 2): (time(10, 0), REGULAR_CLOSE),
+    date(2026, 11, 19): (time(10, 0), time(16, 30)),
+    date(2027, 1, 4): (time(10, 0), REGULAR_CLOSE),
+    date(2027, 11, 18): (time(10, 0), time(16, 30)),
+}
+
+_extra_holidays = frozenset(
+    date.fromisoformat(d.strip()) for d in os.environ.get('KRX_EXTRA_HOLIDAYS', '').split(',') if d.strip()
+)
+_as_of = None
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if hasattr(value, 'date'):  # pandas.Timestamp
+        return value.date()
+    return date.fromisoformat(str(value)[:10])
+
+
+def _parse_as_of(value):
+    moment = datetime.fromisoformat(str(value))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=KST)
+    return moment
+
+
+def use_as_of(value):
+    """기준 시각을 고정합니다. ('YYYY-MM-DD[ HH:MM]' 또는 datetime, None이면 현재 시각) 이전 기준 시각을 반환합니다."""
+    global _as_of
+    previous, _as_of = _as_of, _parse_as_of(value) if value is not None else None
+    return previous
+
+
+def now():
+    """기준 시각 (KST)"""
+    if _as_of is not None:
+        return _as_of
+    spec = os.environ.get('KRX_AS_OF')
+    return _parse_as_of(spec) if spec else datetime.now(KST)
+
+
+# ---------- 거래일 ----------
+def is_trading_day(day):
+    day = _to_date(day)
+    return day.weekday() < 5 and day not in HOLIDAYS and day not in _extra_holidays
+
+
+def session_hours(day):
+    """(개장, 폐장) 시각. 휴장일이면 None"""
+    day = _to_date(day)
+    if not is_trading_day(day):
+        return None
+    return SPECIAL_SESSIONS.get(day, (REGULAR_OPEN, REGULAR_CLOSE))
+
+
+def previous_trading_day(day):
+    """day 이전(당일 제외)의 가장 가까운 거래일"""
+    day = _to_date(day) - timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def next_trading_day(day):
+    """day 이후(당일 제외)의 가장 가까운 거래일"""
+    day = _to_date(day) + timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+def trading_days_back(day, n):
+    """day(거래일이 아니면 직전 거래일)로부터 n 거래일 전 날짜. n=0이면 그 거래일 자신"""
+    day = _to_date(day)
+    if not is_trading_day(day):
+        day = previous_trading_day(day)
+    for _ in range(n):
+        day = previous_trading_day(day)
+    return day
+
+
+def trading_days(start=None, end=None, periods=None):
+    """start~end(양 끝 포함) 거래일 목록. periods를 주면 end에서 거꾸로 periods개(또는 start부터 periods개)"""
+    if periods is not None and start is None:
+        last = trading_days_back(end if end is not None else now(), 0)
+        days = [last]
+        while len(days) < periods:
+            days.append(previous_trading_day(days[-1]))
+        return days[::-1]
+    day, days = _to_date(start), []
+    last = _to_date(end) if end is not None else None
+    if not is_trading_day(day):
+        day = next_trading_day(day)
+    while (last is None or day <= last) and (periods is None or len(days) < periods):
+        days.append(day)
+        day = next_trading_day(day)
+    return days
+
+
+# ---------- 장 운영 ----------
+def _localize(moment):
+    moment = moment if moment is not None else now()
+    return moment.astimezone(KST) if moment.tzinfo else moment.replace(tzinfo=KST)
+
+
+def is_session_open(moment=None):
+    """moment(KST)에 정규장이 열려 있는지"""
+    moment = _localize(moment)
+    hours = session_hours(moment.date())
+    return hours is not None and hours[0] <= moment.time() < hours[1]
+
+
+def session_bounds(day):
+    """(개장 datetime, 폐장 datetime) KST. 휴장일이면 None"""
+    hours = session_hours(day)
+    if hours is None:
+        return None
+    day = _to_date(day)
+    return datetime.combine(day, hours[0], KST), datetime.combine(day, hours[1], KST)
+
+
+def latest_session(moment=None):
+    """moment 기준으로 이미 개장한 가장 최근 거래일 (장중이면 당일, 개장 전/휴장일이면 직전 거래일)"""
+    moment = _localize(moment)
+    hours = session_hours(moment.date())
+    if hours is not None and moment.time() >= hours[0]:
+        return moment.date()
+    return previous_trading_day(moment.date())
+
+
+def is_covered(day):
+    """휴장일 표가 있는 해인지 (표 밖의 해는 주말만 휴장일로 계산합니다)"""
+    return _to_date(day).year in COVERED_YEARS
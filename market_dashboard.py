@@ -1,65 +1,33 @@
-import FinanceDataReader as fdr
-import yfinance as yf
 from datetime import datetime
-import pandas as pd
 
-def get_krx_indices():
-    """FinanceDataReader를 사용하여 코스피와 코스닥 지수를 가져옵니다."""
-    indices = {
-        'KS11': '코스피 (KOSPI)',
-        'KQ11': '코스닥 (KOSDAQ)',
-    }
+from market_data import get_index_quotes, KRX_INDICES, FUTURES_INDICES
+
+
+def _rows(symbols, quotes):
     results = []
-    
-    for symbol, name in indices.items():
-        try:
-            df = fdr.DataReader(symbol, (datetime.now() - pd.Timedelta(days=5)).strftime('%Y-%m-%d'))
-            if df.empty: continue
-            
-            latest = df.iloc[-1]
-            results.append({
-                'name': name,
-                'symbol': symbol,
-                'price': f"{latest['Close']:,.2f}",
-                'change': f"{latest['Change']*100:+.2f}%"
-            })
-        except Exception:
+    for symbol, name in symbols.items():
+        quote = quotes.get(symbol)
+        if quote is None:
             continue
+        results.append({
+            'name': name,
+            'symbol': symbol,
+            'price': f"{quote.price:,.2f}",
+            'change': f"{quote.change_pct:+.2f}%"
+        })
     return results
 
-def get_yfinance_futures():
-    """yfinance를 사용하여 미국 선물 지수 데이터를 가져옵니다."""
-    indices_to_find = {
-        'NQ=F': '나스닥 100 선물',
-        'ES=F': 'S&P 500 선물',
-        '^VIX': 'VIX 공포지수',
-    }
-    results = []
-    
-    for ticker, name in indices_to_find.items():
-        try:
-            # yfinance는 최근 2일치 데이터를 위해 '2d' period를 사용할 수 있습니다.
-            data = yf.Ticker(ticker).history(period="2d")
-            if data.empty or len(data) < 2:
-                continue
-            
-            latest = data.iloc[-1]
-            previous = data.iloc[-2]
-            
-            price = latest['Close']
-            change = price - previous['Close']
-            change_percent = (change / previous['Close']) * 100
-            
-            results.append({
-                'name': name,
-                'symbol': ticker,
-                'price': f"{price:,.2f}",
-                'change': f"{change_percent:+.2f}%"
-            })
-        except Exception as e:
-            print(f"yfinance로 '{name}' 데이터를 가져오는 중 오류 발생: {e}")
-    
-    return results
+def get_krx_indices(quotes=None):
+    """FinanceDataReader를 사용하여 코스피와 코스닥 지수를 가져옵니다."""
+    if quotes is None:
+        quotes = get_index_quotes(KRX_INDICES, {})
+    return _rows(KRX_INDICES, quotes)
+
+def get_yfinance_futures(quotes=None):
+    """yfinance를 사용하여 미국 선물 지수 데이터를 가져옵니다. (모든 종목을 한 번의 요청으로 조회)"""
+    if quotes is None:
+        quotes = get_index_quotes({}, FUTURES_INDICES)
+    return _rows(FUTURES_INDICES, quotes)
 
 def display_dashboard(all_indices):
     """가져온 모든 지수 정보를 보기 좋게 출력합니다."""
@@ -85,11 +53,14 @@ def display_dashboard(all_indices):
         print("-"*60)
 
 if __name__ == "__main__":
-    # 1. 국내 지수 가져오기
-    krx_data = get_krx_indices()
+    # 국내 지수와 해외 선물 지수를 동시에 조회합니다.
+    quotes = get_index_quotes(KRX_INDICES, FUTURES_INDICES)
+
+    # 1. 국내 지수
+    krx_data = get_krx_indices(quotes)
     
-    # 2. 해외 선물 지수 가져오기
-    futures_data = get_yfinance_futures()
+    # 2. 해외 선물 지수
+    futures_data = get_yfinance_futures(quotes)
     
     # 3. 결과 합쳐서 출력하기
     display_dashboard(krx_data + futures_data)
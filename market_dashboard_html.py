@@ -1,17 +1,14 @@
 import pandas as pd
-import requests
+
+from http_client import naver_url, fetch
 
 def get_all_kosdaq_data():
     """
     Naver Finance에서 KOSDAQ 상승률 페이지의 모든 종목 데이터를 스크래핑하고 정제하여 반환합니다.
     """
-    url = "https://finance.naver.com/sise/sise_rise.naver?sosok=1"
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+    url = naver_url("/sise/sise_rise.naver?sosok=1")
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+        response = fetch(url)
         tables = pd.read_html(response.content, encoding='euc-kr')
         
         df = None
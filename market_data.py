@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+시세 데이터 조회
+모든 모듈의 OHLCV 조회를 get_ohlcv() 한 곳으로 모아 측정과 데이터 소스 교체를 지원합니다.
+
+기본 소스는 FinanceDataReader 입니다. 부하 테스트 등에서는 use_reader()로 교체하거나
+환경변수 KRX_SYNTHETIC_MARKET="tickers=2500,years=10,seed=42" 로 합성 시장을 사용할 수 있습니다.
+한 실행 안에서 같은 종목을 기간만 조금 다르게 여러 번 조회하는 경우가 많으므로, 종목마다 요청 기간을 포함하는
+넓은 기간(시작일이 최근 KRX_OHLCV_WINDOW_DAYS일(기본값 400)보다 늦으면 그 날부터 최신까지)을 한 번 조회해
+캐시(기본값: KRX_OHLCV_TTL 초(3600) TTL 캐시, 상주 프로세스에서는 use_cache()로 교체)에 두고 요청 기간만 잘라 반환합니다.
+같은 종목을 동시에 조회하면 진행 중인 한 번의 조회를 함께 기다립니다. (single-flight)
+프로세스 풀 작업자는 use_panel()(또는 환경변수 KRX_PRICE_PANEL=패널 경로)로
+메모리 매핑된 공유 시세 패널(price_panel.py)에 붙어 패널에 있는 종목을 복사 없이 읽습니다.
+매일 며칠치만 덧붙이는 증분 갱신은 get_recent_ohlcv()로 넓히지 않은 기간만 조회합니다.
+
+시장 현황용 지수/선물 시세는 get_index_quotes()로 한 번에 조회합니다.
+yfinance 종목은 한 번의 일괄 다운로드로, KRX 지수는 그와 동시에 조회하며
+결과는 KRX_QUOTE_TTL 초(기본값 60) 동안 캐시합니다. (use_quote_cache()로 교체)
+시세 조회도 run_budget의 전체 마감/원본별 예산/회로 차단기를 따릅니다. (원본 이름: 시세 소스 호스트)
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import krx_calendar
+from profiling import stage
+from run_budget import budget
+from ttl_cache import TTLCache, SingleFlight
+
+OHLCV_WINDOW_DAYS = int(os.environ.get('KRX_OHLCV_WINDOW_DAYS', '400'))
+
+_reader = None
+_reader_host = None
+_cache = TTLCache(float(os.environ.get('KRX_OHLCV_TTL', '3600')), name='ohlcv')
+_flights = SingleFlight(name='ohlcv')
+_panel = None
+_quote_cache = TTLCache(float(os.environ.get('KRX_QUOTE_TTL', '60')), name='quotes')
+
+# 시장 현황 기본 종목
+KRX_INDICES = {
+    'KS11': '코스피 (KOSPI)',
+    'KQ11': '코스닥 (KOSDAQ)',
+}
+FUTURES_INDICES = {
+    'NQ=F': '나스닥 100 선물',
+    'ES=F': 'S&P 500 선물',
+    '^VIX': 'VIX 공포지수',
+}
+
+
+@dataclass(slots=True)
+class IndexQuote:
+    """지수/선물의 최근 종가와 전일 대비 등락"""
+    symbol: str
+    price: float
+    change: float
+    change_pct: float
+    time: datetime
+
+
+def _synthetic_options(spec):
+    """'tickers=2500,years=10,seed=42' 형식의 설정 문자열을 SyntheticMarket 인자로 변환합니다."""
+    options = dict(item.split('=', 1) for item in spec.split(',') if '=' in item)
+    return {
+        'n_tickers': int(options.get('tickers', 2500)),
+        'years': float(options.get('years', 10)),
+        'seed': int(options.get('seed', 42)),
+    }
+
+
+def _default_reader():
+    """환경변수에 따라 기본 시세 조회 함수를 결정합니다."""
+    spec = os.environ.get('KRX_SYNTHETIC_MARKET')
+    if spec is not None:
+        from synthetic_market import SyntheticMarket
+        market = SyntheticMarket(**_synthetic_options(spec))
+        use_synthetic_clock(market)
+        return market.data_reader, 'synthetic'
+    import FinanceDataReader as fdr
+    return fdr.DataReader, 'FinanceDataReader'
+
+
+def _ensure_reader():
+    global _reader, _reader_host, _panel
+    if _reader is None:
+        _reader, _reader_host = _default_reader()
+        path = os.environ.get('KRX_PRICE_PANEL')
+        if path and _panel is None:
+            from price_panel import PricePanel
+            _panel = PricePanel.attach(path)
+
+
+def use_synthetic_clock(market):
+    """기준 시각이 따로 정해지지 않았다면 거래일 달력의 기준 시각을 합성 시장 마지막 거래일 장 마감으로 맞춥니다."""
+    if not os.environ.get('KRX_AS_OF'):
+        krx_calendar.use_as_of(f"{market.dates[-1]:%Y-%m-%d} 15:30")
+
+
+def use_reader(reader, host='custom', clear_caches=True):
+    """시세 조회 함수를 교체합니다. reader(symbol, start, end) -> DataFrame. 이전 (reader, host)를 반환합니다.
+
+    clear_caches면 다른 소스의 결과가 섞이지 않도록 시세/지수 캐시를 비웁니다. (캐시도 함께 교체할 때는 False)
+    """
+    global _reader, _reader_host
+    previous = (_reader, _reader_host)
+    _reader, _reader_host = reader, host
+    if clear_caches:
+        _quote_cache.clear()
+        if _cache is not None:
+            _cache.clear()
+    return previous
+
+
+def use_cache(cache):
+    """종목별 조회 결과(넓힌 기간)를 재사용할 캐시(get/set 제공)를 설정합니다. None이면 캐시하지 않습니다. 이전 캐시를 반환합니다."""
+    global _cache
+    previous, _cache = _cache, cache
+    return previous
+
+
+def use_quote_cache(cache):
+    """지수/선물 시세(IndexQuote)를 재사용할 캐시(get/set 제공)를 설정합니다. 이전 캐시를 반환합니다."""
+    global _quote_cache
+    previous, _quote_cache = _quote_cache, cache
+    return previous
+
+
+def use_panel(panel):
+    """공유 시세 패널(price_panel.PricePanel)을 설정합니다. 패널에 있는 종목은 패널 기간 안에서 반환합니다."""
+    global _panel
+    _panel = panel
+
+
+def _day(value):
+    """날짜/시각/문자열을 'YYYY-MM-DD'로 맞춥니다. (None은 기간 제한 없음)"""
+    return None if value is None else str(value)[:10]
+
+
+def _read(symbol, start):
+    """시세 소스에서 start부터 최신까지 조회합니다. (예산/회로 차단기 적용)
+
+    reader에는 타임아웃을 넘길 수 없어 acquire()가 돌려준 남은 시간은 쓰지 않습니다. 호출 전에 마감/예산/차단만 확인하므로
+    느린 시세 소스 호출 하나는 마감을 넘길 수 있습니다. (사용 시간은 release()로 예산에 더해짐)
+    """
+    budget.acquire(_reader_host)
+    started = time.monotonic()
+    ok = False
+    try:
+        with stage('market_data.ohlcv', host=_reader_host):
+            df = _reader(symbol, start, None)
+        ok = True
+    finally:
+        budget.release(_reader_host, started, ok)
+    return df
+
+
+def _fetch_window(symbol, start):
+    """start(None이면 전체 기간)부터 최신까지 조회해 캐시에 (start, DataFrame)으로 저장합니다."""
+    entry = (start, _read(symbol, start))
+    if _cache is not None:
+        _cache.set(symbol, entry)
+    return entry
+
+
+def _covers(entry, start):
+    """캐시 항목 (조회 시작일, DataFrame)이 start부터의 기간을 포함하는지"""
+    return entry is not None and (entry[0] is None or (start is not None and start >= entry[0]))
+
+
+def get_ohlcv(symbol, start=None, end=None):
+    """종목/지수의 일별 OHLCV(Open/High/Low/Close/Volume/Change)를 조회합니다.
+
+    종목마다 요청 기간을 포함하는 넓은 기간을 한 번 조회해 두고 요청 기간만 잘라 반환합니다.
+    """
+    _ensure_reader()
+    panel = _panel
+    if panel is not None and symbol in panel:
+        with stage('market_data.ohlcv', host='panel'):
+            return panel.ohlcv(symbol, start, end)
+
+    start, end = _day(start), _day(end)
+    entry = _cache.get(symbol) if _cache is not None else None
+    while not _covers(entry, start):
+        # 기본 기간, 이미 조회한 기간, 요청 기간을 모두 포함하도록 넓혀서 한 번에 조회합니다.
+        # 다른 스레드의 더 짧은 기간 조회를 기다렸다면 한 번 더 넓혀서 조회합니다.
+        window = start
+        if window is not None:
+            default = (krx_calendar.now().date() - timedelta(days=OHLCV_WINDOW_DAYS)).isoformat()
+            window = min(window, default, *([entry[0]] if entry is not None and entry[0] is not None else []))
+        entry = _flights.do(symbol, lambda: _fetch_window(symbol, window))
+    df = entry[1]
+    if start is not None or end is not None:
+        df = df.loc[start:end]
+    return df.copy()
+
+
+def get_recent_ohlcv(symbol, start):
+    """start부터 최신까지만 조회합니다. (증분 갱신용: get_ohlcv처럼 넓은 기간으로 넓히지 않고 캐시에도 넣지 않음)
+
+    이미 캐시에 start를 포함하는 기간이 있으면 캐시에서 잘라 반환합니다.
+    """
+    _ensure_reader()
+    panel = _panel
+    if panel is not None and symbol in panel:
+        with stage('market_data.ohlcv', host='panel'):
+            return panel.ohlcv(symbol, start, None)
+
+    start = _day(start)
+    entry = _cache.get(symbol) if _cache is not None else None
+    if _covers(entry, start):
+        return entry[1].loc[start:].copy()
+    df = _read(symbol, start)
+    return df.loc[start:] if start is not None else df
+
+
+def latest_session():
+    """시세 소스 기준 가장 최근 개장 거래일 (합성 시장이면 그 마지막 거래일)"""
+    _ensure_reader()
+    return krx_calendar.latest_session()
+
+
+def get_session_change(symbol, session=None):
+    """거래일 session(기본값: 가장 최근 개장일)의 전 거래일 대비 등락률(Change)을 반환합니다.
+
+    거래일 달력으로 [직전 거래일, session] 두 거래일만 조회합니다. 해당 거래일 시세가 아직 없으면 None.
+    """
+    session = session or latest_session()
+    start = krx_calendar.previous_trading_day(session)
+    df = get_ohlcv(symbol, start.strftime('%Y-%m-%d'), session.strftime('%Y-%m-%d'))
+    if len(df) < 2 or df.index[-1].date() != session:
+        return None
+    return df['Change'].iloc[-1]
+
+
+def _krx_quote(symbol):
+    """KRX 지수의 최근 일봉으로 IndexQuote를 만듭니다."""
+    session = latest_session()
+    df = get_ohlcv(symbol, krx_calendar.trading_days_back(session, 2).strftime('%Y-%m-%d'))
+    if df.empty:
+        return None
+    latest = df.iloc[-1]
+    price = float(latest['Close'])
+    change_pct = float(latest['Change']) * 100
+    return IndexQuote(symbol, price, price - price / (1 + change_pct / 100), change_pct, df.index[-1])
+
+
+def _quote_from_closes(symbol, closes):
+    closes = closes.dropna()
+    if len(closes) < 2:
+        return None
+    price, previous = float(closes.iloc[-1]), float(closes.iloc[-2])
+    return IndexQuote(symbol, price, price - previous, (price - previous) / previous * 100, closes.index[-1])
+
+
+def _yfinance_quotes(tickers):
+    """여러 yfinance 종목을 한 번의 요청으로 내려받아 IndexQuote로 변환합니다."""
+    if _reader_host != 'FinanceDataReader':
+        # 합성/교체된 시세 소스에서는 같은 조회 함수로 해외 종목도 제공합니다. (네트워크 없이 측정)
+        with stage('yfinance.download', host=_reader_host):
+            return {t: _quote_from_closes(t, _reader(t, None, None)['Close'].tail(5)) for t in tickers}
+
+    import yfinance as yf
+
+    timeout = budget.acquire('yfinance', 10)
+    started = time.monotonic()
+    data = None
+    try:
+        with stage('yfinance.download', host='yfinance'):
+            data = yf.download(list(tickers), period='5d', group_by='ticker', auto_adjust=True,
+                               progress=False, threads=True, timeout=timeout)
+    finally:
+        budget.release('yfinance', started, ok=data is not None and not data.empty)
+    quotes = {}
+    grouped = data.columns.nlevels > 1
+    for ticker in tickers:
+        if grouped:
+            frame = data[ticker] if ticker in data.columns.get_level_values(0) else None
+        else:
+            frame = data if len(tickers) == 1 else None
+        quotes[ticker] = _quote_from_closes(ticker, frame['Close']) if frame is not None and not frame.empty else None
+    return quotes
+
+
+def get_index_quotes(krx_symbols=KRX_INDICES, yf_tickers=FUTURES_INDICES):
+    """KRX 지수와 yfinance 종목의 최근 시세를 {심볼: IndexQuote}로 반환합니다. 조회에 실패한 심볼은 빠집니다.
+
+    캐시에 없는 yfinance 종목은 종목 수와 관계없이 한 번의 요청으로 받고, KRX 지수는 그와 동시에 조회합니다.
+    """
+    _ensure_reader()
+    quotes = {}
+    for symbol in [*krx_symbols, *yf_tickers]:
+        quote = _quote_cache.get(symbol)
+        if quote is not None:
+            quotes[symbol] = quote
+    krx_missing = [s for s in krx_symbols if s not in quotes]
+    yf_missing = [t for t in yf_tickers if t not in quotes]
+    if not krx_missing and not yf_missing:
+        return quotes
+
+    with ThreadPoolExecutor(max_workers=len(krx_missing) + 1) as pool:
+        yf_future = pool.submit(_yfinance_quotes, yf_missing) if yf_missing else None
+        krx_futures = {symbol: pool.submit(_krx_quote, symbol) for symbol in krx_missing}
+
+        fetched = {}
+        for symbol, future in krx_futures.items():
+            try:
+                fetched[symbol] = future.result()
+            except Exception as e:
+                logging.error(f"{symbol} 조회 오류: {e}")
+        if yf_future is not None:
+            try:
+                fetched.update(yf_future.result())
+            except Exception as e:
+                logging.error(f"yfinance 조회 오류 ({', '.join(yf_missing)}): {e}")
+
+    for symbol, quote in fetched.items():
+        if quote is not None:
+            _quote_cache.set(symbol, quote)
+            quotes[symbol] = quote
+    return quotes
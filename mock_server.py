@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+로컬 Naver 금융 / wisereport 모의 서버
+픽스처 디렉터리 또는 합성 시장(synthetic_market)으로 다음 경로를 응답합니다.
+
+    /sise/sise_deal_rank_iframe.naver   /item/main.naver   /item/frgn.naver
+    /sise/sise_group.naver?type=upjong  /sise/theme.naver
+    /sise/sise_rise.naver               /ranking/mktExcel.aspx
+    /api/realtime (Naver polling 실시간 시세 JSON)
+
+지연 시간, 오류율(503), 초당 요청 제한(429 + Retry-After)을 설정할 수 있어
+동시성/재시도 동작과 종단 간 처리량을 반복 가능하게 측정할 수 있습니다.
+/__stats 경로는 누적 요청 통계를 JSON으로 반환합니다.
+
+사용 예:
+    python mock_server.py --port 8765 --latency-ms 80 --jitter-ms 40 --error-rate 0.02 --rate-limit 30
+    KRX_NAVER_BASE_URL=http://127.0.0.1:8765 KRX_WISEREPORT_BASE_URL=http://127.0.0.1:8765 \\
+        python unified_dashboard_html.py --output /tmp/index.html
+    KRX_NAVER_POLLING_BASE_URL=http://127.0.0.1:8765 python breakout_watcher.py --codes 000001 000002 --once
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from synthetic_market import SyntheticMarket
+
+
+class MockState:
+    """모의 서버 설정과 요청 통계"""
+
+    def __init__(self, market, fixtures_dir=None, latency_ms=0, jitter_ms=0, error_rate=0.0,
+                 rate_limit=None, burst=None, seed=0):
+        self.market = market
+        self.fixtures_dir = fixtures_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst or (rate_limit or 0)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+        self.started = time.monotonic()
+        self.counts = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def take_token(self):
+        """토큰 버킷에서 토큰 하나를 꺼냅니다. 없으면 다음 토큰까지의 대기 시간(초)을 반환합니다."""
+        if not self.rate_limit:
+            return 0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate_limit)
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate_limit
+
+    def draw(self):
+        """이번 요청의 지연 시간(초)과 오류 주입 여부를 결정합니다."""
+        with self.lock:
+            delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            fail = self.rng.random() < self.error_rate
+        return delay, fail
+
+    def count(self, key):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def enter(self):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def stats(self):
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            total = sum(v for k, v in self.counts.items() if k.startswith('status.'))
+            return {
+                'elapsed_s': round(elapsed, 3),
+                'requests': total,
+                'requests_per_s': round(total / elapsed, 2) if elapsed else 0,
+                'max_in_flight': self.max_in_flight,
+                'counts': dict(sorted(self.counts.items())),
+            }
+
+    def reset(self):
+        with self.lock:
+            self.counts = {}
+            self.started = time.monotonic()
+            self.max_in_flight = 0
+
+    def _fixture_name(self, path, query):
+        """요청 경로에 해당하는 픽스처 파일명 (synthetic_market.write_fixtures 규칙)"""
+        if path.endswith('/sise/sise_deal_rank_iframe.naver'):
+            market = 'kosdaq' if query.get('sosok') == '02' else 'kospi'
+            investor = 'institution' if query.get('investor_gubun') == '1000' else 'foreign'
+            return f'deal_rank_{market}_{investor}.html'
+        if path.endswith('/sise/sise_group.naver'):
+            return 'sise_group_upjong.html'
+        if path.endswith('/sise/theme.naver'):
+            return 'theme.html'
+        if path.endswith('/sise/sise_rise.naver'):
+            return f"sise_rise_{query.get('sosok', '0')}.html"
+        if path.endswith('/ranking/mktExcel.aspx'):
+            return f"mktExcel_{query.get('sec_cd', 'IKS001')}.html"
+        return None
+
+    def page(self, url):
+        """픽스처가 있으면 픽스처를, 없으면 합성 페이지를 반환합니다."""
+        if self.fixtures_dir:
+            parsed = urlparse(url)
+            query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            name = self._fixture_name(parsed.path, query)
+            if name and os.path.exists(os.path.join(self.fixtures_dir, name)):
+                with open(os.path.join(self.fixtures_dir, name), encoding='utf-8') as f:
+                    return f.read()
+        return self.market.page(url)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """모의 서버 요청 처리기"""
+
+    state = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type='text/html', charset='utf-8', headers=None, counted=True):
+        payload = body.encode(charset, errors='replace')
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset={charset}')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        if counted:
+            self.state.count(f'status.{status}')
+
+    def do_GET(self):
+        state = self.state
+        if self.path.startswith('/__stats'):
+            if 'reset=1' in self.path:
+                state.reset()
+            body = json.dumps(state.stats(), ensure_ascii=False)
+            self._send(200, body, content_type='application/json', counted=False)
+            return
+
+        state.enter()
+        try:
+            path = urlparse(self.path).path
+            state.count(f'path.{path}')
+
+            wait = state.take_token()
+            if wait:
+                self._send(429, 'Too Many Requests', headers={'Retry-After': f'{max(1, round(wait))}'})
+                return
+
+            delay, fail = state.draw()
+            if delay:
+                time.sleep(delay)
+            if fail:
+                self._send(503, 'Service Unavailable')
+                return
+
+            body = state.page(self.path)
+            if body is None:
+                self._send(404, 'Not Found')
+                return
+            if path.startswith('/api/'):
+                self._send(200, body, content_type='application/json')
+                return
+            charset = 'utf-8' if path.startswith('/ranking/') else 'euc-kr'
+            self._send(200, body, charset=charset)
+        finally:
+            state.leave()
+
+
+def start_server(host='127.0.0.1', port=0, **options):
+    """모의 서버를 백그라운드 스레드로 시작하고 (server, base_url)을 반환합니다."""
+    market_options = {
+        'n_tickers': options.pop('tickers', 2500),
+        'years': options.pop('years', 10),
+        'seed': options.pop('market_seed', 42),
+        'realtime_speed': options.pop('clock_speed', 1.0),
+    }
+    market = options.pop('market', None) or SyntheticMarket(**market_options)
+    handler = type('BoundMockHandler', (MockHandler,), {'state': MockState(market, **options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='mock-server', daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 Naver 금융 / wisereport 모의 서버")
+    parser.add_argument('--host', type=str, default='127.0.0.1', help="바인드 주소 (기본값: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="포트 (기본값: 8765)")
+    parser.add_argument('--fixtures', type=str, default=None, help="픽스처 디렉터리 (없는 페이지는 합성 데이터로 응답)")
+    parser.add_argument('--tickers', type=int, default=2500, help="합성 시장 종목 수 (기본값: 2500)")
+    parser.add_argument('--years', type=float, default=10, help="합성 시장 시세 기간(년) (기본값: 10)")
+    parser.add_argument('--seed', type=int, default=42, help="합성 시장 시드 (기본값: 42)")
+    parser.add_argument('--clock-speed', type=float, default=1.0, help="장중 시세 진행 속도 (벽시계 1분당 합성 분, 기본값: 1)")
+    parser.add_argument('--latency-ms', type=float, default=0, help="평균 응답 지연(ms)")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="응답 지연 편차(ms, 균등 분포)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="503 오류 비율 (0~1)")
+    parser.add_argument('--rate-limit', type=float, default=None, help="초당 허용 요청 수 (초과 시 429)")
+    parser.add_argument('--burst', type=int, default=None, help="순간 허용 요청 수 (기본값: rate-limit)")
+    args = parser.parse_args()
+
+    server, base_url = start_server(
+        args.host, args.port, tickers=args.tickers, years=args.years, market_seed=args.seed,
+        clock_speed=args.clock_speed, fixtures_dir=args.fixtures,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        rate_limit=args.rate_limit, burst=args.burst, seed=args.seed,
+    )
+    print(f"모의 서버 실행 중: {base_url} (통계: {base_url}/__stats, 종료: Ctrl+C)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
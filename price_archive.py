@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+장기 시세 압축 보관소
+10년 이상 전 종목 일봉을 float64 패널(price_panel.py)이나 CSV로 두면 디스크와 메모리를 크게 차지하므로,
+원 단위 정수로 바꾼 뒤 필드별로 차분(delta) + 지그재그(zigzag) 부호화하고 연도별 묶음(chunk)으로 압축해 보관합니다.
+필요한 기간과 종목만 NumPy 배열로 빠르게 풀어 씁니다.
+
+디렉터리 구성:
+    meta.json     종목 코드 목록, 필드, 연도 목록, 배율, 코덱 (마지막에 써서 완료를 표시)
+    2016.npz ...  연도별 묶음: dates, 필드마다 data(압축 바이트), mask(압축 비트맵), base(종목별 첫 값), width
+
+부호화 (필드마다, 연도 묶음 안에서 종목별 행):
+    Close, Volume       전일 대비 차분, 첫 값은 base에 따로 저장
+    Open, High, Low     같은 날 종가와의 차이 (전일 대비 차분보다 작은 값이 됨)
+    지그재그로 부호 없는 정수로 바꾼 뒤 값이 들어가는 가장 좁은 폭(1/2/4/8바이트)을 고르고,
+    바이트 자리별로 모아(byte shuffle) 높은 자리의 0들이 이어지게 한 다음 zlib(기본) 또는 lzma로 압축합니다.
+    상장 전/거래 없는 날(NaN)은 비트맵으로 따로 저장하고 값은 직전 값으로 채워 차분이 0이 되게 합니다.
+
+가격은 원 단위 정수(배율 1)로 저장하며, 정수가 아닌 값이 있으면 손실 없이 저장할 수 없으므로 ValueError를 냅니다.
+(지수처럼 소수점이 있는 시세는 --scale 100 등으로 배율을 지정) 풀 때는 묶음끼리 독립이므로 요청 기간의 연도만 읽고,
+요청한 종목 행만 골라 누적합으로 되돌립니다.
+
+사용 예:
+    python price_archive.py build --panel panel --out archive              # 공유 시세 패널을 압축 보관
+    python price_archive.py build --listing KRX --start 2014-01-01 --out archive --workers 16
+    python price_archive.py info --path archive
+    python price_archive.py read --path archive --codes 005930 --start 2020-01-01 --end 2020-12-31
+    python benchmark.py archive --tickers 2500 --years 10                   # CSV/Parquet/float64 대비 압축률, 풀기 처리량
+"""
+
+import argparse
+import json
+import logging
+import lzma
+import os
+import zlib
+
+import numpy as np
+
+from checkpoint import Checkpoint, run_stage, add_checkpoint_arguments
+from price_panel import FIELDS
+from profiling import stage, profiler, add_profile_arguments, configure_from_args
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+META_FILE = 'meta.json'
+REFERENCED = {'Open': 'Close', 'High': 'Close', 'Low': 'Close'}
+CODECS = {
+    'zlib': (lambda data, level: zlib.compress(data, level), zlib.decompress),
+    'lzma': (lambda data, level: lzma.compress(data, preset=level), lzma.decompress),
+}
+WIDTHS = (np.uint8, np.uint16, np.uint32, np.uint64)
+
+
+def _fill(values, mask):
+    """NaN 자리를 행마다 직전 값(앞쪽 NaN은 첫 유효값, 유효값이 없으면 0)으로 채운 int64 배열"""
+    rows, cols = values.shape
+    index = np.where(mask, np.arange(cols), -1)
+    np.maximum.accumulate(index, axis=1, out=index)
+    first = np.where(mask.any(axis=1), mask.argmax(axis=1), 0)
+    index = np.where(index < 0, first[:, None], index)
+    filled = np.take_along_axis(np.where(mask, values, 0), index, axis=1)
+    return np.where(mask.any(axis=1)[:, None], filled, 0).astype(np.int64)
+
+
+def _to_int(values, scale, field):
+    scaled = values * scale
+    ints = np.rint(scaled)
+    valid = ~np.isnan(values)
+    if np.any(np.abs(scaled[valid] - ints[valid]) > 1e-6):
+        raise ValueError(f"{field}에 배율 {scale}로 정수가 되지 않는 값이 있습니다. (--scale로 배율 지정)")
+    if valid.any() and np.abs(ints[valid]).max() >= 2 ** 62:
+        raise ValueError(f"{field} 값이 너무 커서 저장할 수 없습니다.")
+    return ints
+
+
+def encode_field(ints, mask, reference=None):
+    """(종목 x 날짜) 정수 행렬을 (width, data 바이트, base)로 부호화합니다. reference가 있으면 그 행렬과의 차이"""
+    if reference is not None:
+        delta, base = ints - reference, None
+    else:
+        base = ints[:, 0].copy() if ints.shape[1] else np.zeros(len(ints), dtype=np.int64)
+        delta = np.diff(ints, axis=1, prepend=ints[:, :1])
+    zigzag = ((delta << 1) ^ (delta >> 63)).astype(np.uint64)
+    top = int(zigzag.max()) if zigzag.size else 0
+    width = next(w for w in WIDTHS if top <= np.iinfo(w).max)
+    size = np.dtype(width).itemsize
+    shuffled = zigzag.astype(width).reshape(-1).view(np.uint8).reshape(-1, size).T.tobytes()
+    return size, shuffled, base
+
+
+def decode_field(data, width, shape, rows=None, base=None, reference=None):
+    """encode_field의 역. rows(종목 행 번호)가 있으면 그 행만 풉니다."""
+    planes = np.frombuffer(data, dtype=np.uint8).reshape(width, *shape)
+    if rows is not None:
+        planes = planes[:, rows]
+    # 바이트 자리별로 모아 둔 것을 종목 x 날짜 x 바이트로 되돌려 정수로 읽습니다.
+    zigzag = np.ascontiguousarray(np.moveaxis(planes, 0, -1)).view(np.dtype(f'<u{width}'))[..., 0].astype(np.int64)
+    delta = (zigzag >> 1) ^ -(zigzag & 1)
+    if reference is not None:
+        return delta + reference
+    return np.cumsum(delta, axis=1) + (base if rows is None else base[rows])[:, None]
+
+
+def write_archive(path, tickers, dates, arrays, scales=None, codec='zlib', level=None):
+    """(종목 x 날짜) 필드 배열들(NaN = 값 없음)을 연도별 압축 묶음으로 저장합니다. 묶음별 (연도, 바이트) 목록을 반환합니다."""
+    compress, _ = CODECS[codec]
+    level = 6 if level is None else level
+    fields = [field for field in FIELDS if field in arrays] + [field for field in arrays if field not in FIELDS]
+    scales = {field: (scales or {}).get(field, 1) for field in fields}
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    years = dates.astype('datetime64[Y]').astype(int) + 1970
+
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    chunks = []
+    for year in sorted(set(years.tolist())):
+        columns = np.flatnonzero(years == year)
+        lo, hi = columns[0], columns[-1] + 1
+        chunk = {'dates': dates[lo:hi]}
+        filled = {}
+        # 종가를 먼저 부호화해 시가/고가/저가의 기준으로 씁니다.
+        for field in sorted(fields, key=lambda f: f in REFERENCED):
+            values = np.asarray(arrays[field][:, lo:hi], dtype=np.float64)
+            mask = ~np.isnan(values)
+            filled[field] = ints = _fill(_to_int(values, scales[field], field), mask)
+            width, data, base = encode_field(ints, mask, filled.get(REFERENCED.get(field)))
+            chunk[f'{field}.data'] = np.frombuffer(compress(data, level), dtype=np.uint8)
+            chunk[f'{field}.mask'] = np.frombuffer(compress(np.packbits(mask).tobytes(), level), dtype=np.uint8)
+            chunk[f'{field}.width'] = np.array(width)
+            if base is not None:
+                chunk[f'{field}.base'] = base
+        file = os.path.join(path, f'{year}.npz')
+        np.savez(file, **chunk)
+        chunks.append((year, os.path.getsize(file)))
+
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({'tickers': list(tickers), 'fields': fields, 'years': [year for year, _ in chunks],
+                   'scales': scales, 'codec': codec, 'shape': [len(tickers), len(dates)]}, f)
+    total = sum(size for _, size in chunks)
+    logging.info(f"압축 보관소 저장: {path} ({len(tickers)}종목 × {len(dates)}일, {len(chunks)}개 연도, "
+                 f"{total / 1024 ** 2:.1f} MiB, {codec})")
+    return chunks
+
+
+class PriceArchive:
+    """연도별 압축 묶음 시세 보관소 (읽기 전용)"""
+
+    def __init__(self, path, meta):
+        self.path = path
+        self.tickers = meta['tickers']
+        self.fields = meta['fields']
+        self.years = meta['years']
+        self.scales = meta['scales']
+        self.codec = meta['codec']
+        self._row = {code: i for i, code in enumerate(self.tickers)}
+
+    @classmethod
+    def open(cls, path):
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+            return cls(path, json.load(f))
+
+    def __contains__(self, code):
+        return code in self._row
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def nbytes(self):
+        """디스크의 묶음 파일 크기 합"""
+        return sum(os.path.getsize(os.path.join(self.path, f'{year}.npz')) for year in self.years)
+
+    def _decode_chunk(self, year, fields, rows):
+        _, decompress = CODECS[self.codec]
+        with np.load(os.path.join(self.path, f'{year}.npz')) as chunk:
+            dates = chunk['dates']
+            shape = (len(self.tickers), len(dates))
+            needed = list(dict.fromkeys([REFERENCED[f] for f in fields if f in REFERENCED and REFERENCED[f] in self.fields]
+                                        + list(fields)))
+            ints, values = {}, {}
+            for field in needed:
+                width = int(chunk[f'{field}.width'])
+                data = decompress(chunk[f'{field}.data'].tobytes())
+                base = chunk[f'{field}.base'] if f'{field}.base' in chunk.files else None
+                ints[field] = decode_field(data, width, shape, rows, base, ints.get(REFERENCED.get(field)))
+                if field in fields:
+                    bits = np.unpackbits(np.frombuffer(decompress(chunk[f'{field}.mask'].tobytes()), dtype=np.uint8),
+                                         count=shape[0] * shape[1]).reshape(shape).astype(bool)
+                    mask = bits if rows is None else bits[rows]
+                    out = ints[field].astype(np.float64)
+                    scale = self.scales[field]
+                    if scale != 1:
+                        out /= scale
+                    out[~mask] = np.nan
+                    values[field] = out
+        return dates, values
+
+    def read(self, fields=None, codes=None, start=None, end=None):
+        """(종목 코드 목록, 날짜 배열(datetime64[D]), {필드: (종목 x 날짜) float64 배열})
+
+        요청 기간이 걸친 연도 묶음만 읽고, codes가 있으면 그 종목 행만 풉니다. 없는 종목 코드는 KeyError
+        """
+        fields = list(fields or self.fields)
+        rows = None if codes is None else np.array([self._row[code] for code in codes], dtype=np.int64)
+        codes = list(self.tickers) if codes is None else list(codes)
+        start = np.datetime64(str(start)[:10], 'D') if start is not None else None
+        end = np.datetime64(str(end)[:10], 'D') if end is not None else None
+        years = [year for year in self.years
+                 if (start is None or year >= start.astype('datetime64[Y]').astype(int) + 1970)
+                 and (end is None or year <= end.astype('datetime64[Y]').astype(int) + 1970)]
+
+        parts_dates, parts = [], {field: [] for field in fields}
+        for year in years:
+            with stage('price_archive.decode'):
+                dates, values = self._decode_chunk(year, fields, rows)
+            keep = np.ones(len(dates), dtype=bool)
+            if start is not None:
+                keep &= dates >= start
+            if end is not None:
+                keep &= dates <= end
+            parts_dates.append(dates[keep])
+            for field in fields:
+                parts[field].append(values[field][:, keep])
+        if not years:
+            return codes, np.array([], dtype='datetime64[D]'), {f: np.empty((len(codes), 0)) for f in fields}
+        return codes, np.concatenate(parts_dates), {field: np.concatenate(parts[field], axis=1) for field in fields}
+
+    def ohlcv(self, code, start=None, end=None):
+        """get_ohlcv()와 같은 형식(Open/High/Low/Close/Volume/Change)의 DataFrame"""
+        import pandas as pd
+
+        # Change는 조회 시작일 전 거래일 종가 대비로 계산하도록 열흘 앞에서부터 읽습니다. (연휴 포함)
+        first = None if start is None else np.datetime64(str(start)[:10], 'D') - np.timedelta64(10, 'D')
+        _, dates, values = self.read(codes=[code], start=first, end=end)
+        df = pd.DataFrame({field: values[field][0] for field in self.fields},
+                          index=pd.DatetimeIndex(pd.to_datetime(dates.astype(str)), name='Date'))
+        df = df.dropna(subset=['Close'])
+        df['Change'] = df['Close'].pct_change().fillna(0.0)
+        return df if start is None else df[df.index >= pd.Timestamp(str(start)[:10])]
+
+
+def frames_to_arrays(frames, fields=FIELDS):
+    """{종목 코드: DataFrame}을 (종목 목록, 날짜 배열, {필드: (종목 x 날짜) 배열})로 맞춥니다. (write_panel과 같은 정렬)"""
+    import pandas as pd
+
+    frames = {code: df for code, df in frames.items() if df is not None and not df.empty}
+    tickers = sorted(frames)
+    dates = pd.DatetimeIndex(sorted(set().union(*(df.index for df in frames.values())))) if frames else pd.DatetimeIndex([])
+    arrays = {}
+    for field in fields:
+        out = np.full((len(tickers), len(dates)), np.nan)
+        for i, code in enumerate(tickers):
+            if field in frames[code]:
+                out[i, dates.get_indexer(frames[code].index)] = frames[code][field].to_numpy(dtype=np.float64)
+        arrays[field] = out
+    return tickers, dates.values.astype('datetime64[D]'), arrays
+
+
+def main():
+    parser = argparse.ArgumentParser(description="장기 시세 압축 보관소 (차분/지그재그 부호화, 연도별 묶음)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="공유 시세 패널 또는 내려받은 시세를 압축 보관")
+    build.add_argument('--out', type=str, default='archive', help="보관소 디렉터리 (기본값: archive)")
+    build.add_argument('--panel', type=str, help="공유 시세 패널 디렉터리 (price_panel.py build 결과)")
+    build.add_argument('--codes', type=str, nargs='*', default=[], help="종목 코드")
+    build.add_argument('--codes-file', type=str, help="종목 코드 파일 (.txt 또는 '코드' 컬럼 CSV)")
+    build.add_argument('--listing', type=str, choices=['KRX', 'KOSPI', 'KOSDAQ'], help="FinanceDataReader 상장 종목 전체")
+    build.add_argument('--start', type=str, help="시작일 (YYYY-MM-DD)")
+    build.add_argument('--end', type=str, help="종료일 (YYYY-MM-DD)")
+    build.add_argument('--workers', type=int, default=8, help="동시 조회 수 (기본값: 8)")
+    build.add_argument('--codec', type=str, default='zlib', choices=list(CODECS), help="압축 방식 (기본값: zlib)")
+    build.add_argument('--level', type=int, help="압축 수준 (기본값: 6)")
+    build.add_argument('--scale', type=int, default=1, help="가격 배율 (소수점 시세용, 기본값: 1 = 원 단위)")
+    add_checkpoint_arguments(build)
+    add_profile_arguments(build)
+
+    info = subparsers.add_parser('info', help="보관소 크기/기간 출력")
+    info.add_argument('--path', type=str, default='archive', help="보관소 디렉터리 (기본값: archive)")
+
+    read = subparsers.add_parser('read', help="기간/종목을 풀어 CSV로 출력")
+    read.add_argument('--path', type=str, default='archive', help="보관소 디렉터리 (기본값: archive)")
+    read.add_argument('--codes', type=str, nargs='+', required=True, help="종목 코드")
+    read.add_argument('--start', type=str, help="시작일 (YYYY-MM-DD)")
+    read.add_argument('--end', type=str, help="종료일 (YYYY-MM-DD)")
+    read.add_argument('--output', type=str, help="저장할 CSV 파일명 (없으면 표준 출력)")
+
+    args = parser.parse_args()
+    if args.command == 'info':
+        archive = PriceArchive.open(args.path)
+        size = archive.nbytes()
+        _, dates, _ = archive.read(fields=['Close'], codes=archive.tickers[:1])
+        raw = len(archive) * len(dates) * len(archive.fields) * 8
+        print(f"{archive.path}: {len(archive)}종목 × {len(dates)}일 ({dates[0]} ~ {dates[-1]}), "
+              f"{len(archive.years)}개 연도, {archive.codec}, {size / 1024 ** 2:.1f} MiB "
+              f"(float64 대비 {raw / size:.1f}배)")
+        return
+    if args.command == 'read':
+        import pandas as pd
+
+        archive = PriceArchive.open(args.path)
+        frames = [archive.ohlcv(code, args.start, args.end).assign(Code=code) for code in args.codes]
+        df = pd.concat(frames).reset_index()[['Date', 'Code', *archive.fields, 'Change']]
+        if args.output:
+            df.to_csv(args.output, index=False, encoding='utf-8-sig')
+            print(f"✓ {len(df):,}행을 '{args.output}'에 저장했습니다.")
+        else:
+            print(df.to_string(index=False))
+        return
+
+    configure_from_args(args)
+    scales = {field: args.scale for field in FIELDS if field != 'Volume'}
+    if args.panel:
+        from price_panel import PricePanel
+        panel = PricePanel.attach(args.panel)
+        lo, hi = panel._date_slice(args.start, args.end)
+        with stage('price_archive.write'):
+            write_archive(args.out, panel.tickers, panel.dates[lo:hi],
+                          {field: panel.field(field, args.start, args.end) for field in panel.arrays},
+                          scales, args.codec, args.level)
+        profiler.finish()
+        return
+
+    from price_panel import listing_codes
+    from market_data import get_ohlcv
+
+    codes = list(args.codes)
+    if args.codes_file:
+        from breakout_watcher import read_watchlist
+        codes += read_watchlist(args.codes_file)
+    if args.listing:
+        codes += listing_codes(args.listing)
+    codes = list(dict.fromkeys(codes))
+    if not codes:
+        parser.error("--panel, --codes, --codes-file, --listing 중 하나 이상을 지정하세요.")
+    checkpoint = Checkpoint(args.checkpoint or f"{args.out.rstrip(os.sep)}.checkpoint",
+                            {'codes': codes, 'start': args.start, 'end': args.end}, resume=args.resume)
+    with stage('price_archive.fetch'):
+        frames = run_stage(checkpoint, 'prices', codes, lambda code: get_ohlcv(code, args.start, args.end),
+                           max_workers=args.workers, label='시세 조회')
+    with stage('price_archive.write'):
+        write_archive(args.out, *frames_to_arrays(frames), scales, args.codec, args.level)
+    checkpoint.finish()
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+메모리 매핑 공유 시세 패널
+여러 프로세스(스크리너/백테스트 작업자)가 같은 시세를 각자 복사하지 않도록
+종목 × 날짜 OHLCV 행렬을 필드별 .npy 파일로 저장하고, 작업자는 읽기 전용 memmap으로 붙습니다.
+페이지 캐시를 모든 프로세스가 공유하므로 작업자를 늘려도 메모리 사용량이 거의 늘지 않고,
+붙는 데는 메타데이터(종목/날짜 색인)를 읽는 몇 ms만 걸립니다.
+
+디렉터리 구성:
+    meta.json        종목 코드 목록, 날짜 목록(YYYY-MM-DD), 필드, 모양
+    Open.npy ...     (종목 수, 날짜 수) float64, 상장 전/거래 없는 날은 NaN
+                     종목별 시계열이 연속된 행이므로 종목 하나를 읽을 때 필요한 페이지만 접근합니다.
+
+작업자 프로세스에서는 market_data.use_panel(PricePanel.attach(path))(또는 attach_worker를
+ProcessPoolExecutor initializer로 사용, 환경변수 KRX_PRICE_PANEL=path)로 붙으면
+get_ohlcv()가 패널에 있는 종목을 패널에서 바로 반환합니다.
+
+사용 예:
+    python price_panel.py build --out panel --listing KOSPI --start 2016-01-01
+    python price_panel.py build --out panel --codes-file watchlist.txt --workers 16
+    python price_panel.py info --path panel
+"""
+
+import argparse
+import json
+import logging
+import os
+
+import numpy as np
+
+from checkpoint import Checkpoint, run_stage, add_checkpoint_arguments
+from profiling import stage, profiler, add_profile_arguments, configure_from_args
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+META_FILE = 'meta.json'
+
+
+class PricePanel:
+    """읽기 전용 memmap으로 연 종목 × 날짜 시세 패널"""
+
+    def __init__(self, path, tickers, dates, arrays):
+        self.path = path
+        self.tickers = tickers
+        self.dates = dates
+        self.arrays = arrays
+        self._row = {code: i for i, code in enumerate(tickers)}
+        self._index = None
+
+    @classmethod
+    def attach(cls, path):
+        """패널 디렉터리에 읽기 전용으로 붙습니다. (배열 데이터는 복사하지 않습니다)"""
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {field: np.load(os.path.join(path, f'{field}.npy'), mmap_mode='r') for field in meta['fields']}
+        return cls(path, meta['tickers'], np.array(meta['dates'], dtype='datetime64[D]'), arrays)
+
+    def __contains__(self, code):
+        return code in self._row
+
+    def __len__(self):
+        return len(self.tickers)
+
+    @property
+    def shape(self):
+        return len(self.tickers), len(self.dates)
+
+    @property
+    def date_index(self):
+        """날짜 색인 (pandas DatetimeIndex, 처음 사용할 때 만듭니다)"""
+        if self._index is None:
+            import pandas as pd
+            self._index = pd.DatetimeIndex(pd.to_datetime(self.dates.astype(str)), name='Date')
+        return self._index
+
+    def _date_slice(self, start=None, end=None):
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(str(start)[:10], 'D'), 'left'))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(str(end)[:10], 'D'), 'right'))
+        return lo, hi
+
+    def row(self, code, field='Close'):
+        """종목 한 개의 전체 기간 시계열 (memmap 뷰, 복사 없음)"""
+        return self.arrays[field][self._row[code]]
+
+    def field(self, field='Close', start=None, end=None):
+        """필드 하나의 (종목 × 기간) 뷰 (복사 없음)"""
+        lo, hi = self._date_slice(start, end)
+        return self.arrays[field][:, lo:hi]
+
+    def ohlcv(self, code, start=None, end=None):
+        """get_ohlcv()와 같은 형식(Open/High/Low/Close/Volume/Change)의 DataFrame을 만듭니다."""
+        import pandas as pd
+
+        i = self._row[code]
+        lo, hi = self._date_slice(start, end)
+        # Change는 조회 시작일 전날 종가 대비로 계산하도록 하루 앞에서부터 읽습니다.
+        first = max(min(lo, hi) - 1, 0)
+        df = pd.DataFrame({field: np.array(self.arrays[field][i, first:hi]) for field in self.arrays},
+                          index=self.date_index[first:hi])
+        df = df.dropna(subset=['Close'])
+        df['Change'] = df['Close'].pct_change().fillna(0.0)
+        if first < lo:
+            df = df[df.index > self.date_index[first]]
+        return df
+
+
+def write_panel(path, frames, fields=FIELDS):
+    """{종목 코드: DataFrame}의 fields 컬럼을 패널 디렉터리로 저장합니다. meta.json은 마지막에 써서 완료를 표시합니다.
+
+    배열은 임시 파일에 쓴 뒤 os.replace로 바꿔 넣습니다. 이미 붙어 있는 작업자의 메모리 맵은 이전 파일을 계속 보므로
+    다시 만드는 동안에도 잘린 파일(SIGBUS)이나 반쯤 쓴 값을 읽지 않습니다. (새로 붙는 작업자는 meta.json이 생긴 뒤부터)
+    """
+    import pandas as pd
+
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    frames = {code: df for code, df in frames.items() if df is not None and not df.empty}
+    tickers = sorted(frames)
+    dates = pd.DatetimeIndex(sorted(set().union(*(df.index for df in frames.values())))) if frames else pd.DatetimeIndex([])
+    for field in fields:
+        field_path = os.path.join(path, f'{field}.npy')
+        tmp_path = os.path.join(path, f'.{field}.npy.tmp')
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float64, shape=(len(tickers), len(dates)))
+        out[:] = np.nan
+        for i, code in enumerate(tickers):
+            df = frames[code]
+            if field in df:
+                out[i, dates.get_indexer(df.index)] = df[field].to_numpy(dtype=np.float64)
+        out.flush()
+        del out
+        os.replace(tmp_path, field_path)
+
+    tmp_path = f'{meta_path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'tickers': tickers, 'dates': [d.strftime('%Y-%m-%d') for d in dates],
+                   'fields': list(fields), 'shape': [len(tickers), len(dates)]}, f)
+    os.replace(tmp_path, meta_path)
+    logging.info(f"패널 저장: {path} ({len(tickers)}종목 × {len(dates)}일)")
+    return len(tickers), len(dates)
+
+
+def build_panel(path, codes, start=None, end=None, max_workers=8, checkpoint=None):
+    """get_ohlcv()로 종목 시세를 동시에 내려받아 패널로 저장합니다.
+
+    checkpoint(checkpoint.Checkpoint)가 있으면 종목마다 받은 시세를 기록하고, 이어 하면 기록된 종목은 다시 받지 않습니다.
+    """
+    from market_data import get_ohlcv
+
+    with stage('price_panel.fetch'):
+        frames = run_stage(checkpoint, 'prices', codes, lambda code: get_ohlcv(code, start, end),
+                           max_workers=max_workers, label='시세 조회')
+    with stage('price_panel.write'):
+        return write_panel(path, frames)
+
+
+def attach_worker(path):
+    """ProcessPoolExecutor initializer: 작업자 프로세스의 get_ohlcv()가 패널을 사용하게 합니다."""
+    import market_data
+    market_data.use_panel(PricePanel.attach(path))
+
+
+def listing_codes(market):
+    """FinanceDataReader 상장 종목 코드 목록 (KRX/KOSPI/KOSDAQ)"""
+    import FinanceDataReader as fdr
+    return fdr.StockListing(market)['Code'].astype(str).str.zfill(6).tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="메모리 매핑 공유 시세 패널 생성/조회")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="종목 시세를 내려받아 패널 생성")
+    build.add_argument('--out', type=str, default='panel', help="패널 디렉터리 (기본값: panel)")
+    build.add_argument('--codes', type=str, nargs='*', default=[], help="종목 코드")
+    build.add_argument('--codes-file', type=str, help="종목 코드 파일 (.txt 또는 '코드' 컬럼 CSV)")
+    build.add_argument('--listing', type=str, choices=['KRX', 'KOSPI', 'KOSDAQ'], help="FinanceDataReader 상장 종목 전체")
+    build.add_argument('--start', type=str, help="시작일 (YYYY-MM-DD)")
+    build.add_argument('--end', type=str, help="종료일 (YYYY-MM-DD)")
+    build.add_argument('--workers', type=int, default=8, help="동시 조회 수 (기본값: 8)")
+    add_checkpoint_arguments(build)
+    add_profile_arguments(build)
+
+    info = subparsers.add_parser('info', help="패널 크기/기간 출력")
+    info.add_argument('--path', type=str, default='panel', help="패널 디렉터리 (기본값: panel)")
+
+    args = parser.parse_args()
+    if args.command == 'info':
+        panel = PricePanel.attach(args.path)
+        size = sum(a.nbytes for a in panel.arrays.values())
+        print(f"{panel.path}: {len(panel.tickers)}종목 × {len(panel.dates)}일 "
+              f"({panel.dates[0]} ~ {panel.dates[-1]}), {len(panel.arrays)}개 필드, {size / 1024 ** 2:.1f} MiB")
+        return
+
+    configure_from_args(args)
+    codes = list(args.codes)
+    if args.codes_file:
+        from breakout_watcher import read_watchlist
+        codes += read_watchlist(args.codes_file)
+    if args.listing:
+        codes += listing_codes(args.listing)
+    codes = list(dict.fromkeys(codes))
+    if not codes:
+        parser.error("--codes, --codes-file, --listing 중 하나 이상을 지정하세요.")
+    checkpoint = Checkpoint(args.checkpoint or f"{args.out.rstrip(os.sep)}.checkpoint",
+                            {'codes': codes, 'start': args.start, 'end': args.end}, resume=args.resume)
+    build_panel(args.out, codes, args.start, args.end, args.workers, checkpoint)
+    checkpoint.finish()
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
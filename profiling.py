@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+단계별 실행 시간 측정
+각 진입점이 섹션과 외부 호출(Naver, FinanceDataReader, yfinance, BeautifulSoup, HTML 렌더링)을
+stage()로 감싸면, 실행 후 JSON 트레이스와 단계/호스트별 요약표(횟수, 합계, p50, p95)를 얻을 수 있습니다.
+
+비활성 상태에서는 stage()가 공유 no-op 컨텍스트를 반환하므로 오버헤드가 거의 없습니다.
+활성화: 각 스크립트의 --profile 옵션 또는 환경변수 KRX_PROFILE=1
+"""
+
+import cProfile
+import json
+import logging
+import math
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class _NullStage:
+    """프로파일링 비활성 시 사용하는 no-op 컨텍스트"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """하나의 측정 구간"""
+    __slots__ = ('profiler', 'name', 'host', 'started', 'depth', 'cprofile')
+
+    def __init__(self, profiler, name, host):
+        self.profiler = profiler
+        self.name = name
+        self.host = host
+        self.cprofile = None
+
+    def __enter__(self):
+        local = self.profiler._local
+        self.depth = getattr(local, 'depth', 0)
+        local.depth = self.depth + 1
+        # cProfile은 동시에 하나만 켤 수 있으므로 메인 스레드의 최상위 구간에만 적용합니다.
+        if self.profiler.cprofile_dir and self.depth == 0 and threading.current_thread() is threading.main_thread():
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ended = time.perf_counter()
+        self.profiler._local.depth = self.depth
+        if self.cprofile:
+            self.cprofile.disable()
+            self.profiler._dump_cprofile(self.name, self.cprofile)
+        self.profiler._record(self.name, self.host, self.started, ended, self.depth, exc_type is None)
+        return False
+
+
+def _percentile(sorted_values, pct):
+    """정렬된 값에서 nearest-rank 백분위수를 구합니다."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Profiler:
+    """단계별 소요 시간을 모으고 요약/트레이스를 출력하는 클래스"""
+
+    # configure()가 바꾸는 속성 (save_state/restore_state 대상)
+    _STATE = ('enabled', 'trace_path', 'cprofile_dir', 'events', 'origin', '_dump_counts')
+
+    def __init__(self):
+        self.enabled = os.environ.get('KRX_PROFILE', '') not in ('', '0')
+        self.trace_path = None
+        self.cprofile_dir = None
+        self.events = []
+        self.origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._dump_counts = {}
+
+    def configure(self, enabled=True, trace_path=None, cprofile_dir=None):
+        """측정 여부와 출력 경로를 설정합니다."""
+        self.enabled = enabled
+        self.trace_path = trace_path
+        self.cprofile_dir = cprofile_dir if enabled else None
+        if self.cprofile_dir:
+            os.makedirs(self.cprofile_dir, exist_ok=True)
+        self.events = []
+        self.origin = time.perf_counter()
+
+    def save_state(self):
+        """측정 여부/출력 경로/모은 구간을 반환합니다. (restore_state()로 되돌릴 때)"""
+        return {name: getattr(self, name) for name in self._STATE}
+
+    def restore_state(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def stage(self, name, host=None):
+        """구간 측정 컨텍스트를 반환합니다. host에 URL을 주면 호스트명만 기록합니다."""
+        if not self.enabled:
+            return _NULL_STAGE
+        if host and '://' in host:
+            host = urlparse(host).netloc
+        return _Stage(self, name, host)
+
+    def _record(self, name, host, started, ended, depth, ok):
+        event = {
+            'name': name,
+            'host': host,
+            'start_ms': (started - self.origin) * 1000,
+            'duration_ms': (ended - started) * 1000,
+            'depth': depth,
+            'thread': threading.current_thread().name,
+            'ok': ok,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def _dump_cprofile(self, name, profile):
+        with self._lock:
+            count = self._dump_counts.get(name, 0)
+            self._dump_counts[name] = count + 1
+        filename = name.replace('/', '_') + (f'.{count}' if count else '') + '.prof'
+        profile.dump_stats(os.path.join(self.cprofile_dir, filename))
+
+    def summary(self, key='name'):
+        """단계(key='name') 또는 호스트(key='host')별 횟수/합계/p50/p95/실패 수를 반환합니다."""
+        groups = {}
+        for event in self.events:
+            group = event[key]
+            if group is None:
+                continue
+            groups.setdefault(group, []).append(event)
+
+        rows = []
+        for group, events in groups.items():
+            durations = sorted(e['duration_ms'] for e in events)
+            rows.append({
+                key: group,
+                'count': len(durations),
+                'total_ms': sum(durations),
+                'p50_ms': _percentile(durations, 50),
+                'p95_ms': _percentile(durations, 95),
+                'errors': sum(1 for e in events if not e['ok']),
+            })
+        return sorted(rows, key=lambda r: r['total_ms'], reverse=True)
+
+    def print_summary(self):
+        """단계별/호스트별 요약표를 출력합니다."""
+        if not self.events:
+            return
+        for key, title in (('name', '단계'), ('host', '호스트')):
+            rows = self.summary(key)
+            if not rows:
+                continue
+            width = max(len(title), *(len(str(r[key])) for r in rows)) + 2
+            print(f"\n⏱  {title}별 소요 시간")
+            print(f"{title:<{width}}{'횟수':>6}{'합계(ms)':>12}{'p50(ms)':>10}{'p95(ms)':>10}{'실패':>6}")
+            print("-" * (width + 44))
+            for r in rows:
+                print(f"{str(r[key]):<{width}}{r['count']:>6}{r['total_ms']:>12.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['errors']:>6}")
+
+    def write_trace(self, path):
+        """Chrome trace event 형식(chrome://tracing, Perfetto에서 열람 가능)으로 저장합니다."""
+        threads = {}
+        trace_events = []
+        for event in self.events:
+            tid = threads.setdefault(event['thread'], len(threads) + 1)
+            trace_events.append({
+                'name': event['name'],
+                'cat': event['host'] or 'stage',
+                'ph': 'X',
+                'ts': round(event['start_ms'] * 1000, 1),
+                'dur': round(event['duration_ms'] * 1000, 1),
+                'pid': 1,
+                'tid': tid,
+                'args': {'host': event['host'], 'depth': event['depth'], 'ok': event['ok']},
+            })
+        payload = {
+            'traceEvents': trace_events,
+            'summary': {'stages': self.summary('name'), 'hosts': self.summary('host')},
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=1)
+        logging.info(f"프로파일 트레이스를 '{path}' 파일로 저장했습니다.")
+
+    def finish(self):
+        """실행 종료 시 요약표 출력 및 트레이스 저장을 수행합니다."""
+        if not self.enabled:
+            return
+        self.print_summary()
+        if self.trace_path:
+            self.write_trace(self.trace_path)
+            print(f"\n트레이스 저장: {self.trace_path}")
+        if self.cprofile_dir:
+            print(f"cProfile 덤프: {self.cprofile_dir}/*.prof")
+
+
+# 프로세스 전역 프로파일러
+profiler = Profiler()
+
+
+def stage(name, host=None):
+    """전역 프로파일러의 구간 측정 컨텍스트를 반환합니다."""
+    return profiler.stage(name, host)
+
+
+def add_profile_arguments(parser):
+    """진입점 스크립트에 --profile / --profile-dir 옵션을 추가합니다."""
+    parser.add_argument('--profile', nargs='?', const='profile_trace.json', default=None, metavar='TRACE_JSON',
+                        help="단계별 소요 시간을 측정하고 요약표 출력 및 JSON 트레이스를 저장 (기본 파일: profile_trace.json)")
+    parser.add_argument('--profile-dir', type=str, default=None,
+                        help="최상위 단계별 cProfile 덤프(.prof)를 저장할 디렉터리")
+
+
+def configure_from_args(args):
+    """파싱된 옵션으로 전역 프로파일러를 설정합니다."""
+    if args.profile or args.profile_dir or profiler.enabled:
+        profiler.configure(enabled=True, trace_path=args.profile, cprofile_dir=args.profile_dir)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+순매수 상위 목록 일별 이력과 연속 순매수 일수
+순매수 상위 페이지(sise_deal_rank_iframe.naver)에는 최근 며칠치 목록만 있으므로, 페이지의 날짜별 목록을 SQLite에 누적하고
+누적된 이력 전체를 (거래일 x 종목) 불리언 행렬로 불러와 모든 종목의 현재 연속 일수와 최장 연속 일수를 한 번에 계산합니다.
+목록 교집합을 날마다 반복하지 않으므로 --days 10도 --days 2와 같은 비용이며, 페이지의 날짜 수에 묶이지 않습니다.
+
+거래일 축은 krx_calendar로 만들고, 이력이 비어 있는 거래일은 목록에 없었던 날로 봅니다. (연속 일수를 부풀리지 않음)
+
+사용 예:
+    python rank_history.py snapshot                                   # 오늘 페이지의 날짜별 목록 저장 (KOSPI/KOSDAQ × 외국인/기관)
+    python rank_history.py streaks --market kospi --investor foreign --min-days 5
+"""
+
+import argparse
+import logging
+import re
+import sqlite3
+
+import krx_calendar
+from results_store import DEFAULT_DB_PATH, _print_rows
+from stock_records import StockRef
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MARKET_CODES = {'kospi': '01', 'kosdaq': '02'}
+INVESTOR_CODES = {'foreign': '9000', 'institution': '1000'}
+
+# (market, investor, rank_date, code) 기본 키: 시장/투자자별 기간 조회가 기본 키 범위 검색이 됩니다.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deal_rank (
+    market     TEXT    NOT NULL,
+    investor   TEXT    NOT NULL,
+    rank_date  TEXT    NOT NULL,
+    code       TEXT    NOT NULL,
+    name       TEXT    NOT NULL,
+    rank       INTEGER NOT NULL,
+    PRIMARY KEY (market, investor, rank_date, code)
+) WITHOUT ROWID;
+"""
+
+
+def deal_rank_path(market, investor):
+    return (f"/sise/sise_deal_rank_iframe.naver?sosok={MARKET_CODES[market]}"
+            f"&investor_gubun={INVESTOR_CODES[investor]}&type=buy")
+
+
+def parse_deal_rank_boxes(soup):
+    """순매수 상위 페이지의 날짜별 목록을 [(YYYY-MM-DD, [StockRef, ...]), ...] 최근 날짜 순으로 읽습니다."""
+    boxes = []
+    for box in soup.find_all('div', class_='box_type_ms') if soup else []:
+        head = box.find('div', class_='box_type_head')
+        match = re.search(r'(\d{4})\.(\d{2})\.(\d{2})', head.get_text(strip=True)) if head else None
+        table = box.find('table')
+        if not match or not table:
+            continue
+        stocks = []
+        for link in table.select('td p a'):
+            code = re.search(r'code=(\d+)', link.get('href', ''))
+            if code and link.text.strip():
+                stocks.append(StockRef(link.text.strip(), code.group(1)))
+        boxes.append(('-'.join(match.groups()), stocks))
+    return boxes
+
+
+def streaks(member):
+    """(날짜 x 종목) 불리언 행렬에서 날짜별 연속 일수 행렬을 계산합니다.
+
+    누적 등장 횟수에서 마지막으로 빠진 날까지의 누적 횟수를 빼면 그날까지의 연속 일수가 됩니다.
+    """
+    import numpy as np
+
+    counts = member.cumsum(axis=0, dtype=np.int32)
+    last_reset = np.maximum.accumulate(np.where(member, 0, counts), axis=0)
+    return counts - last_reset
+
+
+class DealRankStore:
+    """순매수 상위 목록을 SQLite 파일에 누적 저장하고 (거래일 x 종목) 행렬로 불러오는 클래스"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def save_boxes(self, market, investor, boxes):
+        """parse_deal_rank_boxes 결과를 하나의 트랜잭션으로 저장합니다. 같은 날짜의 목록은 덮어씁니다."""
+        if not boxes:
+            return 0
+        with self.conn:
+            for rank_date, stocks in boxes:
+                self.conn.execute("DELETE FROM deal_rank WHERE market = ? AND investor = ? AND rank_date = ?",
+                                  (market, investor, rank_date))
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO deal_rank (market, investor, rank_date, code, name, rank) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(market, investor, rank_date, s.code, s.name, rank) for rank, s in enumerate(stocks, 1)])
+        logging.info(f"순매수 상위 {len(boxes)}일치 목록을 '{self.path}'에 저장했습니다. "
+                     f"({market}/{investor} {boxes[-1][0]} ~ {boxes[0][0]})")
+        return len(boxes)
+
+    def membership(self, market, investor, start=None, end=None):
+        """(거래일 목록, 종목 코드 목록, {코드: 이름}, (거래일 x 종목) 불리언 행렬)을 반환합니다."""
+        import numpy as np
+
+        sql = "SELECT rank_date, code, name FROM deal_rank WHERE market = ? AND investor = ?"
+        params = [market, investor]
+        if start:
+            sql += " AND rank_date >= ?"
+            params.append(start)
+        if end:
+            sql += " AND rank_date <= ?"
+            params.append(end)
+        rows = self.conn.execute(sql + " ORDER BY rank_date", params).fetchall()
+        if not rows:
+            return [], [], {}, np.zeros((0, 0), dtype=bool)
+
+        dates = [d.isoformat() for d in krx_calendar.trading_days(rows[0][0], rows[-1][0])]
+        names = {code: name for _, code, name in rows}
+        codes = sorted(names)
+        date_index = {d: i for i, d in enumerate(dates)}
+        code_index = {c: i for i, c in enumerate(codes)}
+        member = np.zeros((len(dates), len(codes)), dtype=bool)
+        pairs = [(date_index[d], code_index[c]) for d, c, _ in rows if d in date_index]
+        if pairs:
+            rows_idx, cols_idx = zip(*pairs)
+            member[list(rows_idx), list(cols_idx)] = True
+        return dates, codes, names, member
+
+    def streak_table(self, market, investor, start=None, end=None):
+        """종목별 현재 연속 일수, 최장 연속 일수, 등장 일수, 마지막 등장일 표 (현재 연속 일수 순)"""
+        import numpy as np
+        import pandas as pd
+
+        dates, codes, names, member = self.membership(market, investor, start, end)
+        if not codes:
+            return pd.DataFrame(columns=['name', 'current', 'longest', 'appearances', 'last_seen'])
+        runs = streaks(member)
+        seen = member.any(axis=0)
+        last_seen = np.where(seen, len(dates) - 1 - np.argmax(member[::-1], axis=0), -1)
+        table = pd.DataFrame({
+            'name': [names[c] for c in codes],
+            'current': runs[-1],
+            'longest': runs.max(axis=0),
+            'appearances': member.sum(axis=0),
+            'last_seen': [dates[i] if i >= 0 else None for i in last_seen],
+        }, index=pd.Index(codes, name='code'))
+        table.attrs['dates'] = dates
+        return table.sort_values(['current', 'longest', 'appearances'], ascending=False)
+
+    def streak_codes(self, market, investor, days, latest=None):
+        """latest(YYYY-MM-DD, 기본값: 저장된 마지막 날짜)까지 days 거래일 이상 연속으로 목록에 든 종목 코드.
+
+        latest로 끝나는 days 거래일 중 저장된 목록이 없는 날이 있으면 None을 반환합니다. (페이지 목록 교집합으로 대신 계산하도록)
+        빠진 거래일은 목록에 없었던 날로 세므로, 그대로 계산하면 그 사이를 지나는 연속 종목을 놓칩니다.
+        """
+        latest = latest or self.conn.execute("SELECT MAX(rank_date) FROM deal_rank WHERE market = ? AND investor = ?",
+                                             (market, investor)).fetchone()[0]
+        if not latest:
+            return None
+        expected = [d.isoformat() for d in krx_calendar.trading_days(end=latest, periods=days)]
+        stored = {d for (d,) in self.conn.execute(
+            "SELECT DISTINCT rank_date FROM deal_rank WHERE market = ? AND investor = ? AND rank_date BETWEEN ? AND ?",
+            (market, investor, expected[0], latest))}
+        if any(d not in stored for d in expected):
+            return None
+        table = self.streak_table(market, investor, end=latest)
+        return list(table.index[table['current'] >= days])
+
+
+def snapshot(db_path=DEFAULT_DB_PATH):
+    """지금의 순매수 상위 페이지(시장 × 투자자)를 내려받아 날짜별 목록을 저장합니다."""
+    from http_client import naver_url, fetch_soup
+
+    with DealRankStore(db_path) as store:
+        for market in MARKET_CODES:
+            for investor in INVESTOR_CODES:
+                store.save_boxes(market, investor, parse_deal_rank_boxes(fetch_soup(naver_url(deal_rank_path(market, investor)))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="순매수 상위 목록 이력 및 연속 순매수 일수")
+    parser.add_argument('--db', type=str, default=DEFAULT_DB_PATH, help=f"이력 DB 파일 경로 (기본값: {DEFAULT_DB_PATH})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('snapshot', help="오늘 순매수 상위 페이지의 날짜별 목록 저장")
+    streak = subparsers.add_parser('streaks', help="종목별 현재/최장 연속 순매수 일수")
+    streak.add_argument('--market', type=str, default='kospi', choices=list(MARKET_CODES), help="시장 (기본값: kospi)")
+    streak.add_argument('--investor', type=str, default='foreign', choices=list(INVESTOR_CODES), help="투자자 (기본값: foreign)")
+    streak.add_argument('--min-days', type=int, default=1, help="현재 연속 일수 최소값 (기본값: 1)")
+    streak.add_argument('--start', type=str, help="시작일 (YYYY-MM-DD)")
+    streak.add_argument('--end', type=str, help="종료일 (YYYY-MM-DD)")
+    streak.add_argument('--top', type=int, default=30, help="출력할 개수 (기본값: 30)")
+
+    args = parser.parse_args()
+    if args.command == 'snapshot':
+        snapshot(args.db)
+        return
+
+    with DealRankStore(args.db) as store:
+        table = store.streak_table(args.market, args.investor, args.start, args.end)
+    if table.empty:
+        print("저장된 이력이 없습니다. 'python rank_history.py snapshot' 또는 --db 옵션으로 누적하세요.")
+        return
+    dates = table.attrs['dates']
+    table = table[table['current'] >= args.min_days]
+    print(f"{args.market.upper()} {args.investor} 연속 순매수 ({dates[0]} ~ {dates[-1]}, {len(dates)}거래일)\n")
+    rows = [{'code': code, **row} for code, row in table.head(args.top).to_dict('index').items()]
+    _print_rows(rows, ['name', 'code', 'current', 'longest', 'appearances', 'last_seen'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스크리너 분석 결과 저장소 (SQLite)
+실행일 / 시장 / 투자자 / 종목 단위로 점수 이력을 누적하고 기간별 조회를 제공합니다.
+
+사용 예:
+    python results_store.py history --code 015760 --start 2026-07-01
+    python results_store.py frequency --start 2026-07-01 --min-score 2
+"""
+
+import sqlite3
+import argparse
+import logging
+from datetime import datetime
+
+DEFAULT_DB_PATH = 'results.db'
+
+# (run_date, market, investor, days, code) 가 기본 키이며 run_date 로 시작하므로
+# 날짜 조건 조회는 기본 키 인덱스를, 종목 조건 조회는 idx_results_code 를 사용합니다.
+# days 가 키에 있어 같은 날 연속 매수 일수만 다른 실행(대시보드 배치 등)이 서로 덮어쓰지 않습니다. (알 수 없으면 0)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    run_date      TEXT    NOT NULL,
+    market        TEXT    NOT NULL,
+    investor      TEXT    NOT NULL,
+    code          TEXT    NOT NULL,
+    name          TEXT    NOT NULL,
+    days          INTEGER NOT NULL DEFAULT 0,
+    score         INTEGER NOT NULL,
+    price         INTEGER,
+    change_rate   REAL,
+    high_52w      INTEGER,
+    per           REAL,
+    pbr           REAL,
+    roe           REAL,
+    foreign_ratio REAL,
+    filters       TEXT,
+    PRIMARY KEY (run_date, market, investor, days, code)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_results_code ON results (code, run_date);
+"""
+
+RESULT_COLUMNS = ['run_date', 'market', 'investor', 'code', 'name', 'days', 'score', 'price', 'change_rate',
+                  'high_52w', 'per', 'pbr', 'roe', 'foreign_ratio', 'filters']
+
+# StockResult 필드 -> 테이블 컬럼 (이름이 같습니다)
+RESULT_FIELDS = ['code', 'name', 'score', 'price', 'change_rate', 'high_52w',
+                 'per', 'pbr', 'roe', 'foreign_ratio', 'filters']
+
+
+class ResultsStore:
+    """분석 결과를 SQLite 파일에 누적 저장하고 조회하는 클래스"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self.conn.executescript(SCHEMA)
+
+    def _migrate(self):
+        """기본 키에 days가 없는 예전 results 테이블을 새 스키마로 옮깁니다. (days가 없던 행은 0)"""
+        key = [row['name'] for row in self.conn.execute("PRAGMA table_info(results)") if row['pk']]
+        if not key or 'days' in key:
+            return
+        columns = ', '.join(RESULT_COLUMNS)
+        with self.conn:
+            self.conn.execute("ALTER TABLE results RENAME TO results_old")
+            self.conn.execute("DROP INDEX IF EXISTS idx_results_code")
+            self.conn.executescript(SCHEMA)
+            selected = ', '.join('COALESCE(days, 0)' if c == 'days' else c for c in RESULT_COLUMNS)
+            self.conn.execute(f"INSERT INTO results ({columns}) SELECT {selected} FROM results_old")
+            self.conn.execute("DROP TABLE results_old")
+        logging.info(f"'{self.path}' results 테이블의 기본 키에 days를 추가했습니다.")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def save_results(self, results, market, investor, days=None, run_date=None):
+        """StockResult 리스트를 하나의 트랜잭션으로 저장합니다. 같은 키의 기존 행은 덮어씁니다."""
+        if not results:
+            return 0
+        run_date = run_date or datetime.now().strftime('%Y-%m-%d')
+
+        columns = ['run_date', 'market', 'investor', 'days'] + RESULT_FIELDS
+        placeholders = ', '.join('?' for _ in columns)
+        sql = f"INSERT OR REPLACE INTO results ({', '.join(columns)}) VALUES ({placeholders})"
+
+        rows = [
+            [run_date, market, investor, days or 0] + [getattr(result, field) for field in RESULT_FIELDS]
+            for result in results
+        ]
+        with self.conn:
+            self.conn.executemany(sql, rows)
+        logging.info(f"{len(rows)}개 분석 결과를 '{self.path}'에 저장했습니다. ({run_date} {market}/{investor})")
+        return len(rows)
+
+    def _where(self, code=None, name=None, start=None, end=None, market=None, investor=None, days=None,
+               min_score=None):
+        """조회 조건을 WHERE 절과 파라미터로 변환합니다."""
+        clauses, params = [], []
+        if code:
+            clauses.append("code = ?")
+            params.append(code)
+        if name:
+            clauses.append("name = ?")
+            params.append(name)
+        if start:
+            clauses.append("run_date >= ?")
+            params.append(start)
+        if end:
+            clauses.append("run_date <= ?")
+            params.append(end)
+        if market:
+            clauses.append("market = ?")
+            params.append(market)
+        if investor:
+            clauses.append("investor = ?")
+            params.append(investor)
+        if days:
+            clauses.append("days = ?")
+            params.append(days)
+        if min_score is not None:
+            clauses.append("score >= ?")
+            params.append(min_score)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def history(self, limit=None, **filters):
+        """조건에 맞는 분석 결과 이력을 날짜순으로 반환합니다."""
+        where, params = self._where(**filters)
+        sql = f"SELECT * FROM results {where} ORDER BY run_date, market, investor, score DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def score_frequency(self, limit=20, **filters):
+        """종목별로 조건을 만족한 실행 횟수를 집계합니다. (예: 이번 분기 2점 이상 횟수)"""
+        where, params = self._where(**filters)
+        sql = f"""
+            SELECT code, MAX(name) AS name, COUNT(*) AS hits,
+                   MIN(run_date) AS first_date, MAX(run_date) AS last_date,
+                   ROUND(AVG(score), 2) AS avg_score
+            FROM results {where}
+            GROUP BY code
+            ORDER BY hits DESC, avg_score DESC
+            LIMIT ?
+        """
+        params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+
+def _print_rows(rows, columns):
+    """조회 결과를 표 형태로 출력합니다."""
+    if not rows:
+        print("조회 결과가 없습니다.")
+        return
+    widths = {c: max(len(str(c)), *(len(str(r.get(c, ''))) for r in rows)) for c in columns}
+    print("  ".join(str(c).ljust(widths[c]) for c in columns))
+    print("-" * (sum(widths.values()) + 2 * (len(columns) - 1)))
+    for row in rows:
+        print("  ".join(str(row.get(c, '') if row.get(c) is not None else 'N/A').ljust(widths[c]) for c in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스크리너 분석 결과 이력 조회")
+    parser.add_argument('--db', type=str, default=DEFAULT_DB_PATH, help=f"결과 DB 파일 경로 (기본값: {DEFAULT_DB_PATH})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_filters(sub):
+        sub.add_argument('--code', type=str, help="종목 코드")
+        sub.add_argument('--name', type=str, help="종목명")
+        sub.add_argument('--start', type=str, help="시작일 (YYYY-MM-DD)")
+        sub.add_argument('--end', type=str, help="종료일 (YYYY-MM-DD)")
+        sub.add_argument('--market', type=str, choices=['kospi', 'kosdaq'], help="시장")
+        sub.add_argument('--investor', type=str, choices=['foreign', 'institution'], help="투자자 종류")
+        sub.add_argument('--days', type=int, help="연속 매수 일수")
+        sub.add_argument('--min-score', type=int, help="최소 종합 점수")
+        sub.add_argument('--limit', type=int, default=50, help="최대 출력 행 수 (기본값: 50)")
+
+    add_filters(subparsers.add_parser('history', help="종목/기간별 분석 결과 이력"))
+    add_filters(subparsers.add_parser('frequency', help="종목별 조건 충족 횟수 집계"))
+
+    args = parser.parse_args()
+    filters = dict(code=args.code, name=args.name, start=args.start, end=args.end,
+                   market=args.market, investor=args.investor, days=args.days, min_score=args.min_score)
+
+    with ResultsStore(args.db) as store:
+        if args.command == 'history':
+            rows = store.history(limit=args.limit, **filters)
+            _print_rows(rows, ['run_date', 'market', 'investor', 'days', 'name', 'code', 'score', 'price', 'per', 'pbr', 'roe'])
+        else:
+            rows = store.score_frequency(limit=args.limit, **filters)
+            _print_rows(rows, ['name', 'code', 'hits', 'avg_score', 'first_date', 'last_date'])
+
+
+if __name__ == "__main__":
+    main()
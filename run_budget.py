@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+실행 시간 한도와 원본별 예산, 회로 차단기
+느린 원본 하나가 전체 실행을 붙잡지 않도록 외부 호출(http_client.fetch, market_data.get_ohlcv)마다
+  - 전체 실행 마감(--deadline / KRX_RUN_DEADLINE 초)까지 남은 시간
+  - 원본(호스트)별 누적 사용 시간 예산(--source-budget / KRX_SOURCE_BUDGET 초)
+을 확인해 요청 타임아웃을 남은 시간 이하로 줄이고, 다 쓰면 호출하지 않고 바로 DeadlineExceeded를 발생시킵니다.
+
+원본마다 연속 실패가 KRX_BREAKER_FAILURES(기본값 5)번 쌓이면 회로를 열어 KRX_BREAKER_COOLDOWN(기본값 60)초 동안
+호출하지 않고 CircuitOpen을 발생시키며, 이후 한 번 시험 호출이 성공하면 다시 닫습니다.
+두 예외 모두 requests.exceptions.RequestException의 하위 클래스이므로 기존 오류 처리에서 그대로 잡힙니다.
+"""
+
+import os
+import threading
+import time
+
+import requests
+
+
+class SourceUnavailable(requests.exceptions.RequestException):
+    """실행 예산 때문에 원본을 호출하지 않았습니다."""
+
+
+class DeadlineExceeded(SourceUnavailable):
+    """전체 실행 마감 또는 원본별 예산을 모두 썼습니다."""
+
+
+class CircuitOpen(SourceUnavailable):
+    """연속 실패로 원본 호출이 일시 차단되었습니다."""
+
+
+def _env_float(name):
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+class CircuitBreaker:
+    """원본 하나의 연속 실패 횟수와 차단 상태"""
+    __slots__ = ('threshold', 'cooldown', 'failures', 'opened_at', 'trial', 'trips')
+
+    def __init__(self, threshold=5, cooldown=60.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self.trips = 0
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if self.trial else 'open'
+
+    def allow(self, now):
+        """호출해도 되는지 판단합니다. 차단 후 cooldown이 지나면 시험 호출 한 번을 허용합니다."""
+        if self.opened_at is None:
+            return True
+        if not self.trial and now - self.opened_at >= self.cooldown:
+            self.trial = True
+            return True
+        return False
+
+    def record(self, now, ok):
+        if ok:
+            self.failures, self.opened_at, self.trial = 0, None, False
+            return
+        self.failures += 1
+        if self.trial or (self.opened_at is None and self.failures >= self.threshold):
+            self.opened_at, self.trial = now, False
+            self.trips += 1
+
+
+class RunBudget:
+    """전체 실행 마감, 원본별 사용 시간 예산, 원본별 회로 차단기를 관리합니다. (스레드 안전)"""
+
+    # configure()가 바꾸는 속성 (save_state/restore_state 대상)
+    _STATE = ('started', 'deadline', 'source_seconds', 'breaker_failures', 'breaker_cooldown',
+              'spent', 'rejected', 'breakers')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.configure(run_seconds=_env_float('KRX_RUN_DEADLINE'),
+                       source_seconds=_env_float('KRX_SOURCE_BUDGET'),
+                       breaker_failures=int(os.environ.get('KRX_BREAKER_FAILURES', '5')),
+                       breaker_cooldown=float(os.environ.get('KRX_BREAKER_COOLDOWN', '60')))
+
+    def configure(self, run_seconds=None, source_seconds=None, breaker_failures=5, breaker_cooldown=60.0):
+        """마감(초, 지금부터)과 원본별 예산(초)을 설정하고 사용량/차단 상태를 초기화합니다. None이면 제한 없음."""
+        with self._lock:
+            self.started = time.monotonic()
+            self.deadline = self.started + run_seconds if run_seconds else None
+            self.source_seconds = source_seconds
+            self.breaker_failures = breaker_failures
+            self.breaker_cooldown = breaker_cooldown
+            self.spent = {}
+            self.rejected = {}
+            self.breakers = {}
+
+    def save_state(self):
+        """마감/예산/사용량/차단기 상태를 반환합니다. (restore_state()로 되돌릴 때, 상주 서버에서 명령을 실행하기 전 등)"""
+        with self._lock:
+            return {name: getattr(self, name) for name in self._STATE}
+
+    def restore_state(self, state):
+        with self._lock:
+            for name, value in state.items():
+                setattr(self, name, value)
+
+    def _breaker(self, source):
+        breaker = self.breakers.get(source)
+        if breaker is None:
+            breaker = self.breakers[source] = CircuitBreaker(self.breaker_failures, self.breaker_cooldown)
+        return breaker
+
+    def remaining(self, source=None, now=None):
+        """원본이 더 쓸 수 있는 시간(초). 제한이 없으면 None"""
+        now = time.monotonic() if now is None else now
+        limits = []
+        if self.deadline is not None:
+            limits.append(self.deadline - now)
+        if source is not None and self.source_seconds is not None:
+            limits.append(self.source_seconds - self.spent.get(source, 0.0))
+        return min(limits) if limits else None
+
+    def expired(self):
+        """전체 실행 마감이 지났는지"""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def acquire(self, source, timeout=None):
+        """원본 호출 전에 호출합니다. 사용할 타임아웃(남은 시간 이하)을 반환하거나 SourceUnavailable을 발생시킵니다."""
+        now = time.monotonic()
+        with self._lock:
+            remaining = self.remaining(source, now)
+            if remaining is not None and remaining <= 0.05:
+                self.rejected[source] = self.rejected.get(source, 0) + 1
+                raise DeadlineExceeded(f"{source}: 실행 시간 한도 초과")
+            if not self._breaker(source).allow(now):
+                self.rejected[source] = self.rejected.get(source, 0) + 1
+                raise CircuitOpen(f"{source}: 연속 실패로 호출 차단 중")
+        if remaining is None:
+            return timeout
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def release(self, source, started, ok=True):
+        """원본 호출이 끝난 뒤 사용 시간을 더하고 성공/실패를 회로 차단기에 기록합니다."""
+        now = time.monotonic()
+        with self._lock:
+            self.spent[source] = self.spent.get(source, 0.0) + (now - started)
+            self._breaker(source).record(now, ok)
+
+    def rejections(self):
+        with self._lock:
+            return sum(self.rejected.values())
+
+    def status(self):
+        """원본별 사용 시간, 거부 횟수, 차단기 상태"""
+        with self._lock:
+            sources = sorted(set(self.spent) | set(self.rejected) | set(self.breakers))
+            return {
+                'elapsed_s': round(time.monotonic() - self.started, 2),
+                'deadline_s': round(self.deadline - self.started, 2) if self.deadline is not None else None,
+                'sources': {
+                    source: {
+                        'spent_s': round(self.spent.get(source, 0.0), 2),
+                        'rejected': self.rejected.get(source, 0),
+                        'breaker': self._breaker(source).state,
+                        'trips': self._breaker(source).trips,
+                    }
+                    for source in sources
+                },
+            }
+
+    def print_summary(self):
+        status = self.status()
+        if not any(s['rejected'] or s['trips'] for s in status['sources'].values()):
+            return
+        print(f"\n[실행 예산] 경과 {status['elapsed_s']}s / 마감 {status['deadline_s'] or '없음'}s")
+        for source, s in status['sources'].items():
+            print(f"  {source:<32} 사용 {s['spent_s']:>7.2f}s  거부 {s['rejected']:>4}  차단기 {s['breaker']} (열림 {s['trips']}회)")
+
+
+# 프로세스 전역 실행 예산
+budget = RunBudget()
+
+
+def add_budget_arguments(parser):
+    """진입점 스크립트에 --deadline / --source-budget 옵션을 추가합니다."""
+    parser.add_argument('--deadline', type=float, default=_env_float('KRX_RUN_DEADLINE'), metavar='SECONDS',
+                        help="전체 실행 시간 한도(초). 넘으면 남은 외부 호출을 건너뛰고 가진 데이터로 결과를 만듭니다.")
+    parser.add_argument('--source-budget', type=float, default=_env_float('KRX_SOURCE_BUDGET'), metavar='SECONDS',
+                        help="원본(호스트)별 누적 호출 시간 한도(초)")
+
+
+def configure_budget_from_args(args):
+    """파싱된 옵션으로 전역 실행 예산을 설정합니다. (마감 시계는 이 시점부터 흐릅니다)"""
+    budget.configure(run_seconds=args.deadline, source_seconds=args.source_budget,
+                     breaker_failures=budget.breaker_failures, breaker_cooldown=budget.breaker_cooldown)
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+전 종목 분할 스캔 (코디네이터 / 작업자)
+전 종목 스크리닝을 여러 작업자 프로세스로 나누기 위해, 종목 목록을 묶음(shard)으로 나눠 SQLite 작업 큐에 넣고
+작업자는 묶음을 하나씩 가져가(임대) StockAnalyzer.analyze_stock으로 분석한 결과를 큐에 돌려줍니다.
+모든 묶음이 끝나면 결과를 묶음 번호 -> 제출 순서로 모아 점수 규칙으로 한 번에 채점하고 정렬하므로,
+작업자 수나 완료 순서와 관계없이 같은 결과가 나옵니다.
+
+    scan_runs   실행 하나 (분석 기간, 시장/투자자 등 설정, 묶음 수)
+    scan_tasks  묶음 하나 (종목 목록, 상태 pending/leased/done/failed, 임대 만료 시각, 시도 횟수, 결과 JSON)
+
+작업자는 묶음을 처리하는 동안 임대를 연장하며, 작업자가 죽어 임대가 만료된 묶음은 다른 작업자가 다시 가져가고, --max-attempts번 실패한 묶음은 failed로 남습니다.
+큐는 같은 호스트의 여러 프로세스가 함께 쓰는 SQLite 파일입니다. (WAL, 임대는 BEGIN IMMEDIATE 트랜잭션)
+
+사용 예:
+    python scan_queue.py scan --workers 4                                  # 업종 표 전 종목: 제출 + 작업자 4개 + 병합
+    python scan_queue.py submit --listing KOSPI --shard-size 50            # 실행 ID 출력
+    python scan_queue.py worker --run <실행 ID> --threads 4                 # 다른 터미널/프로세스에서 여러 개
+    python scan_queue.py status
+    python scan_queue.py collect --run <실행 ID> --output scan.csv
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+from profiling import profiler, add_profile_arguments, configure_from_args
+from results_store import _print_rows
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_QUEUE_PATH = 'scan_queue.db'
+DEFAULT_SHARD_SIZE = 50
+DEFAULT_LEASE = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scan_runs (
+    run_id     TEXT    PRIMARY KEY,
+    params     TEXT    NOT NULL,
+    shards     INTEGER NOT NULL,
+    created_at TEXT    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scan_tasks (
+    run_id      TEXT    NOT NULL,
+    shard       INTEGER NOT NULL,
+    stocks      TEXT    NOT NULL,
+    status      TEXT    NOT NULL DEFAULT 'pending',
+    worker      TEXT,
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    result      TEXT,
+    error       TEXT,
+    PRIMARY KEY (run_id, shard)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_scan_tasks_status ON scan_tasks (run_id, status);
+"""
+
+
+def shard(items, size):
+    """items를 제출 순서를 유지하며 size개씩 묶습니다."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class ScanQueue:
+    """SQLite 파일 작업 큐 (여러 프로세스가 동시에 사용)"""
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH):
+        self.path = path
+        # 임대는 직접 BEGIN IMMEDIATE로 감싸므로 자동 트랜잭션을 끕니다.
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def submit(self, stocks, params, shard_size=DEFAULT_SHARD_SIZE):
+        """[(이름, 코드)] 종목 목록을 묶음으로 나눠 넣고 실행 ID를 반환합니다."""
+        run_id = datetime.now().strftime('%Y%m%d-%H%M%S-') + uuid.uuid4().hex[:6]
+        shards = shard([list(s) for s in stocks], shard_size)
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute("INSERT INTO scan_runs (run_id, params, shards, created_at) VALUES (?, ?, ?, ?)",
+                              (run_id, json.dumps(params), len(shards), datetime.now().isoformat(timespec='seconds')))
+            self.conn.executemany("INSERT INTO scan_tasks (run_id, shard, stocks) VALUES (?, ?, ?)",
+                                  [(run_id, i, json.dumps(s)) for i, s in enumerate(shards)])
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        logging.info(f"스캔 실행 {run_id}: {len(stocks)}종목, {len(shards)}개 묶음 제출 ({self.path})")
+        return run_id
+
+    def params(self, run_id):
+        row = self.conn.execute("SELECT params FROM scan_runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"스캔 실행이 없습니다: {run_id}")
+        return json.loads(row[0])
+
+    def latest_run(self):
+        row = self.conn.execute("SELECT run_id FROM scan_runs ORDER BY created_at DESC, run_id DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def claim(self, run_id, worker, lease=DEFAULT_LEASE, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """대기 중이거나 임대가 만료된 묶음 하나를 임대합니다. (묶음 번호, [(이름, 코드)]) 또는 None"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 마지막 시도의 임대까지 만료된 묶음은 다시 가져갈 수 없으므로 failed로 표시합니다. (leased로 남으면 작업자가 끝나지 않음)
+            self.conn.execute(
+                "UPDATE scan_tasks SET status = 'failed', error = COALESCE(error, '임대 만료'), lease_until = NULL "
+                "WHERE run_id = ? AND status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (run_id, now, max_attempts))
+            row = self.conn.execute(
+                "SELECT shard, stocks FROM scan_tasks WHERE run_id = ? AND attempts < ? AND "
+                "(status = 'pending' OR (status = 'leased' AND lease_until < ?)) ORDER BY shard LIMIT 1",
+                (run_id, max_attempts, now)).fetchone()
+            if row:
+                self.conn.execute(
+                    "UPDATE scan_tasks SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                    "WHERE run_id = ? AND shard = ?", (worker, now + lease, run_id, row[0]))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return (row[0], json.loads(row[1])) if row else None
+
+    def renew(self, run_id, shard_no, worker, lease=DEFAULT_LEASE):
+        """처리 중인 묶음의 임대를 연장합니다. 임대를 이미 잃었으면 False"""
+        cursor = self.conn.execute(
+            "UPDATE scan_tasks SET lease_until = ? WHERE run_id = ? AND shard = ? AND worker = ? AND status = 'leased'",
+            (time.time() + lease, run_id, shard_no, worker))
+        return cursor.rowcount == 1
+
+    def complete(self, run_id, shard_no, worker, results):
+        """임대한 묶음의 결과(StockResult 리스트)를 저장합니다. 임대를 잃었으면(다른 작업자가 끝냄) 무시합니다."""
+        cursor = self.conn.execute(
+            "UPDATE scan_tasks SET status = 'done', result = ?, error = NULL, lease_until = NULL "
+            "WHERE run_id = ? AND shard = ? AND worker = ? AND status = 'leased'",
+            (json.dumps([asdict(r) for r in results], ensure_ascii=False), run_id, shard_no, worker))
+        return cursor.rowcount == 1
+
+    def fail(self, run_id, shard_no, worker, error, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """묶음을 대기 상태로 되돌리고, 시도 횟수를 다 쓰면 failed로 표시합니다."""
+        self.conn.execute(
+            "UPDATE scan_tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "error = ?, lease_until = NULL WHERE run_id = ? AND shard = ? AND worker = ?",
+            (max_attempts, error, run_id, shard_no, worker))
+
+    def counts(self, run_id):
+        rows = self.conn.execute("SELECT status, COUNT(*) FROM scan_tasks WHERE run_id = ? GROUP BY status", (run_id,))
+        return dict(rows.fetchall())
+
+    def results(self, run_id):
+        """완료된 묶음의 결과를 묶음 번호 순서로 StockResult 리스트로 읽습니다."""
+        from stock_records import StockResult
+
+        results = []
+        for (result,) in self.conn.execute(
+                "SELECT result FROM scan_tasks WHERE run_id = ? AND status = 'done' ORDER BY shard", (run_id,)):
+            results += [StockResult(**item) for item in json.loads(result)]
+        return results
+
+
+def default_params(market='kospi', investor='foreign'):
+    """모든 작업자가 같은 분석 기간을 쓰도록 제출할 때 기간을 고정합니다."""
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=365)
+    return {'market': market, 'investor': investor,
+            'start': start_date.strftime('%Y-%m-%d'), 'end': end_date.strftime('%Y-%m-%d')}
+
+
+class _LeaseKeeper:
+    """묶음을 처리하는 동안 lease/3초마다 임대를 연장하는 스레드 (자체 연결 사용)"""
+
+    def __init__(self, queue_path, run_id, shard_no, worker, lease):
+        self.args = (run_id, shard_no, worker, lease)
+        self.queue_path = queue_path
+        self.interval = max(lease / 3, 0.1)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='scan-lease', daemon=True)
+
+    def _run(self):
+        with ScanQueue(self.queue_path) as queue:
+            while not self._stop.wait(self.interval):
+                if not queue.renew(*self.args):
+                    return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(queue_path, run_id, threads=4, lease=DEFAULT_LEASE, max_attempts=DEFAULT_MAX_ATTEMPTS, poll=1.0):
+    """큐가 빌 때까지 묶음을 임대해 분석합니다. 다른 작업자의 임대가 남아 있으면 만료를 기다려 이어받습니다."""
+    from find_stocks import StockAnalyzer
+    from stock_records import StockRef
+
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    processed = 0
+    with ScanQueue(queue_path) as queue:
+        params = queue.params(run_id)
+        analyzer = StockAnalyzer(investor_type=params['investor'], market=params['market'])
+
+        def analyze(stock):
+            try:
+                return analyzer.analyze_stock(StockRef(*stock), params['start'], params['end'])
+            except Exception as e:
+                logging.error(f"{stock[0]} ({stock[1]}) 분석 중 오류 발생: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            while True:
+                task = queue.claim(run_id, worker, lease, max_attempts)
+                if task is None:
+                    counts = queue.counts(run_id)
+                    if not counts.get('pending') and not counts.get('leased'):
+                        break
+                    time.sleep(poll)
+                    continue
+                shard_no, stocks = task
+                try:
+                    with _LeaseKeeper(queue_path, run_id, shard_no, worker, lease):
+                        results = [r for r in pool.map(analyze, stocks) if r is not None]
+                except Exception as e:
+                    queue.fail(run_id, shard_no, worker, str(e), max_attempts)
+                    continue
+                if queue.complete(run_id, shard_no, worker, results):
+                    processed += 1
+    logging.info(f"작업자 {worker}: 묶음 {processed}개 처리")
+    return processed
+
+
+def merge_results(queue_path, run_id, rules=None, db_path=None):
+    """완료된 묶음 결과를 묶음 번호 -> 제출 순서로 모아 한 번에 채점하고 점수순으로 정렬합니다."""
+    from cross_section import load_rule_features
+    from scoring_rules import RuleSet
+    from stock_records import sort_by_score
+
+    with ScanQueue(queue_path) as queue:
+        results = queue.results(run_id)
+    rules = rules or RuleSet.load()
+    extra = load_rule_features(db_path, [r.code for r in results])
+    return sort_by_score(rules.apply(results, extra))
+
+
+def spawn_workers(queue_path, run_id, count, threads):
+    """같은 호스트에 작업자 프로세스 count개를 띄우고 모두 끝날 때까지 기다립니다."""
+    command = [sys.executable, os.path.abspath(__file__), '--queue', queue_path, 'worker',
+               '--run', run_id, '--threads', str(threads)]
+    processes = [subprocess.Popen(command) for _ in range(count)]
+    return [p.wait() for p in processes]
+
+
+def _stocks(args):
+    """--codes/--codes-file/--listing 또는 업종 표의 전 종목 [(이름, 코드)] (코드 순)"""
+    codes = list(args.codes)
+    if args.codes_file:
+        from breakout_watcher import read_watchlist
+        codes += read_watchlist(args.codes_file)
+    if args.listing:
+        from price_panel import listing_codes
+        codes += listing_codes(args.listing)
+    from sector_index import load_or_collect, DEFAULT_CACHE_PATH
+    index = load_or_collect(args.sector_cache or DEFAULT_CACHE_PATH)
+    if not codes:
+        codes = sorted({m.code for g in index.groups if g.kind == 'upjong' for m in g.members})
+    return [(index.name_of(code), code) for code in dict.fromkeys(codes)]
+
+
+def _add_universe_arguments(parser):
+    parser.add_argument('--codes', type=str, nargs='*', default=[], help="종목 코드 (기본값: 업종 표의 전 종목)")
+    parser.add_argument('--codes-file', type=str, help="종목 코드 파일 (.txt 또는 '코드' 컬럼 CSV)")
+    parser.add_argument('--listing', type=str, choices=['KRX', 'KOSPI', 'KOSDAQ'], help="FinanceDataReader 상장 종목 전체")
+    parser.add_argument('--sector-cache', type=str, help="업종/테마 색인 캐시 파일 (종목명, 기본값: sector_index.json)")
+    parser.add_argument('--market', type=str, default='kospi', choices=['kospi', 'kosdaq'], help="시장 (기본값: kospi)")
+    parser.add_argument('--investor', type=str, default='foreign', choices=['foreign', 'institution'],
+                        help="투자자 종류 (기본값: foreign)")
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help=f"묶음당 종목 수 (기본값: {DEFAULT_SHARD_SIZE})")
+
+
+def _add_output_arguments(parser):
+    from scoring_rules import add_rules_arguments
+    parser.add_argument('--output', type=str, help="병합 결과를 저장할 CSV 파일명 (없으면 상위 종목 출력)")
+    parser.add_argument('--top', type=int, default=30, help="출력할 개수 (기본값: 30)")
+    parser.add_argument('--db', type=str, help="횡단면 지표를 점수 규칙에 쓸 결과 DB (cross_section.py)")
+    add_rules_arguments(parser)
+
+
+def _write_output(args, results):
+    from stock_records import results_to_frame
+
+    if args.output:
+        results_to_frame(results).to_csv(args.output, index=False, encoding='utf-8-sig')
+        print(f"✓ 병합 결과 {len(results)}종목을 '{args.output}'에 저장했습니다.")
+        return
+    rows = [{'name': r.name, 'code': r.code, 'score': r.score, 'price': f'{r.price:,}',
+             'change': f'{r.change_rate:+.2f}%', 'filters': r.filters} for r in results[:args.top]]
+    _print_rows(rows, ['name', 'code', 'score', 'price', 'change', 'filters'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전 종목 분할 스캔 (SQLite 작업 큐, 코디네이터/작업자)")
+    parser.add_argument('--queue', type=str, default=DEFAULT_QUEUE_PATH, help=f"작업 큐 파일 (기본값: {DEFAULT_QUEUE_PATH})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    scan = subparsers.add_parser('scan', help="제출 + 이 호스트에서 작업자 실행 + 병합")
+    _add_universe_arguments(scan)
+    scan.add_argument('--workers', type=int, default=4, help="작업자 프로세스 수 (기본값: 4)")
+    scan.add_argument('--threads', type=int, default=4, help="작업자별 동시 분석 종목 수 (기본값: 4)")
+    _add_output_arguments(scan)
+
+    submit = subparsers.add_parser('submit', help="종목을 묶음으로 나눠 큐에 제출 (실행 ID 출력)")
+    _add_universe_arguments(submit)
+
+    worker = subparsers.add_parser('worker', help="큐가 빌 때까지 묶음을 가져와 분석")
+    worker.add_argument('--run', type=str, help="실행 ID (기본값: 마지막 제출)")
+    worker.add_argument('--threads', type=int, default=4, help="동시 분석 종목 수 (기본값: 4)")
+    worker.add_argument('--lease', type=float, default=DEFAULT_LEASE, help=f"묶음 임대 시간(초) (기본값: {DEFAULT_LEASE:.0f})")
+    worker.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help=f"묶음당 최대 시도 횟수 (기본값: {DEFAULT_MAX_ATTEMPTS})")
+    add_profile_arguments(worker)
+
+    status = subparsers.add_parser('status', help="실행별 묶음 상태")
+    status.add_argument('--run', type=str, help="실행 ID (기본값: 마지막 제출)")
+
+    collect = subparsers.add_parser('collect', help="완료된 결과 병합")
+    collect.add_argument('--run', type=str, help="실행 ID (기본값: 마지막 제출)")
+    collect.add_argument('--partial', action='store_true', help="끝나지 않은 묶음이 있어도 병합")
+    _add_output_arguments(collect)
+
+    args = parser.parse_args()
+    if args.command in ('scan', 'submit'):
+        stocks = _stocks(args)
+        with ScanQueue(args.queue) as queue:
+            run_id = queue.submit(stocks, default_params(args.market, args.investor), args.shard_size)
+        if args.command == 'submit':
+            print(run_id)
+            return
+        started = time.perf_counter()
+        spawn_workers(args.queue, run_id, args.workers, args.threads)
+        logging.info(f"작업자 {args.workers}개 완료 ({time.perf_counter() - started:.1f}s)")
+        args.run = run_id
+
+    with ScanQueue(args.queue) as queue:
+        run_id = args.run or queue.latest_run()
+        if run_id is None:
+            parser.error("제출된 스캔 실행이 없습니다.")
+        counts = queue.counts(run_id)
+
+    if args.command == 'worker':
+        configure_from_args(args)
+        run_worker(args.queue, run_id, args.threads, args.lease, args.max_attempts)
+        profiler.finish()
+        return
+    if args.command == 'status':
+        print(f"{run_id}: " + ', '.join(f"{k} {v}" for k, v in sorted(counts.items())))
+        return
+
+    unfinished = sum(v for k, v in counts.items() if k != 'done')
+    if unfinished and not getattr(args, 'partial', False):
+        print(f"끝나지 않은 묶음이 {unfinished}개 있습니다: {counts} (--partial로 완료된 묶음만 병합)")
+        if args.command == 'collect':
+            return
+    from scoring_rules import RuleSet
+    _write_output(args, merge_results(args.queue, run_id, RuleSet.load(args.rules), args.db))
+
+
+if __name__ == "__main__":
+    main()
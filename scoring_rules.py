@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+필터/점수 규칙
+스크리너/대시보드의 PBR/PER/ROE 점수 기준을 코드 대신 규칙 파일로 정의합니다. 한 줄에 규칙 하나:
+
+    pbr > 0 and pbr < 1.0   -> +1 "PBR: {pbr:.2f}"
+    0 < per < 15            -> +1 "PER: {per:.2f}"
+    roe > 15                -> +1 "ROE: {roe:.2f}%"
+
+'->' 왼쪽은 지표 이름, 숫자, 비교/산술 연산자, and/or/not, 괄호로 된 조건이고, 오른쪽은 가중치와 (선택) 필터 문구입니다.
+문구의 {지표:형식}은 조건을 만족한 종목의 값으로 채워집니다. (조건에 쓴 지표만, 아니면 읽을 때 ValueError) '#' 뒤는 주석입니다.
+
+규칙은 파일을 읽을 때 한 번만 (종목 수 길이) NumPy 배열 연산으로 컴파일되고, 분석한 종목 전체를 한 번에 채점합니다.
+조건에 쓰인 지표 중 하나라도 값이 없는(None) 종목은 그 규칙을 만족하지 않으므로 별도 None 검사가 필요 없습니다.
+
+사용 예:
+    python scoring_rules.py                                         # 기본 규칙(scoring_rules.txt) 확인
+    python scoring_rules.py --rules my.rules --csv analysis_result.csv  # 저장된 결과를 다른 규칙으로 다시 채점
+    python find_stocks.py --rules my.rules
+"""
+
+import argparse
+import ast
+import logging
+import os
+import re
+import string
+from dataclasses import dataclass
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scoring_rules.txt')
+
+# StockResult 속성으로 만드는 기본 지표 (그 밖의 지표는 evaluate에 열로 넘기면 규칙에서 쓸 수 있습니다)
+FEATURES = ('price', 'change_rate', 'high_52w', 'price_ratio', 'per', 'pbr', 'roe', 'foreign_ratio')
+
+# analysis_result.csv 한글 컬럼 -> 지표 이름
+CSV_FEATURES = {'현재가': 'price', '등락률': 'change_rate', '52주 신고가': 'high_52w',
+                'PER': 'per', 'PBR': 'pbr', 'ROE': 'roe', '외국인보유율': 'foreign_ratio'}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Compare,
+    ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq, ast.Name, ast.Load, ast.Constant,
+)
+_ACTION = re.compile(r'^([+-]?\d+(?:\.\d+)?)\s*(?:"(.*)")?$')
+
+
+class _Vectorize(ast.NodeTransformer):
+    """and/or/not과 연쇄 비교를 배열 연산(&, |, ~)으로 바꿉니다."""
+
+    def visit_BoolOp(self, node):
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        values = [self.visit(value) for value in node.values]
+        result = values[0]
+        for value in values[1:]:
+            result = ast.BinOp(left=result, op=op, right=value)
+        return result
+
+    def visit_UnaryOp(self, node):
+        operand = self.visit(node.operand)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=operand)
+        return ast.UnaryOp(op=node.op, operand=operand)
+
+    def visit_Compare(self, node):
+        operands = [self.visit(node.left)] + [self.visit(c) for c in node.comparators]
+        result = None
+        for left, op, right in zip(operands, node.ops, operands[1:]):
+            compare = ast.Compare(left=left, ops=[op], comparators=[right])
+            result = compare if result is None else ast.BinOp(left=result, op=ast.BitAnd(), right=compare)
+        return result
+
+
+@dataclass(frozen=True)
+class Rule:
+    """컴파일된 규칙 하나"""
+    condition: str
+    weight: float
+    label: str
+    code: object
+    names: tuple
+    label_names: tuple
+
+    def mask(self, columns):
+        import numpy as np
+
+        missing = [name for name in self.names if name not in columns]
+        if missing:
+            raise ValueError(f"규칙 '{self.condition}'의 지표가 없습니다: {', '.join(missing)}")
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = eval(self.code, {'__builtins__': {}}, columns)
+        result = np.broadcast_to(np.asarray(result, dtype=bool), (len(next(iter(columns.values()))),))
+        # 쓰는 지표 중 값이 없는(NaN) 종목은 not/or 조건이어도 만족하지 않습니다.
+        for name in self.names:
+            result = result & ~np.isnan(columns[name])
+        return result
+
+    def describe(self, columns, i):
+        return self.label.format(**{name: columns[name][i] for name in self.label_names})
+
+
+def compile_rule(line):
+    """'조건 -> +가중치 "문구"' 한 줄을 Rule로 컴파일합니다. 형식이 잘못되면 ValueError"""
+    condition, arrow, action = line.rpartition('->')
+    condition = condition.strip()
+    match = _ACTION.match(action.strip())
+    if not arrow or not condition or not match:
+        raise ValueError(f"규칙 형식이 아닙니다 ('조건 -> +가중치 \"문구\"'): {line}")
+    try:
+        tree = ast.parse(condition, mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"조건을 해석할 수 없습니다: {condition} ({e.msg})") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES) or (
+                isinstance(node, ast.Constant) and not isinstance(node.value, (int, float))):
+            raise ValueError(f"조건에 쓸 수 없는 표현입니다: {ast.unparse(node)} ({condition})")
+    names = tuple(dict.fromkeys(node.id for node in ast.walk(tree) if isinstance(node, ast.Name)))
+
+    vectorized = ast.fix_missing_locations(_Vectorize().visit(tree))
+    weight = float(match.group(1))
+    label = match.group(2) if match.group(2) is not None else condition
+    try:
+        label_names = tuple(dict.fromkeys(field.split('.')[0].split('[')[0]
+                                          for _, field, _, _ in string.Formatter().parse(label) if field))
+    except ValueError as e:
+        raise ValueError(f"문구 형식이 잘못되었습니다: {label} ({e})") from None
+    # 문구는 조건을 만족한 종목에만 채우므로 조건에 쓴 지표만 쓸 수 있습니다. (채점 중에 KeyError로 실행이 멈추지 않도록)
+    unknown = [name for name in label_names if name not in names]
+    if unknown:
+        raise ValueError(f"문구의 지표가 조건에 없습니다: {', '.join(unknown)} ({label})")
+    try:
+        label.format(**{name: 1.0 for name in label_names})
+    except (ValueError, IndexError, KeyError) as e:
+        raise ValueError(f"문구 형식이 잘못되었습니다: {label} ({e})") from None
+    return Rule(condition=condition, weight=int(weight) if weight.is_integer() else weight, label=label,
+                code=compile(vectorized, f'<rule: {condition}>', 'eval'), names=names, label_names=label_names)
+
+
+class RuleSet:
+    """규칙 목록. 종목 전체의 지표 열을 받아 점수와 필터 문구를 한 번에 계산합니다."""
+
+    def __init__(self, rules, source=None):
+        self.rules = list(rules)
+        self.source = source
+
+    @classmethod
+    def parse(cls, text, source=None):
+        rules = []
+        for number, line in enumerate(text.splitlines(), 1):
+            line = _strip_comment(line)
+            if not line:
+                continue
+            try:
+                rules.append(compile_rule(line))
+            except ValueError as e:
+                raise ValueError(f"{source or '규칙'}:{number}: {e}") from None
+        return cls(rules, source)
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or DEFAULT_RULES_PATH
+        with open(path, encoding='utf-8') as f:
+            return cls.parse(f.read(), source=path)
+
+    @property
+    def max_score(self):
+        """만족할 수 있는 최대 점수 (양수 가중치 합)"""
+        return sum(rule.weight for rule in self.rules if rule.weight > 0)
+
+    def evaluate(self, columns):
+        """{지표: 배열} 열 묶음을 채점해 (점수 배열, 종목별 필터 문구 리스트)를 반환합니다."""
+        import numpy as np
+
+        columns = {name: np.asarray(values, dtype=float) for name, values in columns.items()}
+        n = len(next(iter(columns.values()))) if columns else 0
+        if not self.rules or n == 0:
+            return np.zeros(n, dtype=int), [''] * n
+        masks = np.vstack([rule.mask(columns) for rule in self.rules])
+        weights = np.array([rule.weight for rule in self.rules])
+        scores = weights @ masks
+
+        texts = [[] for _ in range(n)]
+        for rule, mask in zip(self.rules, masks):
+            for i in np.flatnonzero(mask):
+                texts[i].append(rule.describe(columns, i))
+        return scores, [', '.join(parts) for parts in texts]
+
+    def fill_missing(self, columns, n):
+        """규칙이 쓰는 지표 중 columns에 없는 것을 경고하고 값 없음(NaN) 열로 채웁니다. (해당 규칙은 아무 종목도 만족하지 않음)"""
+        import numpy as np
+
+        missing = sorted({name for rule in self.rules for name in rule.names} - set(columns))
+        if missing:
+            logging.warning(f"점수 규칙의 지표가 없어 해당 규칙을 건너뜁니다: {', '.join(missing)}")
+            columns.update({name: np.full(n, np.nan) for name in missing})
+        return columns
+
+    def apply(self, results, extra=None):
+        """StockResult 리스트의 score/filters를 채웁니다. (전체 종목 한 번에)
+
+        extra는 종목 코드 색인 DataFrame(예: cross_section.load_rule_features)으로, 열 이름을 지표로 쓸 수 있습니다.
+        규칙이 쓰는 지표가 없으면 경고 후 값 없음으로 처리합니다.
+        """
+        if not results:
+            return results
+        columns = {name: [_value(getattr(r, name)) for r in results] for name in FEATURES}
+        if extra is not None:
+            aligned = extra.reindex([r.code for r in results])
+            columns.update({name: aligned[name].to_numpy(dtype=float) for name in aligned.columns})
+        scores, filters = self.evaluate(self.fill_missing(columns, len(results)))
+        for result, score, text in zip(results, scores.tolist(), filters):
+            result.score = int(score) if float(score).is_integer() else score
+            result.filters = text
+        return results
+
+
+def _strip_comment(line):
+    """문구 안의 '#'은 두고 따옴표 밖의 주석만 지웁니다."""
+    in_quote = False
+    for i, char in enumerate(line):
+        if char == '"':
+            in_quote = not in_quote
+        elif char == '#' and not in_quote:
+            return line[:i].strip()
+    return line.strip()
+
+
+def _value(value):
+    return float('nan') if value is None else value
+
+
+def add_rules_arguments(parser):
+    """진입점 스크립트에 --rules 옵션을 추가합니다."""
+    parser.add_argument('--rules', type=str, metavar='PATH',
+                        help=f"필터/점수 규칙 파일 (기본값: {os.path.basename(DEFAULT_RULES_PATH)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="필터/점수 규칙 확인 및 저장된 분석 결과 다시 채점")
+    add_rules_arguments(parser)
+    parser.add_argument('--csv', type=str, help="다시 채점할 분석 결과 CSV (find_stocks.py --output 형식)")
+    args = parser.parse_args()
+
+    rules = RuleSet.load(args.rules)
+    print(f"규칙 {len(rules.rules)}개 ({rules.source}, 최대 {rules.max_score}점)")
+    for rule in rules.rules:
+        print(f"  {rule.weight:+g}  {rule.condition}  ->  \"{rule.label}\"")
+    if not args.csv:
+        return
+
+    import pandas as pd
+
+    df = pd.read_csv(args.csv, dtype={'코드': str}, encoding='utf-8-sig')
+    columns = {feature: pd.to_numeric(df[col], errors='coerce').to_numpy()
+               for col, feature in CSV_FEATURES.items() if col in df}
+    if 'price' in columns and 'high_52w' in columns:
+        columns['price_ratio'] = columns['price'] / columns['high_52w']
+    # CSV에 없는 지표(cross_section 백분위 등)를 쓰는 규칙은 경고 후 건너뜁니다.
+    df['종합 점수'], df['필터'] = rules.evaluate(rules.fill_missing(columns, len(df)))
+    df = df.sort_values('종합 점수', ascending=False, kind='stable')
+    print()
+    print(df[['종목명', '코드', '종합 점수', '필터']].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+업종/테마 구성 종목 수집과 역색인
+업종(sise_group.naver?type=upjong)과 테마(theme.naver, 전체 페이지) 목록에서 상세 페이지
+(sise_group_detail.naver)를 모두 동시에 내려받아 구성 종목을 모으고,
+종목 코드 -> {업종, 테마} 역색인을 만들어 "이 종목은 어떤 테마에 속하나"를 O(1)로 조회합니다.
+
+구성 종목은 자주 바뀌지 않으므로 결과를 JSON 파일(기본값: sector_index.json)에 저장하고
+--max-age 초(기본값: 6시간) 동안 재사용합니다.
+
+사용 예:
+    python sector_index.py --codes 005930 000660
+    python sector_index.py --deal-rank kospi --investor foreign
+    python sector_index.py --refresh --workers 16
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from http_client import naver_url, fetch_soup
+from profiling import stage, profiler, add_profile_arguments, configure_from_args
+from stock_records import StockRef
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_CACHE_PATH = 'sector_index.json'
+DEFAULT_MAX_AGE = 6 * 3600
+KIND_LABELS = {'upjong': '업종', 'theme': '테마'}
+
+
+@dataclass(slots=True)
+class Group:
+    """업종 또는 테마 하나와 구성 종목"""
+    kind: str
+    no: int
+    name: str
+    change: float
+    members: list = field(default_factory=list)
+
+
+# ---------- 파싱 ----------
+def parse_group_list(soup, kind):
+    """업종/테마 시세 표(table.type_1)에서 그룹 번호, 이름, 등락률을 읽습니다."""
+    groups = []
+    table = soup.find('table', class_='type_1') if soup else None
+    if not table:
+        return groups
+    for row in table.find_all('tr'):
+        cols = row.find_all('td')
+        if len(cols) < 2:
+            continue
+        link = cols[0].find('a')
+        match = re.search(r'no=(\d+)', link.get('href', '')) if link else None
+        if not match:
+            continue
+        try:
+            change = float(cols[1].text.strip().replace('%', '').replace('+', '').replace(',', ''))
+        except ValueError:
+            change = 0.0
+        groups.append(Group(kind, int(match.group(1)), link.text.strip(), change))
+    return groups
+
+
+def parse_last_page(soup):
+    """페이지 이동 표의 '맨뒤' 링크에서 마지막 페이지 번호를 읽습니다. 없으면 1."""
+    link = soup.select_one('td.pgRR a') if soup else None
+    match = re.search(r'page=(\d+)', link.get('href', '')) if link else None
+    return int(match.group(1)) if match else 1
+
+
+def parse_group_members(soup):
+    """상세 페이지 구성 종목 표(table.type_5)에서 종목명/코드를 읽습니다."""
+    members = []
+    table = soup.find('table', class_='type_5') if soup else None
+    if not table:
+        return members
+    for link in table.select('a[href*="code="]'):
+        match = re.search(r'code=(\d+)', link.get('href', ''))
+        name = link.text.strip()
+        if match and name:
+            members.append(StockRef(name, match.group(1)))
+    return members
+
+
+# ---------- 역색인 ----------
+class SectorThemeIndex:
+    """업종/테마 구성 종목과 종목 코드 -> 소속 업종/테마 역색인"""
+
+    def __init__(self, groups, collected_at=None):
+        self.groups = list(groups)
+        self.collected_at = collected_at or time.time()
+        self._by_code = {}
+        self._by_name = {}
+        self._stock_names = {}
+        for group in self.groups:
+            self._by_name[(group.kind, group.name)] = group
+            for member in group.members:
+                self._stock_names[member.code] = member.name
+                entry = self._by_code.setdefault(member.code, {'upjong': [], 'theme': []})
+                entry[group.kind].append(group)
+
+    def __len__(self):
+        return len(self._by_code)
+
+    def name_of(self, code):
+        """색인에 저장된 종목명 (없으면 코드)"""
+        return self._stock_names.get(code, code)
+
+    def sectors_of(self, code):
+        """종목이 속한 업종 목록"""
+        return self._by_code.get(code, {}).get('upjong', [])
+
+    def themes_of(self, code):
+        """종목이 속한 테마 목록"""
+        return self._by_code.get(code, {}).get('theme', [])
+
+    def members(self, kind, name):
+        """업종/테마 이름으로 구성 종목을 조회합니다."""
+        group = self._by_name.get((kind, name))
+        return group.members if group else []
+
+    def to_dict(self):
+        return {
+            'collected_at': self.collected_at,
+            'groups': [
+                {'kind': g.kind, 'no': g.no, 'name': g.name, 'change': g.change,
+                 'members': [[m.name, m.code] for m in g.members]}
+                for g in self.groups
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        groups = [Group(g['kind'], g['no'], g['name'], g['change'], [StockRef(n, c) for n, c in g['members']])
+                  for g in data['groups']]
+        return cls(groups, collected_at=data.get('collected_at'))
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+# ---------- 수집 ----------
+def _fetch(url):
+    try:
+        return fetch_soup(url)
+    except Exception as e:
+        logging.error(f"URL 가져오기 오류: {url} - {e}")
+        return None
+
+
+def collect(max_workers=8):
+    """업종/테마 목록과 모든 상세 페이지를 동시에 내려받아 SectorThemeIndex를 만듭니다."""
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        with stage('sector_index.lists'):
+            sector_page = pool.submit(_fetch, naver_url('/sise/sise_group.naver?type=upjong'))
+            theme_first = _fetch(naver_url('/sise/theme.naver'))
+            theme_pages = [theme_first] + list(pool.map(
+                _fetch, [naver_url(f'/sise/theme.naver?&page={page}')
+                         for page in range(2, parse_last_page(theme_first) + 1)]))
+
+            groups = parse_group_list(sector_page.result(), 'upjong')
+            seen_themes = set()
+            for soup in theme_pages:
+                for group in parse_group_list(soup, 'theme'):
+                    if group.no not in seen_themes:
+                        seen_themes.add(group.no)
+                        groups.append(group)
+
+        with stage('sector_index.details'):
+            detail_urls = [naver_url(f'/sise/sise_group_detail.naver?type={g.kind}&no={g.no}') for g in groups]
+            for group, soup in zip(groups, pool.map(_fetch, detail_urls)):
+                group.members = parse_group_members(soup)
+
+    index = SectorThemeIndex(groups)
+    sectors = sum(1 for g in groups if g.kind == 'upjong')
+    logging.info(f"업종 {sectors}개, 테마 {len(groups) - sectors}개, 종목 {len(index)}개 색인 완료")
+    return index
+
+
+def load_or_collect(cache_path=DEFAULT_CACHE_PATH, max_age=DEFAULT_MAX_AGE, max_workers=8, refresh=False):
+    """저장된 색인이 max_age 초 이내면 불러오고, 아니면 새로 수집해 저장합니다."""
+    if cache_path and not refresh and os.path.exists(cache_path):
+        try:
+            index = SectorThemeIndex.load(cache_path)
+            if time.time() - index.collected_at < max_age:
+                return index
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"업종/테마 색인 캐시를 읽을 수 없습니다: {cache_path} - {e}")
+    index = collect(max_workers=max_workers)
+    if cache_path:
+        index.save(cache_path)
+    return index
+
+
+def _print_lookup(index, stock):
+    sectors = ', '.join(f"{g.name}({g.change:+.2f}%)" for g in index.sectors_of(stock.code)) or '-'
+    themes = ', '.join(f"{g.name}({g.change:+.2f}%)" for g in index.themes_of(stock.code)) or '-'
+    print(f"▶ {stock.name} ({stock.code})")
+    print(f"  - 업종: {sectors}")
+    print(f"  - 테마: {themes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업종/테마 구성 종목 수집 및 종목별 소속 조회")
+    parser.add_argument('--codes', type=str, nargs='*', default=[], help="소속 업종/테마를 조회할 종목 코드")
+    parser.add_argument('--deal-rank', type=str, choices=['kospi', 'kosdaq'],
+                        help="해당 시장의 최근 순매수 상위 종목 소속 업종/테마 조회")
+    parser.add_argument('--investor', type=str, default='foreign', choices=['foreign', 'institution'],
+                        help="--deal-rank 투자자 종류 (기본값: foreign)")
+    parser.add_argument('--cache', type=str, default=DEFAULT_CACHE_PATH, help=f"색인 저장 파일 (기본값: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--max-age', type=int, default=DEFAULT_MAX_AGE, help="저장된 색인 재사용 기간(초) (기본값: 21600)")
+    parser.add_argument('--refresh', action='store_true', help="저장된 색인을 무시하고 새로 수집")
+    parser.add_argument('--workers', type=int, default=8, help="동시 요청 수 (기본값: 8)")
+    add_profile_arguments(parser)
+
+    args = parser.parse_args()
+    configure_from_args(args)
+
+    with stage('sector_index.load'):
+        index = load_or_collect(args.cache, args.max_age, args.workers, args.refresh)
+
+    stocks = [StockRef(index.name_of(code), code) for code in args.codes]
+    if args.deal_rank:
+        from find_stocks import StockAnalyzer
+        stocks += StockAnalyzer(investor_type=args.investor, market=args.deal_rank).get_top_buy_stocks(day_index=0)
+
+    for stock in stocks:
+        _print_lookup(index, stock)
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
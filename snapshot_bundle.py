@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+거래일 스냅샷 번들
+대시보드(HTML/콘솔), 스크리너, 백테스트가 각자 같은 시장 데이터를 다시 수집하지 않도록
+한 번의 수집 실행으로 거래일 하나의 원본 데이터를 압축 파일 하나에 담습니다.
+
+    - 페이지 본문: 순매수 상위 목록, 업종/테마 시세, 종목 상세(펀더멘탈)
+    - 시세: 분석에 쓰는 종목/지수별 일봉 (market_data가 조회한 넓힌 기간 그대로)
+    - 지수/선물 시세 (IndexQuote)
+    - 기준 거래일과 기준 시각, 수집 시 데이터 소스
+
+번들은 gzip으로 압축한 pickle이며 FORMAT_VERSION이 다르면 읽지 않습니다. (직접 만든 파일만 여세요)
+--snapshot 경로로 번들을 연 실행은 페이지/시세 캐시를 번들로 바꾸고 네트워크 요청을 막으므로
+파싱/분석만 하며, 번들에 없는 데이터는 run_budget의 '가져올 수 없음'과 같이 처리됩니다.
+기준 시각도 번들의 수집 시각으로 고정되어 다음 날 다시 실행해도 같은 거래일 기준으로 계산합니다.
+
+사용 예:
+    python snapshot_bundle.py collect                              # snapshots/krx-<거래일>.pkl.gz
+    python snapshot_bundle.py collect --investors foreign institution --days 2 --out today.pkl.gz
+    python snapshot_bundle.py info --path today.pkl.gz
+    python unified_dashboard_html.py --snapshot today.pkl.gz --output docs/index.html
+    python find_stocks.py --snapshot today.pkl.gz --days 3
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import logging
+import os
+import pickle
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+
+from profiling import stage, profiler, add_profile_arguments, configure_from_args
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+FORMAT_VERSION = 1
+DEFAULT_DIR = 'snapshots'
+
+# use_snapshot()으로 이 프로세스에 설정한 번들 (release_snapshot()으로 해제)
+_active = None
+
+
+class _RecordingCache(dict):
+    """만료 없는 get/set 캐시. 수집 중에는 원본 응답을 기록하고, 번들을 열면 그대로 캐시로 사용합니다."""
+
+    def set(self, key, value, ttl=None):
+        self[key] = value
+
+    def stats(self):
+        return {'name': 'snapshot', 'entries': len(self)}
+
+
+@dataclass
+class SnapshotBundle:
+    """거래일 하나의 원본 데이터 묶음"""
+    session: str
+    as_of: str
+    created_at: str
+    sources: dict
+    pages: dict = field(default_factory=dict)
+    prices: dict = field(default_factory=dict)
+    quotes: dict = field(default_factory=dict)
+    version: int = FORMAT_VERSION
+
+    def save(self, path):
+        """gzip 압축 pickle로 저장합니다. (임시 파일에 쓴 뒤 교체)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+            # 스크립트로 실행해도(__main__) 다른 진입점에서 읽을 수 있도록 dict로 저장합니다.
+            pickle.dump({item.name: getattr(self, item.name) for item in fields(self)}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, 'rb') as f:
+            data = pickle.load(f)
+        version = data.get('version') if isinstance(data, dict) else None
+        if version != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 스냅샷 형식입니다: {path} (버전 {version}, 필요: {FORMAT_VERSION})")
+        return cls(**data)
+
+    def install(self):
+        """이 프로세스의 페이지/시세/지수 조회가 번들만 사용하도록 합니다. (네트워크 요청 없음)
+
+        바꾸기 전의 기준 시각/시세 소스/캐시/오프라인 설정은 uninstall()로 되돌립니다.
+        """
+        import http_client
+        import krx_calendar
+        import market_data
+        from run_budget import SourceUnavailable
+
+        def missing(symbol, start, end):
+            raise SourceUnavailable(f"스냅샷에 없는 시세: {symbol}")
+
+        self._previous = (
+            krx_calendar.use_as_of(self.as_of),
+            market_data.use_reader(missing, host='snapshot', clear_caches=False),
+            market_data.use_cache(_RecordingCache(self.prices)),
+            market_data.use_quote_cache(_RecordingCache(self.quotes)),
+            http_client.use_page_cache(_RecordingCache(self.pages)),
+            http_client.use_offline(True),
+        )
+
+    def uninstall(self):
+        """install() 이전 설정을 되돌립니다. (데몬처럼 한 프로세스에서 여러 명령을 실행할 때)"""
+        import http_client
+        import krx_calendar
+        import market_data
+
+        previous = getattr(self, '_previous', None)
+        if previous is None:
+            return
+        as_of, (reader, host), price_cache, quote_cache, page_cache, offline = previous
+        krx_calendar.use_as_of(as_of)
+        market_data.use_reader(reader, host, clear_caches=False)
+        market_data.use_cache(price_cache)
+        market_data.use_quote_cache(quote_cache)
+        http_client.use_page_cache(page_cache)
+        http_client.use_offline(offline)
+        self._previous = None
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.uninstall()
+
+    def summary(self):
+        return (f"거래일 {self.session} (기준 {self.as_of}), 페이지 {len(self.pages)}개, "
+                f"시세 {len(self.prices)}종목, 지수/선물 {len(self.quotes)}개")
+
+
+_DEAL_RANK_CODE = re.compile(r'code=(\d{6})')
+
+
+def _prefetch_prices(code):
+    """종목 시세를 기본 기간(market_data.OHLCV_WINDOW_DAYS)으로 받아 둡니다. 실패하면 예외를 반환합니다."""
+    import krx_calendar
+    from market_data import get_ohlcv, latest_session
+    try:
+        get_ohlcv(code, start=krx_calendar.previous_trading_day(latest_session()))
+    except Exception as e:
+        return e
+    return None
+
+
+def collect_bundle(investors=('foreign', 'institution'), days=2, max_workers=8):
+    """대시보드 수집 경로를 그대로 실행하면서 원본 응답을 기록해 번들을 만듭니다.
+
+    KOSPI/KOSDAQ 두 시장의 순매수 상위 목록, 업종/테마, 지수/선물, 연속 순매수 종목의 상세 페이지가 담기고,
+    순매수 상위 목록에 나온 모든 종목의 시세를 더 받아 두므로 백테스트/등락률 분석도 번들로 할 수 있습니다.
+    days 이상의 연속 순매수 분석은 모두 이 번들로 계산할 수 있습니다.
+    """
+    import http_client
+    import krx_calendar
+    import market_data
+    from unified_dashboard_html import UnifiedStockDashboardHTML
+
+    pages, prices, quotes = _RecordingCache(), _RecordingCache(), _RecordingCache()
+    http_client.use_page_cache(pages)
+    market_data.use_cache(prices)
+    market_data.use_quote_cache(quotes)
+
+    session = market_data.latest_session()
+    for investor in investors:
+        dashboard = UnifiedStockDashboardHTML(investor_type=investor, consecutive_days=days)
+        with stage(f'snapshot.collect.{investor}'), contextlib.redirect_stdout(io.StringIO()):
+            dashboard.collect()
+
+    codes = sorted({code for url, text in pages.items() if 'sise_deal_rank' in url
+                    for code in _DEAL_RANK_CODE.findall(text)} - set(prices))
+    with stage('snapshot.collect.prices'), ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for code, error in zip(codes, pool.map(_prefetch_prices, codes)):
+            if error is not None:
+                logging.error(f"{code} 시세 조회 오류: {error}")
+
+    return SnapshotBundle(
+        session=session.isoformat(),
+        as_of=krx_calendar.now().isoformat(timespec='minutes'),
+        created_at=datetime.now().isoformat(timespec='seconds'),
+        sources={'naver': http_client.NAVER_BASE_URL, 'wisereport': http_client.WISEREPORT_BASE_URL,
+                 'synthetic_market': os.environ.get('KRX_SYNTHETIC_MARKET'),
+                 'investors': list(investors), 'days': days},
+        pages=dict(pages), prices=dict(prices), quotes=dict(quotes),
+    )
+
+
+def use_snapshot(path):
+    """번들을 열어 이 프로세스에 설정하고 반환합니다."""
+    started = time.perf_counter()
+    global _active
+    bundle = SnapshotBundle.load(path)
+    release_snapshot()
+    bundle.install()
+    _active = bundle
+    logging.info(f"스냅샷 사용: {path} - {bundle.summary()} ({(time.perf_counter() - started) * 1000:.0f}ms)")
+    return bundle
+
+
+def release_snapshot():
+    """use_snapshot()으로 설정한 번들을 해제하고 이전 설정을 되돌립니다."""
+    global _active
+    if _active is not None:
+        _active.uninstall()
+        _active = None
+
+
+def add_snapshot_arguments(parser):
+    """진입점 스크립트에 --snapshot 옵션을 추가합니다."""
+    parser.add_argument('--snapshot', type=str, metavar='PATH',
+                        help="수집해 둔 스냅샷 번들로 실행 (네트워크 요청 없음, snapshot_bundle.py collect로 생성)")
+
+
+def use_snapshot_from_args(args):
+    """--snapshot이 지정되었으면 번들을 설정합니다."""
+    if args.snapshot:
+        return use_snapshot(args.snapshot)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="거래일 스냅샷 번들 수집/조회")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    collect = subparsers.add_parser('collect', help="시장 데이터를 수집해 번들 생성")
+    collect.add_argument('--out', type=str, help=f"번들 파일 경로 (기본값: {DEFAULT_DIR}/krx-<거래일>.pkl.gz)")
+    collect.add_argument('--investors', type=str, nargs='+', default=['foreign', 'institution'],
+                         choices=['foreign', 'institution'], help="수집할 투자자 종류 (기본값: foreign institution)")
+    collect.add_argument('--days', type=int, default=2,
+                         help="연속 순매수 분석 최소 일수 (이 일수 이상의 분석을 번들로 할 수 있습니다, 기본값: 2)")
+    add_profile_arguments(collect)
+
+    info = subparsers.add_parser('info', help="번들 내용 요약 출력")
+    info.add_argument('--path', type=str, required=True, help="번들 파일 경로")
+
+    args = parser.parse_args()
+    if args.command == 'info':
+        bundle = use_snapshot(args.path)
+        print(f"{args.path}: {bundle.summary()}")
+        print(f"  생성: {bundle.created_at}, 형식 버전 {bundle.version}, 소스 {bundle.sources}")
+        return
+
+    configure_from_args(args)
+    bundle = collect_bundle(args.investors, args.days)
+    path = args.out or os.path.join(DEFAULT_DIR, f"krx-{bundle.session}.pkl.gz")
+    with stage('snapshot.save'):
+        size = bundle.save(path)
+    print(f"✓ 스냅샷 저장: {path} ({size / 1024:.0f} KiB) - {bundle.summary()}")
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+종목 레코드 타입
+스크리너/대시보드 전 단계에서 공유하는 __slots__ 기반 경량 레코드입니다.
+딕셔너리 대비 인스턴스당 메모리가 작고 속성 접근이 빠르며,
+CSV/HTML 출력용 한글 컬럼 딕셔너리는 to_row()로 변환합니다.
+"""
+
+from dataclasses import dataclass
+
+
+# CSV 출력 컬럼 순서 (기존 analysis_result.csv 형식과 동일)
+RESULT_COLUMNS = ["종목명", "코드", "종합 점수", "현재가", "등락률", "52주 신고가",
+                  "PER", "PBR", "ROE", "외국인보유율", "필터"]
+
+
+@dataclass(slots=True, frozen=True)
+class StockRef:
+    """순매수 상위 리스트 등에서 얻은 종목명/코드 쌍"""
+    name: str
+    code: str
+
+
+@dataclass(slots=True)
+class StockResult:
+    """연속 순매수 종목의 펀더멘탈 분석 결과"""
+    name: str
+    code: str
+    score: int
+    price: int
+    change_rate: float
+    high_52w: int
+    per: float = None
+    pbr: float = None
+    roe: float = None
+    foreign_ratio: float = None
+    filters: str = ''
+
+    @property
+    def price_ratio(self):
+        """현재가 / 52주 신고가"""
+        return self.price / self.high_52w
+
+    def to_row(self):
+        """기존 한글 키 딕셔너리 형식으로 변환합니다."""
+        return {
+            "종목명": self.name, "코드": self.code, "종합 점수": self.score,
+            "현재가": self.price, "등락률": self.change_rate, "52주 신고가": self.high_52w,
+            "PER": self.per, "PBR": self.pbr, "ROE": self.roe, "외국인보유율": self.foreign_ratio,
+            "필터": self.filters,
+        }
+
+
+def sort_by_score(results):
+    """종합 점수 내림차순으로 정렬합니다. (동점은 기존 순서 유지)"""
+    return sorted(results, key=lambda r: r.score, reverse=True)
+
+
+def results_to_frame(results):
+    """분석 결과 리스트를 CSV 저장용 DataFrame으로 변환합니다."""
+    import pandas as pd
+
+    return pd.DataFrame([r.to_row() for r in results], columns=RESULT_COLUMNS)
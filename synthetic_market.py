@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+합성 KRX 시장 데이터 생성기
+실제 사이트에 요청하지 않고 스크리너/백테스트를 부하 테스트할 수 있도록,
+시드 고정(결정적) 방식으로 다음 데이터를 만듭니다.
+
+- 종목별 OHLCV (FinanceDataReader.DataReader와 같은 컬럼/인덱스)
+- 순매수 상위 페이지 (sise_deal_rank_iframe.naver, box_type_ms 레이아웃)
+- 종목 상세 페이지 (item/main.naver: PER/PBR/외국인소진율/ROE)
+- 종목별 외국인/기관 일별 순매매 페이지 (item/frgn.naver, 20일씩 페이지 나눔)
+- 업종/테마 시세 페이지, 상승률 페이지 (sise_group.naver, theme.naver, sise_rise.naver)
+- 업종/테마 구성 종목 페이지 (sise_group_detail.naver)
+- wisereport 영업이익 순위 표 (mktExcel.aspx)
+- 장중 실시간 시세 (Naver polling API 형식 JSON, /api/realtime)
+
+사용 예:
+    python synthetic_market.py --tickers 2500 --years 10 --seed 42 --out fixtures/
+"""
+
+import argparse
+import json
+import os
+import time
+import zlib
+from datetime import datetime
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+import pandas as pd
+
+import krx_calendar
+from stock_records import StockRef
+
+NAME_PREFIXES = ['한국', '대한', '동양', '서울', '미래', '제일', '신성', '태평양', '우리', '세아',
+                 '동방', '한일', '대성', '삼화', '고려', '광명', '극동', '남해', '부산', '중앙']
+NAME_SUFFIXES = ['전자', '화학', '바이오', '건설', '제약', '금융', '산업', '에너지', '소재', '시스템',
+                 '반도체', '통신', '식품', '중공업', '물산', '로직스', '게임즈', '엔터', '테크', '홀딩스']
+SECTOR_NAMES = ['반도체와반도체장비', '제약', '화학', '자동차', '은행', '증권', '건설', '철강',
+                '디스플레이장비및부품', '소프트웨어', '게임엔터테인먼트', '식품', '조선', '항공사',
+                '전기제품', '생물공학', '통신장비', '에너지장비및서비스', '기계', '섬유,의류,신발,호화품']
+THEME_WORDS = ['2차전지', 'AI', '로봇', '원자력', '수소', '방산', '우주항공', '바이오시밀러', '메타버스',
+               '자율주행', '전기차', '클라우드', '5G', '탄소중립', '희토류', '비만치료제', '초전도체',
+               'K-뷰티', '반도체 소부장', '리튬']
+
+DEFAULT_END_DATE = '2026-10-16'
+
+
+def tick_size(prices):
+    """KRX 호가가격단위 (2023년 개편 기준)를 배열로 반환합니다."""
+    prices = np.asarray(prices, dtype=np.float64)
+    return np.select(
+        [prices < 2000, prices < 5000, prices < 20000, prices < 50000, prices < 200000, prices < 500000],
+        [1, 5, 10, 50, 100, 500],
+        default=1000,
+    )
+
+
+def round_to_tick(prices):
+    """가격을 호가가격단위에 맞춰 반올림합니다."""
+    ticks = tick_size(prices)
+    return np.maximum(np.round(prices / ticks) * ticks, ticks)
+
+
+class SyntheticMarket:
+    """결정적 합성 KRX 시장"""
+
+    def __init__(self, n_tickers=2500, years=10, seed=42, end_date=DEFAULT_END_DATE,
+                 deal_rank_size=30, deal_rank_boxes=5, kospi_ratio=0.4, realtime_speed=1.0):
+        self.n_tickers = n_tickers
+        self.realtime_speed = realtime_speed
+        self.years = years
+        self.seed = seed
+        self.deal_rank_size = deal_rank_size
+        self.deal_rank_boxes = deal_rank_boxes
+        self.dates = pd.DatetimeIndex(krx_calendar.trading_days(end=end_date, periods=max(2, int(years * 248))))
+
+        rng = self._rng('universe')
+        self.codes = [f"{i + 1:06d}" for i in range(n_tickers)]
+        self.names = [self._make_name(i) for i in range(n_tickers)]
+        self.markets = np.where(rng.random(n_tickers) < kospi_ratio, 'kospi', 'kosdaq')
+        self.sector_of = rng.integers(0, len(SECTOR_NAMES), n_tickers)
+
+        # 종목당 0~3개 테마 (중복은 제거)
+        n_themes = max(len(THEME_WORDS), n_tickers // 25)
+        self.theme_names = [THEME_WORDS[i % len(THEME_WORDS)] + (f" {i // len(THEME_WORDS)}" if i >= len(THEME_WORDS) else '')
+                            for i in range(n_themes)]
+        self._theme_ids = rng.integers(0, n_themes, (n_tickers, 3))
+        self._theme_counts = rng.integers(0, 4, n_tickers)
+
+        self._index_of = {code: i for i, code in enumerate(self.codes)}
+        self._market_codes = {}
+
+    # ---------- 난수 ----------
+    def _rng(self, *keys):
+        """시드와 키 조합으로 독립적인 난수 생성기를 만듭니다."""
+        salt = [zlib.crc32(str(k).encode()) for k in keys]
+        return np.random.default_rng([self.seed, *salt])
+
+    # ---------- 종목 ----------
+    @staticmethod
+    def _make_name(i):
+        base = len(NAME_PREFIXES) * len(NAME_SUFFIXES)
+        name = NAME_PREFIXES[i % len(NAME_PREFIXES)] + NAME_SUFFIXES[(i // len(NAME_PREFIXES)) % len(NAME_SUFFIXES)]
+        return name + (str(i // base) if i >= base else '')
+
+    @property
+    def tickers(self):
+        return [StockRef(name, code) for name, code in zip(self.names, self.codes)]
+
+    def market_codes(self, market):
+        """시장(kospi/kosdaq)에 속한 종목 코드 목록"""
+        if market not in self._market_codes:
+            self._market_codes[market] = [code for code, m in zip(self.codes, self.markets) if m == market]
+        return self._market_codes[market]
+
+    def name_of(self, code):
+        index = self._index_of.get(code)
+        return self.names[index] if index is not None else code
+
+    def themes_of(self, index):
+        """종목 인덱스가 속한 테마 번호 목록"""
+        return sorted(set(self._theme_ids[index, :self._theme_counts[index]].tolist()))
+
+    def theme_members(self):
+        """테마 번호 -> 종목 인덱스 목록"""
+        members = {}
+        for index in range(self.n_tickers):
+            for theme in self.themes_of(index):
+                members.setdefault(theme, []).append(index)
+        return members
+
+    # ---------- 시세 ----------
+    def _arrays(self, symbol):
+        """종목(또는 지수)의 전체 기간 OHLCV 배열을 생성합니다."""
+        rng = self._rng('ohlcv', symbol)
+        n = len(self.dates)
+        is_index = not symbol.isdigit()
+        start_price = 2500.0 if is_index else float(np.exp(rng.uniform(np.log(1500), np.log(400000))))
+        vol = 0.011 if is_index else rng.uniform(0.012, 0.035)
+        drift = rng.normal(0.0002, 0.0004)
+        returns = rng.normal(drift, vol, n)
+        # 가끔 발생하는 급등락
+        jumps = rng.random(n) < 0.004
+        returns[jumps] += rng.normal(0, vol * 6, jumps.sum())
+        returns = np.clip(returns, -0.29, 0.29)
+        close = start_price * np.exp(np.cumsum(returns))
+        prev_close = np.concatenate([[start_price], close[:-1]])
+        open_ = prev_close * (1 + rng.normal(0, vol / 3, n))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n)))
+        if is_index:
+            close, open_, high, low = (np.round(a, 2) for a in (close, open_, high, low))
+        else:
+            close, open_, high, low = (round_to_tick(a) for a in (close, open_, high, low))
+        volume = np.round(np.exp(rng.normal(np.log(200000), 1.0, n)) * (1 + 5 * np.abs(returns)))
+        return open_, high, low, close, volume
+
+    def ohlcv(self, symbol, start=None, end=None):
+        """FinanceDataReader.DataReader 형식의 DataFrame (Open/High/Low/Close/Volume/Change)"""
+        open_, high, low, close, volume = self._arrays(symbol)
+        df = pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+                          index=self.dates.rename('Date'))
+        if not symbol.isdigit():
+            df[['Open', 'High', 'Low', 'Close']] = df[['Open', 'High', 'Low', 'Close']].astype(float)
+        else:
+            df = df.astype({'Open': 'int64', 'High': 'int64', 'Low': 'int64', 'Close': 'int64', 'Volume': 'int64'})
+        df['Change'] = df['Close'].pct_change().fillna(0.0)
+        if start is not None or end is not None:
+            df = df.loc[pd.Timestamp(start) if start is not None else None:pd.Timestamp(end) if end is not None else None]
+        return df
+
+    def data_reader(self, symbol, start=None, end=None, *args, **kwargs):
+        """fdr.DataReader(symbol, start, end)와 같은 시그니처의 시세 조회 함수"""
+        return self.ohlcv(symbol, start, end)
+
+    def panel(self, field='Close', codes=None):
+        """날짜 × 종목 가격 패널 (DataFrame)"""
+        codes = codes or self.codes
+        column = ['Open', 'High', 'Low', 'Close', 'Volume'].index(field)
+        data = np.column_stack([self._arrays(code)[column] for code in codes])
+        return pd.DataFrame(data, index=self.dates.rename('Date'), columns=codes)
+
+    # ---------- 펀더멘탈 ----------
+    def fundamentals(self, code):
+        """(PER, PBR, ROE, 외국인소진율) - 일부는 None(N/A)"""
+        rng = self._rng('fundamentals', code)
+        per = round(float(rng.lognormal(np.log(12), 0.6)), 2) if rng.random() > 0.1 else None
+        pbr = round(float(rng.lognormal(np.log(1.1), 0.5)), 2) if rng.random() > 0.05 else None
+        roe = round(float(rng.normal(8, 9)), 2) if rng.random() > 0.1 else None
+        foreign_ratio = round(float(rng.uniform(0, 60)), 2)
+        return per, pbr, roe, foreign_ratio
+
+    # ---------- 순매수 상위 ----------
+    def deal_rank(self, market='kospi', investor='foreign'):
+        """최근 거래일부터 과거 순으로 box 별 순매수 상위 종목 코드 리스트"""
+        rng = self._rng('deal_rank', market, investor)
+        universe = self.market_codes(market) or self.codes
+        size = min(self.deal_rank_size, len(universe))
+        boxes = []
+        previous = list(rng.choice(universe, size=size, replace=False))
+        # 과거 -> 최근 순으로 생성하면서 절반 정도를 다음 날로 이월해 연속 순매수 종목을 만듭니다.
+        for _ in range(self.deal_rank_boxes):
+            carried = [c for c in previous if rng.random() < 0.5]
+            fresh = [c for c in rng.choice(universe, size=min(len(universe), size * 2), replace=False) if c not in carried]
+            today = (carried + fresh)[:size]
+            rng.shuffle(today)
+            boxes.append(list(today))
+            previous = today
+        return boxes[::-1]
+
+    def deal_rank_html(self, market='kospi', investor='foreign'):
+        investor_kr = '외국인' if investor == 'foreign' else '기관'
+        parts = ['<html><head><meta charset="euc-kr"></head><body>']
+        for box_index, codes in enumerate(self.deal_rank(market, investor)):
+            date = self.dates[-1 - box_index].strftime('%Y.%m.%d')
+            parts.append('<div class="box_type_ms">')
+            parts.append(f'<div class="box_type_head"><h4>{investor_kr} 순매수 {date}</h4></div>')
+            parts.append('<table class="type_ms"><tr><th>종목명</th><th>수량</th><th>금액</th><th>당일거래량</th></tr>')
+            rng = self._rng('deal_amount', market, investor, box_index)
+            for code in codes:
+                qty = int(rng.integers(10, 5000))
+                parts.append(
+                    f'<tr><td><p class="tit"><a href="/item/main.naver?code={code}" class="tltle">{self.name_of(code)}</a></p></td>'
+                    f'<td class="number">{qty:,}</td><td class="number">{qty * 7:,}</td><td class="number">{qty * 40:,}</td></tr>'
+                )
+            parts.append('</table></div>')
+        parts.append('</body></html>')
+        return ''.join(parts)
+
+    # ---------- 종목 상세 ----------
+    def item_main_html(self, code):
+        per, pbr, roe, foreign_ratio = self.fundamentals(code)
+        fmt = lambda v: '' if v is None else f"{v:.2f}"
+        roe_cells = ''.join(f'<td>{fmt(None if roe is None else roe + d)}</td>' for d in (-2.1, -0.7, 0.4))
+        roe_cells += f'<td>{fmt(roe)}</td>'
+        return (
+            '<html><head><meta charset="euc-kr"></head><body>'
+            f'<div class="wrap_company"><h2><a href="#">{self.name_of(code)}</a></h2><span class="code">{code}</span></div>'
+            '<table class="per_table">'
+            f'<tr><th>PER</th><td><em id="_per">{fmt(per) or "N/A"}</em>배</td></tr>'
+            f'<tr><th>PBR</th><td><em id="_pbr">{fmt(pbr) or "N/A"}</em>배</td></tr>'
+            '</table>'
+            f'<table class="lwidth"><tr><th scope="row">외국인소진율(B/A)</th><td><em>{foreign_ratio:.2f}%</em></td></tr></table>'
+            '<div class="section cop_analysis"><table class="tb_type1 tb_num">'
+            '<tr><th>주요재무정보</th><td>2023.12</td><td>2024.12</td><td>2025.12</td><td>2026.06</td></tr>'
+            f'<tr><th scope="row">ROE(지배주주)</th>{roe_cells}</tr>'
+            '</table></div></body></html>'
+        )
+
+    # ---------- 투자자별 순매매 ----------
+    FLOW_PAGE_SIZE = 20
+
+    def investor_flows(self, code):
+        """(기관 순매매량, 외국인 순매매량, 외국인 보유주수, 외국인 보유율(%)) 일별 배열"""
+        _, _, _, close, volume = self._arrays(code)
+        rng = self._rng('flows', code)
+        n = len(self.dates)
+        shares = float(np.round(np.exp(rng.uniform(np.log(5e6), np.log(6e8)))))
+        # 수급은 며칠씩 이어지도록 AR(1) 잡음으로 만듭니다.
+        noise = rng.normal(0, 1, (2, n))
+        for t in range(1, n):
+            noise[:, t] += 0.6 * noise[:, t - 1]
+        inst = np.round(noise[0] * volume * 0.04)
+        foreign = np.round(noise[1] * volume * 0.05)
+        base = shares * self.fundamentals(code)[3] / 100
+        held = np.clip(base + np.cumsum(foreign) - foreign.sum() / 2, 0, shares)
+        return inst, foreign, held, np.round(held / shares * 100, 2)
+
+    def item_frgn_html(self, code, page=1):
+        """종목별 외국인/기관 순매매 페이지 (item/frgn.naver, 최근 거래일부터 20일씩)"""
+        _, _, _, close, volume = self._arrays(code)
+        inst, foreign, held, ratio = self.investor_flows(code)
+        n = len(self.dates)
+        last_page = max(1, -(-n // self.FLOW_PAGE_SIZE))
+        page = min(max(int(page), 1), last_page)
+        signed = lambda v: f"{v:+,.0f}" if v else "0"
+        rows = []
+        for i in range(n - 1 - (page - 1) * self.FLOW_PAGE_SIZE, max(n - 1 - page * self.FLOW_PAGE_SIZE, -1), -1):
+            prev = close[i - 1] if i > 0 else close[i]
+            rows.append(
+                f'<tr onmouseover="mouseOver(this)"><td class="tc"><span class="tah p10 gray03">{self.dates[i]:%Y.%m.%d}</span></td>'
+                f'<td class="num"><span class="tah p11">{close[i]:,.0f}</span></td>'
+                f'<td class="num"><span class="tah p11">{abs(close[i] - prev):,.0f}</span></td>'
+                f'<td class="num"><span class="tah p11">{(close[i] / prev - 1) * 100:+.2f}%</span></td>'
+                f'<td class="num"><span class="tah p11">{volume[i]:,.0f}</span></td>'
+                f'<td class="num"><span class="tah p11">{signed(inst[i])}</span></td>'
+                f'<td class="num"><span class="tah p11">{signed(foreign[i])}</span></td>'
+                f'<td class="num"><span class="tah p11">{held[i]:,.0f}</span></td>'
+                f'<td class="num"><span class="tah p11">{ratio[i]:.2f}%</span></td></tr>'
+            )
+        return (
+            '<html><head><meta charset="euc-kr"></head><body>'
+            '<table summary="외국인 기관 순매매 거래량에 관한표" class="type2">'
+            '<tr><th>날짜</th><th>종가</th><th>전일비</th><th>등락률</th><th>거래량</th>'
+            '<th>기관 순매매량</th><th>외국인 순매매량</th><th>보유주수</th><th>보유율</th></tr>'
+            + ''.join(rows) + '</table>'
+            f'<table class="Nnavi"><tr><td class="on"><a href="/item/frgn.naver?code={code}&page={page}">{page}</a></td>'
+            f'<td class="pgRR"><a href="/item/frgn.naver?code={code}&page={last_page}">맨뒤</a></td></tr></table>'
+            '</body></html>'
+        )
+
+    # ---------- 업종 / 테마 ----------
+    def _group_changes(self, kind, count):
+        rng = self._rng('group', kind)
+        return np.round(rng.normal(0.1, 1.6, count), 2)
+
+    def sector_group_html(self):
+        changes = self._group_changes('upjong', len(SECTOR_NAMES))
+        counts = np.bincount(self.sector_of, minlength=len(SECTOR_NAMES))
+        rng = self._rng('sector_counts')
+        rows = []
+        for no, (name, change, total) in enumerate(zip(SECTOR_NAMES, changes, counts), 1):
+            up = int(rng.binomial(total, min(0.95, max(0.05, 0.5 + change / 5))))
+            flat = int(rng.binomial(total - up, 0.1))
+            down = int(total - up - flat)
+            rows.append(
+                f'<tr><td><a href="/sise/sise_group_detail.naver?type=upjong&no={no}">{name}</a></td>'
+                f'<td class="number">{change:+.2f}%</td><td class="number">{total}</td>'
+                f'<td class="number">{up}</td><td class="number">{flat}</td><td class="number">{down}</td>'
+                '<td class="graph"></td></tr>'
+            )
+        return ('<html><body><table class="type_1">'
+                '<tr><th>업종명</th><th>전일대비</th><th>전체</th><th>상승</th><th>보합</th><th>하락</th><th>등락그래프</th></tr>'
+                + ''.join(rows) + '</table></body></html>')
+
+    THEMES_PER_PAGE = 40
+
+    def theme_html(self, page=1):
+        changes = self._group_changes('theme', len(self.theme_names))
+        members = self.theme_members()
+        rows = []
+        last_page = max(1, -(-len(self.theme_names) // self.THEMES_PER_PAGE))
+        page = min(max(1, int(page)), last_page)
+        for no, (name, change) in enumerate(zip(self.theme_names, changes), 1):
+            if (no - 1) // self.THEMES_PER_PAGE != page - 1:
+                continue
+            rng = self._rng('theme_counts', no)
+            total = len(members.get(no - 1, []))
+            up = int(rng.binomial(total, min(0.95, max(0.05, 0.5 + change / 5))))
+            flat = int(rng.binomial(total - up, 0.1))
+            leaders = [self.names[i] for i in members.get(no - 1, [])[:2]] + ['', '']
+            rows.append(
+                f'<tr><td class="col_type1"><a href="/sise/sise_group_detail.naver?type=theme&no={no}">{name}</a></td>'
+                f'<td class="number col_type2">{change:+.2f}%</td><td class="number col_type3">{change * 1.7:+.2f}%</td>'
+                f'<td class="number col_type4">{up}</td><td class="number col_type5">{flat}</td>'
+                f'<td class="number col_type6">{total - up - flat}</td>'
+                f'<td class="ls col_type7">{leaders[0]}</td><td class="ls col_type8">{leaders[1]}</td></tr>'
+            )
+        pager = (f'<table class="Nnavi"><tr><td class="on"><a href="/sise/theme.naver?&page={page}">{page}</a></td>'
+                 f'<td class="pgRR"><a href="/sise/theme.naver?&page={last_page}">맨뒤</a></td></tr></table>')
+        return ('<html><body><table class="type_1 theme">'
+                '<tr><th>테마명</th><th>전일대비</th><th>최근3일등락률</th><th>상승</th><th>보합</th><th>하락</th>'
+                '<th>주도주</th><th>주도주</th></tr>' + ''.join(rows) + '</table>' + pager + '</body></html>')
+
+    def group_detail_html(self, kind, no):
+        """업종/테마 상세 페이지 (sise_group_detail.naver, type_5 구성 종목 표)"""
+        no = int(no)
+        if kind == 'theme':
+            members = self.theme_members().get(no - 1, [])
+        else:
+            members = np.flatnonzero(self.sector_of == no - 1).tolist()
+        rows = []
+        for index in members:
+            code = self.codes[index]
+            close = self._arrays(code)[3]
+            change = (close[-1] / close[-2] - 1) * 100
+            rows.append(
+                f'<tr><td class="name"><div class="name_area"><a href="/item/main.naver?code={code}">{self.names[index]}</a></div></td>'
+                f'<td class="number">{int(close[-1]):,}</td><td class="number">{change:+.2f}%</td></tr>'
+            )
+        return ('<html><body><table class="type_5">'
+                '<tr><th>종목명</th><th>현재가</th><th>등락률</th></tr>' + ''.join(rows) + '</table></body></html>')
+
+    def rise_html(self, sosok='0'):
+        market = 'kosdaq' if str(sosok) == '1' else 'kospi'
+        codes = self.market_codes(market)[:200]
+        rows = []
+        for n, code in enumerate(codes, 1):
+            _, _, _, closes, volumes = self._arrays(code)
+            close, prev, volume = closes[-1], closes[-2], volumes[-1]
+            per, _, roe, _ = self.fundamentals(code)
+            rows.append(
+                f'<tr><td class="no">{n}</td><td><a href="/item/main.naver?code={code}" class="tltle">{self.name_of(code)}</a></td>'
+                f'<td class="number">{int(close):,}</td><td class="number">{int(abs(close - prev)):,}</td>'
+                f'<td class="number">{(close / prev - 1) * 100:+.2f}%</td><td class="number">{int(volume):,}</td>'
+                f'<td class="number">{int(close):,}</td><td class="number">{int(close):,}</td>'
+                f'<td class="number">{int(volume) // 10:,}</td><td class="number">{int(volume) // 12:,}</td>'
+                f'<td class="number">{"" if per is None else f"{per:.2f}"}</td>'
+                f'<td class="number">{"" if roe is None else f"{roe:.2f}"}</td></tr>'
+            )
+        return ('<html><body><table class="type_2">'
+                '<tr><th>N</th><th>종목명</th><th>현재가</th><th>전일비</th><th>등락률</th><th>거래량</th>'
+                '<th>매수호가</th><th>매도호가</th><th>매수총잔량</th><th>매도총잔량</th><th>PER</th><th>ROE</th></tr>'
+                + ''.join(rows) + '</table></body></html>')
+
+    # ---------- wisereport ----------
+    def wisereport_excel_html(self, sec_cd='IKS001'):
+        market = 'kosdaq' if sec_cd == 'IKQ001' else 'kospi'
+        codes = self.market_codes(market)
+        header = ['순위', '기업명', '결산년월', '매출액', '영업이익', '당기순이익', '자산총계', '주재무제표']
+        rows = [''.join(f'<td>{h}</td>' for h in header),
+                ''.join(f'<td>{u}</td>' for u in ['', '', '', '(억원)', '(억원)', '(억원)', '(억원)', ''])]
+        for rank, code in enumerate(codes, 1):
+            rng = self._rng('financials', code)
+            sales = int(rng.lognormal(np.log(5000), 1.4))
+            op = int(sales * rng.normal(0.07, 0.06))
+            net = int(op * rng.uniform(0.5, 0.9))
+            assets = int(sales * rng.uniform(0.8, 3))
+            cells = [rank, f"{self.name_of(code)}[{code}]", '2025/12', sales, op, net, assets, rng.choice(['연결', '별도'])]
+            rows.append(''.join(f'<td>{c}</td>' for c in cells))
+        stub = '<table><tr><td>wisereport</td></tr></table>'
+        return ('<html><body>' + stub + stub + '<table>'
+                + ''.join(f'<tr>{r}</tr>' for r in rows) + '</table></body></html>')
+
+    # ---------- 장중 시세 ----------
+    SESSION_MINUTES = 390  # 09:00 ~ 15:30
+
+    def session_minute(self):
+        """합성 장중 시각(09:00부터 경과 분). 벽시계 1분마다 realtime_speed 분씩 진행하며 장 마감 후 처음으로 돌아갑니다."""
+        return int(time.time() / 60 * self.realtime_speed) % (self.SESSION_MINUTES + 1)
+
+    def intraday_quote(self, code, minute):
+        """마지막 거래일 다음 세션의 minute 시점 시세 (price, open, high, low, 누적 거래량, 누적 거래대금, 전일 종가)"""
+        open_, high, low, close, volume = self._arrays(code)
+        prev_close, avg_volume = float(close[-1]), float(volume[-20:].mean())
+        resistance = float(high[-50:].max())
+        rng = self._rng('intraday', code)
+        steps = rng.normal(0, 0.0012, self.SESSION_MINUTES + 1)
+        steps[0] = rng.normal(0, 0.006)
+        # 약 8% 종목은 장중 한 시점에 50일 고점 부근까지 상승합니다. (돌파 감시 부하 테스트용)
+        if rng.random() < 0.08:
+            at = int(rng.integers(30, self.SESSION_MINUTES - 30))
+            steps[at] += max(0.0, np.log(resistance * rng.uniform(0.99, 1.05) / prev_close) - steps[:at].sum())
+        path = round_to_tick(prev_close * np.exp(np.cumsum(steps[:minute + 1])))
+        fraction = (minute + 1) / (self.SESSION_MINUTES + 1)
+        acc_volume = int(avg_volume * fraction * rng.uniform(0.5, 3.0))
+        price = float(path[-1])
+        return price, float(path[0]), float(path.max()), float(path.min()), acc_volume, int(acc_volume * path.mean()), prev_close
+
+    def realtime_json(self, query, minute=None):
+        """Naver polling API(/api/realtime?query=SERVICE_ITEM:코드,...|SERVICE_INDEX:KOSPI) 형식의 JSON"""
+        minute = self.session_minute() if minute is None else minute
+        areas = []
+        for part in query.split('|'):
+            service, _, codes = part.partition(':')
+            datas = []
+            for code in filter(None, codes.split(',')):
+                if service == 'SERVICE_INDEX':
+                    index_close = self._arrays('KS11' if code == 'KOSPI' else 'KQ11')[3]
+                    rate = float(self._rng('intraday', code, minute).normal(0, 0.6))
+                    value = float(index_close[-1]) * (1 + rate / 100)
+                    datas.append({'cd': code, 'nv': int(value * 100), 'cv': int((value - index_close[-1]) * 100),
+                                  'cr': round(rate, 2)})
+                elif code in self._index_of:
+                    price, open_, high, low, acc_volume, acc_value, prev_close = self.intraday_quote(code, minute)
+                    datas.append({'cd': code, 'nm': self.name_of(code), 'nv': int(price), 'sv': int(prev_close),
+                                  'pcv': int(prev_close), 'cv': int(price - prev_close),
+                                  'cr': round((price / prev_close - 1) * 100, 2), 'ov': int(open_),
+                                  'hv': int(high), 'lv': int(low), 'aq': acc_volume, 'aa': acc_value, 'ms': 'OPEN'})
+            areas.append({'name': service, 'datas': datas})
+        return json.dumps({'resultCode': 'success', 'result': {'pollingInterval': 60000, 'areas': areas}},
+                          ensure_ascii=False)
+
+    # ---------- URL 라우팅 ----------
+    def page(self, url):
+        """Naver/wisereport URL에 해당하는 합성 HTML을 반환합니다. 알 수 없는 경로면 None."""
+        parsed = urlparse(url)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        path = parsed.path
+        if path.endswith('/sise/sise_deal_rank_iframe.naver'):
+            market = 'kosdaq' if query.get('sosok') == '02' else 'kospi'
+            investor = 'institution' if query.get('investor_gubun') == '1000' else 'foreign'
+            return self.deal_rank_html(market, investor)
+        if path.endswith('/item/main.naver'):
+            return self.item_main_html(query.get('code', '000001'))
+        if path.endswith('/item/frgn.naver'):
+            return self.item_frgn_html(query.get('code', '000001'), query.get('page', 1))
+        if path.endswith('/sise/sise_group.naver'):
+            return self.sector_group_html()
+        if path.endswith('/sise/theme.naver'):
+            return self.theme_html(query.get('page', 1))
+        if path.endswith('/sise/sise_group_detail.naver'):
+            return self.group_detail_html(query.get('type', 'upjong'), query.get('no', 1))
+        if path.endswith('/sise/sise_rise.naver'):
+            return self.rise_html(query.get('sosok', '0'))
+        if path.endswith('/ranking/mktExcel.aspx'):
+            return self.wisereport_excel_html(query.get('sec_cd', 'IKS001'))
+        if path.endswith('/api/realtime'):
+            return self.realtime_json(query.get('query', ''))
+        return None
+
+    # ---------- 픽스처 저장 ----------
+    def write_fixtures(self, out_dir, price_codes=None):
+        """대표 페이지와 시세 CSV를 디렉터리에 저장합니다."""
+        os.makedirs(os.path.join(out_dir, 'prices'), exist_ok=True)
+        pages = {
+            'sise_group_upjong.html': self.sector_group_html(),
+            'theme.html': self.theme_html(),
+            'sise_rise_0.html': self.rise_html('0'),
+            'sise_rise_1.html': self.rise_html('1'),
+            'mktExcel_IKS001.html': self.wisereport_excel_html('IKS001'),
+        }
+        for market in ('kospi', 'kosdaq'):
+            for investor in ('foreign', 'institution'):
+                pages[f'deal_rank_{market}_{investor}.html'] = self.deal_rank_html(market, investor)
+        for name, html in pages.items():
+            with open(os.path.join(out_dir, name), 'w', encoding='utf-8') as f:
+                f.write(html)
+        for code in price_codes if price_codes is not None else self.codes:
+            self.ohlcv(code).to_csv(os.path.join(out_dir, 'prices', f'{code}.csv'))
+        return len(pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 KRX 시장 데이터 생성")
+    parser.add_argument('--tickers', type=int, default=2500, help="종목 수 (기본값: 2500)")
+    parser.add_argument('--years', type=float, default=10, help="시세 기간(년) (기본값: 10)")
+    parser.add_argument('--seed', type=int, default=42, help="난수 시드 (기본값: 42)")
+    parser.add_argument('--out', type=str, default='fixtures', help="출력 디렉터리 (기본값: fixtures)")
+    parser.add_argument('--price-limit', type=int, default=None, help="시세 CSV를 저장할 최대 종목 수")
+    args = parser.parse_args()
+
+    started = datetime.now()
+    market = SyntheticMarket(n_tickers=args.tickers, years=args.years, seed=args.seed)
+    codes = market.codes[:args.price_limit] if args.price_limit else market.codes
+    page_count = market.write_fixtures(args.out, price_codes=codes)
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"합성 데이터 생성 완료: 페이지 {page_count}개, 시세 {len(codes):,}종목 × {len(market.dates):,}일 -> {args.out} ({elapsed:.1f}초)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+스레드 안전 TTL 캐시와 중복 호출 합치기(single-flight)
+상주 프로세스(daemon.py)에서 페이지 본문, 시세, 스냅샷을 메모리에 유지할 때 사용합니다.
+SingleFlight는 같은 키의 동시 조회를 진행 중인 한 번의 호출로 합칩니다.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class TTLCache:
+    """만료 시간(초)과 최대 항목 수를 가진 LRU 캐시"""
+
+    def __init__(self, ttl, max_entries=10000, name='cache'):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """만료되지 않은 값을 반환합니다. 없으면 default를 반환합니다."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        """값을 저장합니다. ttl을 지정하면 기본 만료 시간 대신 사용합니다."""
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, compute, ttl=None):
+        """캐시에 없으면 compute()로 값을 만들어 저장한 뒤 반환합니다."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(key, value, ttl)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'name': self.name,
+            'entries': len(self._data),
+            'ttl_s': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else None,
+        }
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 호출을 하나로 합칩니다.
+
+    진행 중인 호출이 있으면 새로 호출하지 않고 그 결과(또는 예외)를 함께 받습니다.
+    완료된 결과는 보관하지 않으므로 반복 호출 재사용은 캐시와 함께 사용합니다.
+    """
+
+    def __init__(self, name='flights'):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, compute):
+        """key의 진행 중인 호출을 기다리거나, 없으면 compute()를 실행해 결과를 반환합니다."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+        try:
+            value = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def stats(self):
+        return {'name': self.name, 'in_flight': len(self._calls), 'calls': self.calls, 'shared': self.shared}
@@ -5,16 +5,23 @@
 모든 시장 정보와 수급 분석 결과를 한 화면에 표시합니다.
 """
 
-import requests
-from bs4 import BeautifulSoup
 import re
 import pandas as pd
-import FinanceDataReader as fdr
-import yfinance as yf
 from datetime import datetime, timedelta
 import argparse
 import logging
 
+from http_client import NAVER_BASE_URL, fetch_soup
+import krx_calendar
+from market_data import latest_session, get_session_change, get_index_quotes, KRX_INDICES, FUTURES_INDICES
+from profiling import stage, profiler, add_profile_arguments, configure_from_args
+from snapshot_bundle import add_snapshot_arguments, use_snapshot_from_args
+from run_budget import budget, add_budget_arguments, configure_budget_from_args
+from stock_records import StockRef, StockResult, sort_by_score
+from scoring_rules import RuleSet, add_rules_arguments
+from rank_history import DealRankStore, parse_deal_rank_boxes
+from high_low_index import load_levels, quote_52w
+
 # 로깅 설정
 logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -22,12 +29,14 @@ logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s -
 class UnifiedStockDashboard:
     """통합 주식 정보 대시보드"""
 
-    BASE_URL = "https://finance.naver.com"
+    BASE_URL = NAVER_BASE_URL
 
-    def __init__(self, market='kospi', investor_type='foreign', consecutive_days=2):
+    def __init__(self, market='kospi', investor_type='foreign', consecutive_days=2, rules=None, db_path=None):
         self.market = market
         self.investor_type = investor_type
         self.consecutive_days = consecutive_days
+        self.rules = rules or RuleSet.load()
+        self.db_path = db_path
         self.investor_code = self._get_investor_code()
         self.market_code = self._get_market_code()
 
@@ -42,10 +51,7 @@ class UnifiedStockDashboard:
     def _fetch_url(self, url):
         """주어진 URL의 HTML을 가져옵니다."""
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            response.encoding = 'euc-kr'
-            return BeautifulSoup(response.text, 'html.parser')
+            return fetch_soup(url)
         except Exception as e:
             logging.error(f"URL 가져오기 오류: {url} - {e}")
             return None
@@ -57,64 +63,24 @@ class UnifiedStockDashboard:
         print(f"📊 시장 현황 ({datetime.now().strftime('%Y-%m-%d %H:%M')})")
         print("="*80)
 
-        # 국내 지수
-        krx_indices = {
-            'KS11': '코스피 (KOSPI)',
-            'KQ11': '코스닥 (KOSDAQ)',
-        }
-
-        for symbol, name in krx_indices.items():
-            try:
-                df = fdr.DataReader(symbol, (datetime.now() - pd.Timedelta(days=5)).strftime('%Y-%m-%d'))
-                if df.empty:
-                    continue
-
-                latest = df.iloc[-1]
-                price = f"{latest['Close']:,.2f}"
-                change = latest['Change'] * 100
-                change_str = f"{change:+.2f}%"
-
-                if change > 0:
-                    change_str = f"\033[92m{change_str}\033[0m"  # 녹색
-                elif change < 0:
-                    change_str = f"\033[91m{change_str}\033[0m"  # 빨간색
-
-                print(f"▶ {name} ({symbol})")
-                print(f"  - 현재가: {price} | 등락률: {change_str}")
-            except Exception as e:
-                logging.error(f"{name} 조회 오류: {e}")
-
-        # 해외 선물 지수
-        futures_indices = {
-            'NQ=F': '나스닥 100 선물',
-            'ES=F': 'S&P 500 선물',
-            '^VIX': 'VIX 공포지수',
-        }
+        # 국내 지수와 해외 선물 지수를 한 번에 조회합니다. (yfinance 일괄 다운로드 + KRX 동시 조회)
+        quotes = get_index_quotes(KRX_INDICES, FUTURES_INDICES)
 
-        for ticker, name in futures_indices.items():
-            try:
-                data = yf.Ticker(ticker).history(period="2d")
-                if data.empty or len(data) < 2:
-                    continue
-
-                latest = data.iloc[-1]
-                previous = data.iloc[-2]
-                price = latest['Close']
-                change = price - previous['Close']
-                change_percent = (change / previous['Close']) * 100
+        for symbol, name in {**KRX_INDICES, **FUTURES_INDICES}.items():
+            quote = quotes.get(symbol)
+            if quote is None:
+                continue
 
-                price_str = f"{price:,.2f}"
-                change_str = f"{change_percent:+.2f}%"
+            price_str = f"{quote.price:,.2f}"
+            change_str = f"{quote.change_pct:+.2f}%"
 
-                if change_percent > 0:
-                    change_str = f"\033[92m{change_str}\033[0m"
-                elif change_percent < 0:
-                    change_str = f"\033[91m{change_str}\033[0m"
+            if quote.change_pct > 0:
+                change_str = f"\033[92m{change_str}\033[0m"  # 녹색
+            elif quote.change_pct < 0:
+                change_str = f"\033[91m{change_str}\033[0m"  # 빨간색
 
-                print(f"▶ {name} ({ticker})")
-                print(f"  - 현재가: {price_str} | 등락률: {change_str}")
-            except Exception as e:
-                logging.error(f"{name} 조회 오류: {e}")
+            print(f"▶ {name} ({symbol})")
+            print(f"  - 현재가: {price_str} | 등락률: {change_str}")
 
         print("="*80)
 
@@ -157,10 +123,10 @@ class UnifiedStockDashboard:
             stock_code = match.group(1)
 
             if stock_name and stock_code:
-                stocks.append({'name': stock_name, 'code': stock_code})
+                stocks.append(StockRef(stock_name, stock_code))
 
         for i, stock in enumerate(stocks[:20], 1):  # 상위 20개만 표시
-            print(f"[{i:02d}] {stock['name']} ({stock['code']})")
+            print(f"[{i:02d}] {stock.name} ({stock.code})")
 
         print("-"*80)
         return stocks
@@ -203,28 +169,22 @@ class UnifiedStockDashboard:
             stock_code = match.group(1)
 
             if stock_name and stock_code:
-                yesterday_stocks.append({'name': stock_name, 'code': stock_code})
+                yesterday_stocks.append(StockRef(stock_name, stock_code))
 
-        today = datetime.now()
-        start_day = today - timedelta(days=5)
+        today_session = latest_session()
+        today_trade_date = today_session.strftime('%Y-%m-%d')
+        yesterday_trade_date = krx_calendar.previous_trading_day(today_session).strftime('%Y-%m-%d')
 
         results = []
-        yesterday_trade_date = None
-        today_trade_date = None
 
-        for i, stock in enumerate(yesterday_stocks):
+        for stock in yesterday_stocks:
             try:
-                df = fdr.DataReader(stock['code'], start=start_day, end=today)
-                if len(df) < 2:
+                latest_change = get_session_change(stock.code, today_session)
+                if latest_change is None:
                     continue
 
-                if i == 0:
-                    today_trade_date = df.index[-1].strftime('%Y-%m-%d')
-                    yesterday_trade_date = df.index[-2].strftime('%Y-%m-%d')
-
-                latest_change = df['Change'].iloc[-1]
                 results.append({
-                    'name': stock['name'],
+                    'name': stock.name,
                     'change': latest_change
                 })
 
@@ -236,10 +196,10 @@ class UnifiedStockDashboard:
                 elif change_percent < 0:
                     change_str = f"\033[91m{change_str}\033[0m"
 
-                print(f"  {stock['name']}: {change_str}")
+                print(f"  {stock.name}: {change_str}")
 
             except Exception as e:
-                logging.error(f"{stock['name']} 분석 오류: {e}")
+                logging.error(f"{stock.name} 분석 오류: {e}")
 
         if results:
             average_change = sum(item['change'] for item in results) / len(results)
@@ -252,8 +212,7 @@ class UnifiedStockDashboard:
                 avg_str = f"\033[91m{avg_str}\033[0m"
 
             print(f"\n💡 평균 등락률: {avg_str}")
-            if yesterday_trade_date and today_trade_date:
-                print(f"   (기준: {yesterday_trade_date} → {today_trade_date})")
+            print(f"   (기준: {yesterday_trade_date} → {today_trade_date})")
 
         print("-"*80)
 
@@ -298,23 +257,28 @@ class UnifiedStockDashboard:
                 stock_code = match.group(1)
 
                 if stock_name and stock_code:
-                    stocks.append((stock_name, stock_code))
+                    stocks.append(StockRef(stock_name, stock_code))
 
             all_day_stocks.append(stocks)
-            codes = {code for name, code in stocks}
+            codes = {stock.code for stock in stocks}
 
             if i == 0:
                 consecutive_codes = codes
             else:
                 consecutive_codes.intersection_update(codes)
 
+        # 이력 DB가 있으면 누적된 목록으로 연속 일수를 계산합니다. (페이지의 날짜 수보다 긴 --days도 가능)
+        history_codes = self._streak_codes(soup) if self.db_path else None
+        if history_codes is not None:
+            consecutive_codes = set(history_codes)
+
         if not consecutive_codes:
             print(f"{self.consecutive_days}일 연속 순매수 종목이 없습니다.")
             print("-"*80)
             return
 
-        latest_stocks_map = {code: name for name, code in all_day_stocks[0]}
-        consecutive_stocks = [(latest_stocks_map[code], code) for code in consecutive_codes if code in latest_stocks_map]
+        latest_stocks_map = {stock.code: stock for stock in all_day_stocks[0]}
+        consecutive_stocks = [latest_stocks_map[code] for code in consecutive_codes if code in latest_stocks_map]
 
         print(f"총 {len(consecutive_stocks)}개 종목 발견")
         print()
@@ -323,21 +287,21 @@ class UnifiedStockDashboard:
         analyzed_results = []
         end_date = datetime.now()
         start_date = end_date - timedelta(days=365)
+        levels = load_levels(self.db_path, [stock.code for stock in consecutive_stocks])
 
-        for i, (stock_name, stock_code) in enumerate(consecutive_stocks, 1):
+        for i, stock in enumerate(consecutive_stocks, 1):
+            stock_name, stock_code = stock.name, stock.code
             try:
                 detail_url = f"{self.BASE_URL}/item/main.naver?code={stock_code}"
                 soup = self._fetch_url(detail_url)
                 if not soup:
                     continue
 
-                df = fdr.DataReader(stock_code, start=start_date, end=end_date)
-                if df.empty:
+                # 52주 최고/최저가 색인(--db)이 오늘까지 갱신되어 있으면 1년치 시세를 받지 않습니다.
+                quote = quote_52w(stock_code, start_date, end_date, levels)
+                if quote is None:
                     continue
-
-                current_price = df['Close'].iloc[-1]
-                change_rate = df['Change'].iloc[-1] * 100
-                high_52_week = df['High'].max()
+                current_price, change_rate, high_52_week = quote
 
                 # 펀더멘탈 데이터 추출
                 per, pbr, roe, foreign_ratio = self._get_stock_fundamentals(stock_code, soup)
@@ -345,57 +309,56 @@ class UnifiedStockDashboard:
                 if pd.isna(current_price) or pd.isna(high_52_week) or high_52_week == 0:
                     continue
 
-                # 필터 점수 계산
-                score = 0
-                passed_filters = []
-                if pbr is not None and 0 < pbr < 1.0:
-                    score += 1
-                    passed_filters.append(f"PBR: {pbr:.2f}")
-                if per is not None and 0 < per < 15:
-                    score += 1
-                    passed_filters.append(f"PER: {per:.2f}")
-                if roe is not None and roe > 15:
-                    score += 1
-                    passed_filters.append(f"ROE: {roe:.2f}%")
-
-                analyzed_results.append({
-                    "종목명": stock_name,
-                    "코드": stock_code,
-                    "종합 점수": score,
-                    "현재가": int(current_price),
-                    "등락률": change_rate,
-                    "52주 신고가": int(high_52_week),
-                    "PER": per,
-                    "PBR": pbr,
-                    "ROE": roe,
-                    "외국인보유율": foreign_ratio,
-                    "필터": ', '.join(passed_filters)
-                })
+                analyzed_results.append(StockResult(
+                    name=stock_name,
+                    code=stock_code,
+                    score=0,
+                    price=int(current_price),
+                    change_rate=change_rate,
+                    high_52w=int(high_52_week),
+                    per=per,
+                    pbr=pbr,
+                    roe=roe,
+                    foreign_ratio=foreign_ratio,
+                ))
 
             except Exception as e:
                 logging.error(f"{stock_name} ({stock_code}) 분석 오류: {e}")
 
-        # 종합 점수 순으로 정렬하여 출력
-        sorted_results = sorted(analyzed_results, key=lambda x: x['종합 점수'], reverse=True)
+        # 규칙 파일(scoring_rules.txt)로 전체를 한 번에 채점하고 종합 점수 순으로 정렬하여 출력
+        sorted_results = sort_by_score(self.rules.apply(analyzed_results))
 
         for i, result in enumerate(sorted_results, 1):
-            price_ratio = result['현재가'] / result['52주 신고가']
-            change_rate_str = f"{result['등락률']:+.2f}%"
+            price_ratio = result.price_ratio
+            change_rate_str = f"{result.change_rate:+.2f}%"
 
-            if result['등락률'] > 0:
+            if result.change_rate > 0:
                 change_rate_str = f"\033[92m{change_rate_str}\033[0m"
-            elif result['등락률'] < 0:
+            elif result.change_rate < 0:
                 change_rate_str = f"\033[91m{change_rate_str}\033[0m"
 
-            print(f"[{i:02d}] {result['종목명']} ({result['코드']}) - 점수: {result['종합 점수']}/3")
-            print(f"    현재가: {result['현재가']:,}원 ({change_rate_str}) | 52주 신고가: {result['52주 신고가']:,}원 ({price_ratio:.1%})")
-            print(f"    PER: {result['PER'] or 'N/A'} | PBR: {result['PBR'] or 'N/A'} | ROE: {str(result['ROE'])+'%' if result['ROE'] is not None else 'N/A'}")
-            if result['필터']:
-                print(f"    ✓ 필터: {result['필터']}")
+            print(f"[{i:02d}] {result.name} ({result.code}) - 점수: {result.score}/{self.rules.max_score}")
+            print(f"    현재가: {result.price:,}원 ({change_rate_str}) | 52주 신고가: {result.high_52w:,}원 ({price_ratio:.1%})")
+            print(f"    PER: {result.per or 'N/A'} | PBR: {result.pbr or 'N/A'} | ROE: {str(result.roe)+'%' if result.roe is not None else 'N/A'}")
+            if result.filters:
+                print(f"    ✓ 필터: {result.filters}")
             print()
 
         print("-"*80)
 
+    def _streak_codes(self, soup):
+        """순매수 상위 페이지의 날짜별 목록을 이력 DB에 저장하고, 이력이 충분하면 N일 이상 연속 순매수 종목 코드를 반환합니다."""
+        boxes = parse_deal_rank_boxes(soup)
+        if not boxes:
+            return None
+        try:
+            with DealRankStore(self.db_path) as store:
+                store.save_boxes(self.market, self.investor_type, boxes)
+                return store.streak_codes(self.market, self.investor_type, self.consecutive_days, latest=boxes[0][0])
+        except Exception as e:
+            logging.error(f"순매수 상위 이력 저장/조회 오류: {e}")
+            return None
+
     def _get_stock_fundamentals(self, stock_code, soup):
         """종목의 펀더멘탈 및 추가 지표를 추출합니다."""
         try:
@@ -437,16 +400,20 @@ class UnifiedStockDashboard:
         print("╚" + "═"*78 + "╝")
 
         # 1. 시장 현황
-        self.get_market_indices()
+        with stage('section.market_indices'):
+            self.get_market_indices()
 
         # 2. 오늘의 순매수 상위 종목
-        self.get_today_top_stocks()
+        with stage('section.today_top_stocks'):
+            self.get_today_top_stocks()
 
         # 3. 어제 순매수 종목의 오늘 등락률
-        self.analyze_yesterday_performance()
+        with stage('section.yesterday_performance'):
+            self.analyze_yesterday_performance()
 
         # 4. N일 연속 순매수 종목 펀더멘탈 분석
-        self.analyze_consecutive_stocks()
+        with stage('section.consecutive_stocks'):
+            self.analyze_consecutive_stocks()
 
         print("\n" + "="*80)
         print(f"대시보드 업데이트 완료: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -463,16 +430,29 @@ def main():
                         help="분석할 투자자 종류 (foreign 또는 institution, 기본값: foreign)")
     parser.add_argument('--days', type=int, default=2,
                         help="연속 순매수 일수 (기본값: 2)")
+    parser.add_argument('--db', type=str,
+                        help="순매수 상위 목록 이력과 52주 최고/최저가 색인을 쓰는 SQLite DB 파일 (예: results.db)")
+    add_profile_arguments(parser)
+    add_budget_arguments(parser)
+    add_snapshot_arguments(parser)
+    add_rules_arguments(parser)
 
     args = parser.parse_args()
+    configure_from_args(args)
+    configure_budget_from_args(args)
+    use_snapshot_from_args(args)
 
     dashboard = UnifiedStockDashboard(
         market=args.market,
         investor_type=args.investor,
-        consecutive_days=args.days
+        consecutive_days=args.days,
+        rules=RuleSet.load(args.rules),
+        db_path=args.db
     )
 
     dashboard.display_full_dashboard()
+    budget.print_summary()
+    profiler.finish()
 
 
 if __name__ == "__main__":
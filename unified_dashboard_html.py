@@ -5,33 +5,156 @@
 GitHub Pages용 HTML 파일을 생성합니다.
 """
 
-import requests
-from bs4 import BeautifulSoup
 import re
 import pandas as pd
-import FinanceDataReader as fdr
-import yfinance as yf
 from datetime import datetime, timedelta
 import argparse
+import itertools
+import json
 import logging
 import os
+import time
+
+from results_store import ResultsStore
+from group_history import GroupHistoryStore, parse_group_rows, fetch_group_rows, latest_rotation
+from rank_history import DealRankStore, parse_deal_rank_boxes
+from http_client import NAVER_BASE_URL, fetch_soup
+import krx_calendar
+from market_data import latest_session, get_session_change, get_index_quotes, KRX_INDICES, FUTURES_INDICES
+from profiling import stage, profiler, add_profile_arguments, configure_from_args
+from snapshot_bundle import add_snapshot_arguments, use_snapshot_from_args
+from run_budget import budget, SourceUnavailable, add_budget_arguments, configure_budget_from_args
+from stock_records import StockRef, StockResult, sort_by_score
+from scoring_rules import RuleSet, add_rules_arguments
+from cross_section import load_rule_features
+from find_stocks import parse_fundamentals
+from high_low_index import load_levels, quote_52w
+from ttl_cache import TTLCache
 
 # 로깅 설정
 logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
+SECTION_STATUS_LABELS = {
+    'partial': '⚠️ 일부 데이터를 가져오지 못했습니다',
+    'stale': '⏳ 최신 데이터를 가져오지 못해 지난 결과를 표시합니다',
+    'unavailable': '⚠️ 데이터를 가져올 수 없습니다',
+}
+_SECTION_PATTERN = re.compile(r'<!--section:(?P<name>[\w.]+):(?P<generated_at>[^>]*?)-->.*?'
+                              r'<!--section-body-->(?P<html>.*?)<!--/section:(?P=name)-->', re.S)
+
+
+def _wrap_section(name, section):
+    """섹션 HTML을 이름/생성 시각 주석으로 감싸고, 정상이 아니면 상태 표시를 앞에 붙입니다."""
+    banner = ''
+    if section['status'] != 'ok':
+        banner = (f'<div class="section-status {section["status"]}">{SECTION_STATUS_LABELS[section["status"]]}'
+                  f' (기준: {section["generated_at"]}, {section["reason"]})</div>')
+    return (f'<!--section:{name}:{section["generated_at"]}-->{banner}<!--section-body-->'
+            f'{section["html"]}<!--/section:{name}-->')
+
+
+MARKETS = ('kospi', 'kosdaq')
+INVESTORS = ('foreign', 'institution')
+DEFAULT_BATCH_OUTPUT = 'docs/{market}-{investor}-{days}d.html'
+
+
+def parse_batch(spec):
+    """배치 구성 목록 [{'market', 'investor', 'days', 'output'}]을 만듭니다.
+
+    spec은 JSON 파일 경로([{"market": "all", "investor": "foreign", "days": 2, "output": "docs/index.html"}, ...])이거나
+    '시장:투자자:일수' 조합입니다. 쉼표로 여러 값을 주면 모든 조합을, ';'로 조합을 여러 개 나열합니다.
+    시장은 kospi, kosdaq, all(두 시장 모두) 중 하나입니다. 예: 'kospi,kosdaq:foreign,institution:2,3,5'
+    """
+    if os.path.exists(spec):
+        with open(spec, encoding='utf-8') as f:
+            variants = [dict(item) for item in json.load(f)]
+    else:
+        variants = []
+        for group in filter(None, (g.strip() for g in spec.split(';'))):
+            parts = [p.split(',') for p in group.split(':')]
+            if len(parts) != 3:
+                raise ValueError(f"배치 구성은 '시장:투자자:일수' 형식이어야 합니다: {group}")
+            variants += [{'market': m.strip(), 'investor': i.strip(), 'days': d.strip()}
+                         for m, i, d in itertools.product(*parts)]
+    for variant in variants:
+        variant.setdefault('market', 'all')
+        variant['days'] = int(variant.get('days', 2))
+        if variant['market'] not in MARKETS + ('all',) or variant.get('investor') not in INVESTORS or variant['days'] < 1:
+            raise ValueError(f"잘못된 배치 구성입니다: {variant}")
+    return variants
+
+
+def generate_batch(variants, output_pattern=DEFAULT_BATCH_OUTPUT, db_path=None, rules=None, share_caches=True):
+    """여러 구성의 대시보드를 한 프로세스에서 만듭니다.
+
+    배치 동안 페이지/시세/지수 캐시를 만료 없이 공유하므로, 구성이 몇 개든 필요한 데이터의 합집합을 한 번씩만 가져오고
+    나머지 구성은 메모리의 같은 데이터로 만듭니다. (스냅샷 번들을 연 실행이면 share_caches=False로 번들 캐시를 그대로 사용)
+    배치가 끝나면 (오류가 나도) 이전 캐시를 되돌립니다. (데몬처럼 캐시를 설정해 둔 프로세스에서 실행할 때)
+    """
+    import http_client
+    import market_data
+
+    previous = None
+    if share_caches:
+        previous = (http_client.use_page_cache(TTLCache(float('inf'), max_entries=100000, name='batch.pages')),
+                    market_data.use_cache(TTLCache(float('inf'), max_entries=100000, name='batch.ohlcv')),
+                    market_data.use_quote_cache(TTLCache(float('inf'), max_entries=1000, name='batch.quotes')))
+    rules = rules or RuleSet.load()
+
+    outputs = []
+    try:
+        for n, variant in enumerate(variants, 1):
+            markets = MARKETS if variant['market'] == 'all' else (variant['market'],)
+            output = variant.get('output') or output_pattern.format(**variant)
+            started = time.perf_counter()
+            print(f"[{n}/{len(variants)}] {variant['market']} / {variant['investor']} / {variant['days']}일 -> {output}")
+            dashboard = UnifiedStockDashboardHTML(market=markets[0], investor_type=variant['investor'],
+                                                  consecutive_days=variant['days'], db_path=db_path,
+                                                  rules=rules, markets=markets)
+            with stage(f"batch.{variant['market']}.{variant['investor']}.{variant['days']}"):
+                dashboard.generate_html(output_file=output)
+            logging.info(f"배치 구성 {n}/{len(variants)} 완료 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+            outputs.append(output)
+    finally:
+        if previous is not None:
+            page_cache, price_cache, quote_cache = previous
+            http_client.use_page_cache(page_cache)
+            market_data.use_cache(price_cache)
+            market_data.use_quote_cache(quote_cache)
+    return outputs
+
+
+def load_sections(html):
+    """이전에 생성한 대시보드 HTML에서 섹션별 본문과 생성 시각을 읽습니다."""
+    return {m.group('name'): {'html': m.group('html'), 'generated_at': m.group('generated_at')}
+            for m in _SECTION_PATTERN.finditer(html)}
+
+
 class UnifiedStockDashboardHTML:
     """통합 주식 정보 대시보드 - HTML 생성"""
 
-    BASE_URL = "https://finance.naver.com"
+    BASE_URL = NAVER_BASE_URL
 
-    def __init__(self, market='kospi', investor_type='foreign', consecutive_days=2):
+    def __init__(self, market='kospi', investor_type='foreign', consecutive_days=2, db_path=None,
+                 previous_sections=None, rules=None, markets=MARKETS):
         self.market = market
+        # 종목 섹션을 만들 시장 (기본값: KOSPI와 KOSDAQ 모두)
+        self.markets = tuple(markets)
         self.investor_type = investor_type
         self.consecutive_days = consecutive_days
         self.investor_code = self._get_investor_code()
         self.market_code = self._get_market_code()
+        self.db_path = db_path
+        self.rules = rules or RuleSet.load()
         self.html_parts = []
+        self.results = {}
+        # 섹션 이름 -> {'html', 'status', 'generated_at', 'reason'} (이번 실행 결과)
+        self.sections = {}
+        # 원본을 가져오지 못한 섹션 대신 표시할 이전 실행 결과 (load_sections 형식)
+        self.previous_sections = previous_sections
+        self._fetch_ok = 0
+        self._fetch_failed = 0
 
     def _get_investor_code(self):
         return {'foreign': '9000', 'institution': '1000'}.get(self.investor_type, '9000')
@@ -41,18 +164,66 @@ class UnifiedStockDashboardHTML:
 
     def _fetch_url(self, url):
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            response.encoding = 'euc-kr'
-            return BeautifulSoup(response.text, 'html.parser')
+            soup = fetch_soup(url)
+        except SourceUnavailable as e:
+            # 예산 초과/차단으로 호출하지 않은 요청은 run_budget이 셉니다.
+            logging.warning(f"URL 건너뜀: {url} - {e}")
+            return None
         except Exception as e:
+            self._fetch_failed += 1
             logging.error(f"URL 가져오기 오류: {url} - {e}")
             return None
+        self._fetch_ok += 1
+        return soup
 
     def _add_html(self, html):
         """HTML 파트를 추가합니다."""
         self.html_parts.append(html)
 
+    def _rotation_html(self, kind, rows, first_page=None):
+        """오늘 시세를 이력 DB에 저장하고, 누적 이력으로 순환매(모멘텀/연속 상승) 추세 HTML을 만듭니다."""
+        if not self.db_path:
+            return ''
+        label = '업종' if kind == 'upjong' else '테마'
+        try:
+            if kind == 'theme':
+                rows = fetch_group_rows(kind, first_page=first_page)
+            with GroupHistoryStore(self.db_path) as store:
+                store.save_snapshot(kind, rows)
+                change, up, down = store.load_panel(kind)
+        except Exception as e:
+            logging.error(f"{label} 이력 저장/조회 오류: {e}")
+            return ''
+
+        window = 5
+        if len(change) <= window:
+            return f'<p class="trend-note">{label} 추세: 이력 {len(change)}일 누적 (최소 {window + 1}일 필요)</p>'
+
+        table = latest_rotation(change, up, down, windows=(window, 20)).dropna(subset=[f'mom_{window}'])
+        html = '<div class="sector-grid">'
+        for title, css, items in ((f'🔁 {window}일 모멘텀 상위 {label}', 'rising', table.head(10)),
+                                  (f'🧊 {window}일 모멘텀 하위 {label}', 'falling', table.tail(10).iloc[::-1])):
+            html += f'<div class="sector-column {css}"><h3>{title}</h3><div class="sector-list">'
+            for name, row in items.iterrows():
+                mom = row[f'mom_{window}']
+                rank_chg = row.get(f'rank_chg_{window}')
+                meta = [f"연속 상승 {int(row['streak'])}일"]
+                if pd.notna(rank_chg):
+                    meta.append(f"순위 {int(rank_chg):+d}")
+                if pd.notna(row.get('breadth')):
+                    meta.append(f"상승비율 {row['breadth']:.0%}")
+                html += f'''
+            <div class="sector-item">
+                <span class="sector-rank">#{int(row[f'rank_{window}'])}</span>
+                <span class="sector-name">{name}<span class="trend-meta">{' · '.join(meta)}</span></span>
+                <span class="sector-change {'positive' if mom > 0 else 'negative'}">{mom:+.2f}%</span>
+            </div>
+            '''
+            html += '</div></div>'
+        html += '</div>'
+        html += f'<p class="trend-note">{label} 이력 {change.index[0]} ~ {change.index[-1]} ({len(change)}일)</p>'
+        return html
+
     def get_sector_overview(self):
         """업종별 분위기를 분석하여 HTML로 변환합니다."""
         html = '<div class="section"><h2>🏭 섹터별 분위기</h2>'
@@ -72,34 +243,7 @@ class UnifiedStockDashboardHTML:
             self._add_html(html)
             return
 
-        sectors = []
-        for row in table.find_all('tr'):
-            cols = row.find_all('td')
-            if len(cols) < 4:
-                continue
-
-            sector_link = cols[0].find('a')
-            if not sector_link:
-                continue
-
-            sector_name = sector_link.text.strip()
-            change_text = cols[1].text.strip().replace('%', '').replace('+', '').replace(',', '')
-
-            try:
-                change = float(change_text)
-            except ValueError:
-                continue
-
-            # 등락 종목 수 파싱
-            up_count = cols[2].text.strip() if len(cols) > 2 else '0'
-            down_count = cols[3].text.strip() if len(cols) > 3 else '0'
-
-            sectors.append({
-                'name': sector_name,
-                'change': change,
-                'up_count': up_count,
-                'down_count': down_count
-            })
+        sectors = parse_group_rows(soup)
 
         if not sectors:
             html += '<p>업종 데이터를 파싱할 수 없습니다.</p></div>'
@@ -174,7 +318,9 @@ class UnifiedStockDashboardHTML:
             </div>
             '''
 
-        html += '</div></div></div></div>'
+        html += '</div></div></div>'
+        html += self._rotation_html('upjong', sectors)
+        html += '</div>'
         self._add_html(html)
 
     def get_theme_stocks(self):
@@ -196,28 +342,7 @@ class UnifiedStockDashboardHTML:
             self._add_html(html)
             return
 
-        themes = []
-        for row in table.find_all('tr'):
-            cols = row.find_all('td')
-            if len(cols) < 4:
-                continue
-
-            theme_link = cols[0].find('a')
-            if not theme_link:
-                continue
-
-            theme_name = theme_link.text.strip()
-            change_text = cols[1].text.strip().replace('%', '').replace('+', '').replace(',', '')
-
-            try:
-                change = float(change_text)
-            except ValueError:
-                continue
-
-            themes.append({
-                'name': theme_name,
-                'change': change
-            })
+        themes = parse_group_rows(soup)
 
         if not themes:
             html += '<p>테마 데이터를 파싱할 수 없습니다.</p></div>'
@@ -260,88 +385,68 @@ class UnifiedStockDashboardHTML:
             </div>
             '''
 
-        html += '</div></div></div></div>'
+        html += '</div></div></div>'
+        html += self._rotation_html('theme', themes, first_page=soup)
+        html += '</div>'
         self._add_html(html)
 
     def get_market_indices(self):
         """국내외 시장 지수 정보를 가져와 HTML로 변환합니다."""
         html = '<div class="section"><h2>📊 시장 현황</h2><div class="indices-grid">'
 
-        # 국내 지수
-        krx_indices = {
-            'KS11': '코스피 (KOSPI)',
-            'KQ11': '코스닥 (KOSDAQ)',
-        }
-
-        for symbol, name in krx_indices.items():
-            try:
-                df = fdr.DataReader(symbol, (datetime.now() - pd.Timedelta(days=5)).strftime('%Y-%m-%d'))
-                if df.empty:
-                    continue
-
-                latest = df.iloc[-1]
-                data_date = df.index[-1].strftime('%Y-%m-%d %H:%M')
-                price = f"{latest['Close']:,.2f}"
-                change = latest['Change'] * 100
-                change_class = 'positive' if change > 0 else 'negative' if change < 0 else 'neutral'
-                change_str = f"{change:+.2f}%"
+        # 국내 지수와 해외 선물 지수를 한 번에 조회합니다. (yfinance 일괄 다운로드 + KRX 동시 조회)
+        quotes = get_index_quotes(KRX_INDICES, FUTURES_INDICES)
 
-                html += f'''
-                <div class="index-card">
-                    <div class="index-name">{name}</div>
-                    <div class="index-symbol">{symbol}</div>
-                    <div class="index-price">{price}</div>
-                    <div class="index-change {change_class}">{change_str}</div>
-                    <div class="index-time">{data_date}</div>
-                </div>
-                '''
-            except Exception as e:
-                logging.error(f"{name} 조회 오류: {e}")
+        for symbol, name in KRX_INDICES.items():
+            quote = quotes.get(symbol)
+            if quote is None:
+                continue
 
-        # 해외 선물 지수
-        futures_indices = {
-            'NQ=F': '나스닥 100 선물',
-            'ES=F': 'S&P 500 선물',
-            '^VIX': 'VIX 공포지수',
-        }
+            data_date = quote.time.strftime('%Y-%m-%d %H:%M')
+            price = f"{quote.price:,.2f}"
+            change = quote.change_pct
+            change_class = 'positive' if change > 0 else 'negative' if change < 0 else 'neutral'
+            change_str = f"{change:+.2f}%"
 
-        for ticker, name in futures_indices.items():
-            try:
-                data = yf.Ticker(ticker).history(period="2d")
-                if data.empty or len(data) < 2:
-                    continue
+            html += f'''
+            <div class="index-card">
+                <div class="index-name">{name}</div>
+                <div class="index-symbol">{symbol}</div>
+                <div class="index-price">{price}</div>
+                <div class="index-change {change_class}">{change_str}</div>
+                <div class="index-time">{data_date}</div>
+            </div>
+            '''
 
-                latest = data.iloc[-1]
-                previous = data.iloc[-2]
-                price = latest['Close']
-                change = price - previous['Close']
-                change_percent = (change / previous['Close']) * 100
+        for ticker, name in FUTURES_INDICES.items():
+            quote = quotes.get(ticker)
+            if quote is None:
+                continue
 
-                # 실시간 여부 확인 (최근 1시간 이내 데이터면 실시간으로 간주)
-                latest_time = data.index[-1]
-                now_utc = datetime.now(latest_time.tzinfo) if latest_time.tzinfo else datetime.utcnow()
-                time_diff = now_utc - latest_time
+            # 실시간 여부 확인 (최근 1시간 이내 데이터면 실시간으로 간주)
+            latest_time = quote.time
+            now_utc = datetime.now(latest_time.tzinfo) if latest_time.tzinfo else datetime.utcnow()
+            time_diff = now_utc - latest_time
 
-                if time_diff.total_seconds() < 3600:  # 1시간 이내
-                    time_str = "(실시간)"
-                else:
-                    time_str = latest_time.strftime('%Y-%m-%d %H:%M')
+            if time_diff.total_seconds() < 3600:  # 1시간 이내
+                time_str = "(실시간)"
+            else:
+                time_str = latest_time.strftime('%Y-%m-%d %H:%M')
 
-                price_str = f"{price:,.2f}"
-                change_class = 'positive' if change_percent > 0 else 'negative' if change_percent < 0 else 'neutral'
-                change_str = f"{change_percent:+.2f}%"
+            price_str = f"{quote.price:,.2f}"
+            change_percent = quote.change_pct
+            change_class = 'positive' if change_percent > 0 else 'negative' if change_percent < 0 else 'neutral'
+            change_str = f"{change_percent:+.2f}%"
 
-                html += f'''
-                <div class="index-card">
-                    <div class="index-name">{name}</div>
-                    <div class="index-symbol">{ticker}</div>
-                    <div class="index-price">{price_str}</div>
-                    <div class="index-change {change_class}">{change_str}</div>
-                    <div class="index-time">{time_str}</div>
-                </div>
-                '''
-            except Exception as e:
-                logging.error(f"{name} 조회 오류: {e}")
+            html += f'''
+            <div class="index-card">
+                <div class="index-name">{name}</div>
+                <div class="index-symbol">{ticker}</div>
+                <div class="index-price">{price_str}</div>
+                <div class="index-change {change_class}">{change_str}</div>
+                <div class="index-time">{time_str}</div>
+            </div>
+            '''
 
         html += '</div></div>'
         self._add_html(html)
@@ -404,11 +509,11 @@ class UnifiedStockDashboardHTML:
             stock_code = match.group(1)
 
             if stock_name and stock_code:
-                stocks.append({'name': stock_name, 'code': stock_code})
+                stocks.append(StockRef(stock_name, stock_code))
 
         html += '<ol class="top-stocks-list">'
         for stock in stocks[:20]:
-            html += f'<li><span class="stock-name">{stock["name"]}</span> <span class="stock-code">({stock["code"]})</span></li>'
+            html += f'<li><span class="stock-name">{stock.name}</span> <span class="stock-code">({stock.code})</span></li>'
         html += '</ol></div></div>'
 
         self._add_html(html)
@@ -459,42 +564,27 @@ class UnifiedStockDashboardHTML:
             stock_code = match.group(1)
 
             if stock_name and stock_code:
-                yesterday_stocks.append({'name': stock_name, 'code': stock_code})
-
-        # 날짜 정보를 먼저 추출
-        today = datetime.now()
-        start_day = today - timedelta(days=5)
-        yesterday_trade_date = None
-        today_trade_date = None
+                yesterday_stocks.append(StockRef(stock_name, stock_code))
 
-        # 첫 번째 종목으로 날짜 정보 추출
-        if yesterday_stocks:
-            try:
-                df = fdr.DataReader(yesterday_stocks[0]['code'], start=start_day, end=today)
-                if len(df) >= 2:
-                    today_trade_date = df.index[-1].strftime('%Y-%m-%d')
-                    yesterday_trade_date = df.index[-2].strftime('%Y-%m-%d')
-            except Exception:
-                pass
+        # 기준 거래일은 거래일 달력으로 계산합니다. (날짜 확인용 시세 조회 없음)
+        today_session = latest_session()
+        today_trade_date = today_session.strftime('%Y-%m-%d')
+        yesterday_trade_date = krx_calendar.previous_trading_day(today_session).strftime('%Y-%m-%d')
 
         # 날짜 정보를 포함한 제목 생성
-        if yesterday_trade_date and today_trade_date:
-            html = f'<div class="section"><h2>📉 전일({yesterday_trade_date}) {investor_kr} 순매수 종목의 당일({today_trade_date}) 등락률 ({market_kr})</h2>'
-        else:
-            html = f'<div class="section"><h2>📉 전일 {investor_kr} 순매수 종목의 당일 등락률 ({market_kr})</h2>'
+        html = f'<div class="section"><h2>📉 전일({yesterday_trade_date}) {investor_kr} 순매수 종목의 당일({today_trade_date}) 등락률 ({market_kr})</h2>'
 
         results = []
         html += '<div class="performance-list">'
 
         for stock in yesterday_stocks:
             try:
-                df = fdr.DataReader(stock['code'], start=start_day, end=today)
-                if len(df) < 2:
+                latest_change = get_session_change(stock.code, today_session)
+                if latest_change is None:
                     continue
 
-                latest_change = df['Change'].iloc[-1]
                 results.append({
-                    'name': stock['name'],
+                    'name': stock.name,
                     'change': latest_change
                 })
 
@@ -502,10 +592,10 @@ class UnifiedStockDashboardHTML:
                 change_class = 'positive' if change_percent > 0 else 'negative' if change_percent < 0 else 'neutral'
                 change_str = f"{change_percent:+.2f}%"
 
-                html += f'<div class="performance-item"><span class="stock-name">{stock["name"]}</span> <span class="change {change_class}">{change_str}</span></div>'
+                html += f'<div class="performance-item"><span class="stock-name">{stock.name}</span> <span class="change {change_class}">{change_str}</span></div>'
 
             except Exception as e:
-                logging.error(f"{stock['name']} 분석 오류: {e}")
+                logging.error(f"{stock.name} 분석 오류: {e}")
 
         html += '</div>'
 
@@ -520,6 +610,18 @@ class UnifiedStockDashboardHTML:
         html += '</div>'
         self._add_html(html)
 
+    def _streak_codes(self, market, soup, latest):
+        """순매수 상위 페이지의 날짜별 목록을 이력 DB에 저장하고, 이력이 충분하면 N일 이상 연속 순매수 종목 코드를 반환합니다."""
+        if not soup or not latest:
+            return None
+        try:
+            with DealRankStore(self.db_path) as store:
+                store.save_boxes(market, self.investor_type, parse_deal_rank_boxes(soup))
+                return store.streak_codes(market, self.investor_type, self.consecutive_days, latest=latest)
+        except Exception as e:
+            logging.error(f"순매수 상위 이력 저장/조회 오류: {e}")
+            return None
+
     def analyze_consecutive_stocks(self, market=None):
         """N일 연속 순매수 상위 종목의 펀더멘탈을 분석하여 HTML로 변환합니다."""
         investor_kr = '외국인' if self.investor_type == 'foreign' else '기관'
@@ -572,23 +674,29 @@ class UnifiedStockDashboardHTML:
                 stock_code = match.group(1)
 
                 if stock_name and stock_code:
-                    stocks.append((stock_name, stock_code))
+                    stocks.append(StockRef(stock_name, stock_code))
 
             all_day_stocks.append(stocks)
-            codes = {code for name, code in stocks}
+            codes = {stock.code for stock in stocks}
 
             if i == 0:
                 consecutive_codes = codes
             else:
                 consecutive_codes.intersection_update(codes)
 
+        # 이력 DB가 있으면 누적된 목록으로 연속 일수를 계산합니다. (페이지의 날짜 수보다 긴 --days도 가능)
+        history_codes = self._streak_codes(market, soup, date_list[0] if date_list else None) if self.db_path else None
+        if history_codes is not None:
+            consecutive_codes = set(history_codes)
+            date_list = [d.isoformat() for d in krx_calendar.trading_days(end=date_list[0], periods=self.consecutive_days)][::-1]
+
         if not consecutive_codes:
             html += f'<p>{self.consecutive_days}일 연속 순매수 종목이 없습니다.</p></div>'
             self._add_html(html)
             return
 
-        latest_stocks_map = {code: name for name, code in all_day_stocks[0]}
-        consecutive_stocks = [(latest_stocks_map[code], code) for code in consecutive_codes if code in latest_stocks_map]
+        latest_stocks_map = {stock.code: stock for stock in all_day_stocks[0]}
+        consecutive_stocks = [latest_stocks_map[code] for code in consecutive_codes if code in latest_stocks_map]
 
         # 날짜 정보 표시
         date_range_str = ""
@@ -602,142 +710,173 @@ class UnifiedStockDashboardHTML:
         analyzed_results = []
         end_date = datetime.now()
         start_date = end_date - timedelta(days=365)
+        levels = load_levels(self.db_path, [stock.code for stock in consecutive_stocks])
 
-        for i, (stock_name, stock_code) in enumerate(consecutive_stocks, 1):
+        for i, stock in enumerate(consecutive_stocks, 1):
+            stock_name, stock_code = stock.name, stock.code
             try:
                 detail_url = f"{self.BASE_URL}/item/main.naver?code={stock_code}"
                 soup = self._fetch_url(detail_url)
                 if not soup:
                     continue
 
-                df = fdr.DataReader(stock_code, start=start_date, end=end_date)
-                if df.empty:
+                # 52주 최고/최저가 색인(--db)이 오늘까지 갱신되어 있으면 1년치 시세를 받지 않습니다.
+                quote = quote_52w(stock_code, start_date, end_date, levels)
+                if quote is None:
                     continue
+                current_price, change_rate, high_52_week = quote
 
-                current_price = df['Close'].iloc[-1]
-                change_rate = df['Change'].iloc[-1] * 100
-                high_52_week = df['High'].max()
-
-                per, pbr, roe, foreign_ratio = self._get_stock_fundamentals(stock_code, soup)
+                per, pbr, roe, foreign_ratio = parse_fundamentals(soup)
 
                 if pd.isna(current_price) or pd.isna(high_52_week) or high_52_week == 0:
                     continue
 
-                score = 0
-                passed_filters = []
-                if pbr is not None and 0 < pbr < 1.0:
-                    score += 1
-                    passed_filters.append(f"PBR: {pbr:.2f}")
-                if per is not None and 0 < per < 15:
-                    score += 1
-                    passed_filters.append(f"PER: {per:.2f}")
-                if roe is not None and roe > 15:
-                    score += 1
-                    passed_filters.append(f"ROE: {roe:.2f}%")
-
-                analyzed_results.append({
-                    "종목명": stock_name,
-                    "코드": stock_code,
-                    "종합 점수": score,
-                    "현재가": int(current_price),
-                    "등락률": change_rate,
-                    "52주 신고가": int(high_52_week),
-                    "PER": per,
-                    "PBR": pbr,
-                    "ROE": roe,
-                    "외국인보유율": foreign_ratio,
-                    "필터": ', '.join(passed_filters)
-                })
+                analyzed_results.append(StockResult(
+                    name=stock_name,
+                    code=stock_code,
+                    score=0,
+                    price=int(current_price),
+                    change_rate=change_rate,
+                    high_52w=int(high_52_week),
+                    per=per,
+                    pbr=pbr,
+                    roe=roe,
+                    foreign_ratio=foreign_ratio,
+                ))
 
             except Exception as e:
                 logging.error(f"{stock_name} ({stock_code}) 분석 오류: {e}")
 
-        sorted_results = sorted(analyzed_results, key=lambda x: x['종합 점수'], reverse=True)
+        # 규칙 파일(scoring_rules.txt)로 분석한 종목 전체를 한 번에 채점합니다. (--db면 저장된 횡단면 백분위도 지표로 사용)
+        extra = load_rule_features(self.db_path, [r.code for r in analyzed_results])
+        sorted_results = sort_by_score(self.rules.apply(analyzed_results, extra))
+        self.results[market] = sorted_results
+
+        if self.db_path:
+            with ResultsStore(self.db_path) as store:
+                store.save_results(sorted_results, market, self.investor_type, days=self.consecutive_days)
 
         html += '<div class="stock-analysis-list">'
         for i, result in enumerate(sorted_results, 1):
-            price_ratio = result['현재가'] / result['52주 신고가']
-            change_class = 'positive' if result['등락률'] > 0 else 'negative' if result['등락률'] < 0 else 'neutral'
-            change_str = f"{result['등락률']:+.2f}%"
+            price_ratio = result.price_ratio
+            change_class = 'positive' if result.change_rate > 0 else 'negative' if result.change_rate < 0 else 'neutral'
+            change_str = f"{result.change_rate:+.2f}%"
 
             html += f'''
             <div class="stock-card">
                 <div class="stock-header">
                     <span class="rank">#{i}</span>
-                    <span class="stock-name">{result['종목명']}</span>
-                    <span class="stock-code">({result['코드']})</span>
-                    <span class="score">점수: {result['종합 점수']}/3</span>
+                    <span class="stock-name">{result.name}</span>
+                    <span class="stock-code">({result.code})</span>
+                    <span class="score">점수: {result.score}/{self.rules.max_score}</span>
                 </div>
                 <div class="stock-price">
-                    <strong>{result['현재가']:,}원</strong>
+                    <strong>{result.price:,}원</strong>
                     <span class="change {change_class}">{change_str}</span>
                 </div>
                 <div class="stock-details">
-                    <div>52주 신고가: {result['52주 신고가']:,}원 ({price_ratio:.1%})</div>
-                    <div>PER: {result['PER'] if result['PER'] else 'N/A'} | PBR: {result['PBR'] if result['PBR'] else 'N/A'} | ROE: {str(result['ROE'])+'%' if result['ROE'] is not None else 'N/A'}</div>
-                    <div>외국인보유율: {str(result['외국인보유율'])+'%' if result['외국인보유율'] is not None else 'N/A'}</div>
+                    <div>52주 신고가: {result.high_52w:,}원 ({price_ratio:.1%})</div>
+                    <div>PER: {result.per if result.per else 'N/A'} | PBR: {result.pbr if result.pbr else 'N/A'} | ROE: {str(result.roe)+'%' if result.roe is not None else 'N/A'}</div>
+                    <div>외국인보유율: {str(result.foreign_ratio)+'%' if result.foreign_ratio is not None else 'N/A'}</div>
             '''
 
-            if result['필터']:
-                html += f'<div class="filters">✓ {result["필터"]}</div>'
+            if result.filters:
+                html += f'<div class="filters">✓ {result.filters}</div>'
 
             html += '</div></div>'
 
         html += '</div></div>'
         self._add_html(html)
 
-    def _get_stock_fundamentals(self, stock_code, soup):
-        try:
-            per_tag = soup.select_one('#_per')
-            pbr_tag = soup.select_one('#_pbr')
-            per = float(per_tag.text) if per_tag and per_tag.text not in ['N/A', ''] else None
-            pbr = float(pbr_tag.text) if pbr_tag and pbr_tag.text not in ['N/A', ''] else None
-
-            foreign_ratio = None
-            foreign_ratio_th = soup.find('th', string=lambda text: text and '외국인소진율' in text)
-            if foreign_ratio_th:
-                foreign_ratio_td = foreign_ratio_th.find_next_sibling('td')
-                if foreign_ratio_td and '%' in foreign_ratio_td.text:
-                    foreign_ratio = float(foreign_ratio_td.text.strip().replace('%', ''))
-
-            roe = None
-            finance_summary_table = soup.find('div', class_='cop_analysis')
-            if finance_summary_table:
-                finance_summary_table = finance_summary_table.find('table')
-                if finance_summary_table:
-                    for row in finance_summary_table.find_all('tr'):
-                        th_text = row.find('th').get_text(strip=True) if row.find('th') else ''
-                        if 'ROE(지배주주)' in th_text and row.find_all('td'):
-                            roe_text = row.find_all('td')[-1].text.strip()
-                            if roe_text:
-                                roe = float(roe_text)
-
-            return per, pbr, roe, foreign_ratio
-        except (ValueError, AttributeError) as e:
-            logging.error(f"펀더멘탈 추출 오류: {e}")
-            return None, None, None, None
+    def _run_section(self, name, title, func, **kwargs):
+        """섹션 하나를 실행합니다.
+
+        원본 호출이 실패하거나 실행 예산 때문에 거부되면 가진 데이터로 만든 섹션에 '일부 누락' 표시를 붙이고,
+        섹션 데이터를 전혀 가져오지 못했으면 이전 실행 결과를 '지난 데이터'로, 없으면 '가져올 수 없음'으로 표시합니다.
+        """
+        start = len(self.html_parts)
+        self._fetch_ok = self._fetch_failed = 0
+        rejected = budget.rejections()
+        reason = None
+        if budget.expired():
+            reason = "실행 시간 한도 초과로 건너뜀"
+        else:
+            with stage(f'section.{name}'):
+                try:
+                    func(**kwargs)
+                except SourceUnavailable as e:
+                    reason = str(e)
+        html = ''.join(self.html_parts[start:])
+        del self.html_parts[start:]
+
+        skipped = budget.rejections() - rejected
+        failures = self._fetch_failed + skipped
+        if reason is None and failures:
+            reason = f"요청 {failures}건 실패/생략" + (" (실행 예산 초과 또는 원본 차단)" if skipped else "")
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-    def generate_html(self, output_file='index.html'):
-        """모든 데이터를 수집하고 HTML 파일을 생성합니다."""
-        print("데이터 수집 중...")
+        if reason is None:
+            section = {'html': html, 'status': 'ok', 'generated_at': now, 'reason': None}
+        elif html and self._fetch_ok:
+            section = {'html': html, 'status': 'partial', 'generated_at': now, 'reason': reason}
+        else:
+            previous = (self.previous_sections or {}).get(name)
+            if previous:
+                section = {'html': previous['html'], 'status': 'stale',
+                           'generated_at': previous['generated_at'], 'reason': reason}
+            else:
+                html = html or f'<div class="section"><h2>{title}</h2></div>'
+                section = {'html': html, 'status': 'unavailable', 'generated_at': now, 'reason': reason}
+        self.sections[name] = section
+        self._add_html(_wrap_section(name, section))
 
+    def collect(self):
+        """모든 섹션의 데이터를 수집해 HTML 파트를 만듭니다."""
         # 시장 현황 (공통)
-        self.get_market_indices()
+        self._run_section('market_indices', '📊 시장 현황', self.get_market_indices)
 
         # 섹터별 분위기 (새로 추가)
-        self.get_sector_overview()
-        self.get_theme_stocks()
+        self._run_section('sector_overview', '🏭 섹터별 분위기', self.get_sector_overview)
+        self._run_section('theme_stocks', '🔥 테마별 분위기', self.get_theme_stocks)
+
+        # KOSPI / KOSDAQ 섹션
+        investor_kr = '외국인' if self.investor_type == 'foreign' else '기관'
+        for market in self.markets:
+            market_kr = market.upper()
+            self._run_section(f'{market}.today_top_stocks', f'📈 {investor_kr} 순매수 상위 종목 ({market_kr})',
+                              self.get_today_top_stocks, market=market)
+            self._run_section(f'{market}.yesterday_performance',
+                              f'📉 전일 {investor_kr} 순매수 종목의 당일 등락률 ({market_kr})',
+                              self.analyze_yesterday_performance, market=market)
+            self._run_section(f'{market}.consecutive_stocks',
+                              f'🎯 {self.consecutive_days}일 연속 {investor_kr} 순매수 종목 펀더멘탈 분석 ({market_kr})',
+                              self.analyze_consecutive_stocks, market=market)
+
+    def generate_html(self, output_file='index.html'):
+        """모든 데이터를 수집하고 HTML 파일을 생성합니다.
+
+        기존 출력 파일이 있으면 그 섹션들을 원본 장애 시 표시할 이전 결과로 사용합니다.
+        """
+        if self.previous_sections is None and os.path.exists(output_file):
+            with open(output_file, encoding='utf-8') as f:
+                self.previous_sections = load_sections(f.read())
 
-        # KOSPI 섹션
-        self.get_today_top_stocks(market='kospi')
-        self.analyze_yesterday_performance(market='kospi')
-        self.analyze_consecutive_stocks(market='kospi')
+        print("데이터 수집 중...")
+        self.collect()
 
-        # KOSDAQ 섹션
-        self.get_today_top_stocks(market='kosdaq')
-        self.analyze_yesterday_performance(market='kosdaq')
-        self.analyze_consecutive_stocks(market='kosdaq')
+        with stage('render.html'):
+            html_template = self.render_html()
 
+        os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else '.', exist_ok=True)
+
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(html_template)
+
+        print(f"✓ HTML 파일이 생성되었습니다: {output_file}")
+
+
+    def render_html(self):
+        """수집된 섹션을 하나의 HTML 문서로 조립합니다."""
         now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
         html_template = f'''<!DOCTYPE html>
@@ -1054,6 +1193,33 @@ class UnifiedStockDashboardHTML:
             flex: 1;
             font-weight: 500;
         }}
+        .section-status {{
+            border-radius: 10px;
+            padding: 10px 15px;
+            margin-bottom: 10px;
+            font-size: 0.9em;
+            color: white;
+        }}
+        .section-status.partial {{
+            background: #f39c12;
+        }}
+        .section-status.stale {{
+            background: #7f8c8d;
+        }}
+        .section-status.unavailable {{
+            background: #c0392b;
+        }}
+        .trend-meta {{
+            display: block;
+            color: #888;
+            font-size: 0.8em;
+            font-weight: normal;
+        }}
+        .trend-note {{
+            margin-top: 10px;
+            color: #888;
+            font-size: 0.85em;
+        }}
         .sector-change, .theme-change {{
             font-weight: bold;
             min-width: 70px;
@@ -1088,13 +1254,7 @@ class UnifiedStockDashboardHTML:
 </body>
 </html>
 '''
-
-        os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else '.', exist_ok=True)
-
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_template)
-
-        print(f"✓ HTML 파일이 생성되었습니다: {output_file}")
+        return html_template
 
 
 def main():
@@ -1109,16 +1269,45 @@ def main():
                         help="연속 순매수 일수 (기본값: 2)")
     parser.add_argument('--output', type=str, default='docs/index.html',
                         help="출력 HTML 파일 경로 (기본값: docs/index.html)")
+    parser.add_argument('--db', type=str,
+                        help="연속 순매수 분석 결과와 업종/테마 시세 이력을 누적할 SQLite DB 파일 (예: results.db)")
+    parser.add_argument('--batch', type=str, metavar='SPEC',
+                        help="여러 구성을 데이터를 공유하며 한 번에 생성 ('시장:투자자:일수' 조합 또는 JSON 파일, "
+                             "예: 'kospi,kosdaq:foreign,institution:2,3,5'. 지정하면 --market/--investor/--days/--output 무시)")
+    parser.add_argument('--batch-output', type=str, default=DEFAULT_BATCH_OUTPUT,
+                        help=f"배치 구성별 출력 경로 형식 (기본값: {DEFAULT_BATCH_OUTPUT})")
+    add_profile_arguments(parser)
+    add_budget_arguments(parser)
+    add_snapshot_arguments(parser)
+    add_rules_arguments(parser)
 
     args = parser.parse_args()
+    configure_from_args(args)
+    configure_budget_from_args(args)
+    bundle = use_snapshot_from_args(args)
+
+    if args.batch:
+        try:
+            variants = parse_batch(args.batch)
+        except ValueError as e:
+            parser.error(str(e))
+        generate_batch(variants, args.batch_output, db_path=args.db, rules=RuleSet.load(args.rules),
+                       share_caches=bundle is None)
+        budget.print_summary()
+        profiler.finish()
+        return
 
     dashboard = UnifiedStockDashboardHTML(
         market=args.market,
         investor_type=args.investor,
-        consecutive_days=args.days
+        consecutive_days=args.days,
+        db_path=args.db,
+        rules=RuleSet.load(args.rules)
     )
 
     dashboard.generate_html(output_file=args.output)
+    budget.print_summary()
+    profiler.finish()
 
 
 if __name__ == "__main__":